@@ -0,0 +1,285 @@
+"""
+Build-time CSS optimization: unused selector purging and minification.
+
+The project stylesheets are written by hand and shared by every page, so a
+large share of their rules match nothing the templates render. purge_css()
+drops rules whose class or id selectors never appear in the project's
+templates, scripts and Python sources (where form widgets set their classes);
+minify_css() strips comments and whitespace. Both are applied during
+collectstatic by core.storage.OptimizedStaticFilesStorage, before the files
+are hashed and compressed.
+
+The parser understands just enough CSS for that: plain rules, grouping
+at-rules (@media, @supports, ...) whose contents are purged recursively, and
+other block at-rules (@keyframes, @font-face, ...) which are kept as they are.
+"""
+import fnmatch
+import os
+import re
+
+from django.conf import settings
+
+# At-rules whose blocks contain rules that can be purged
+GROUPING_AT_RULES = {'media', 'supports', 'container', 'layer', 'document'}
+
+# Source files scanned for class names and ids
+CONTENT_EXTENSIONS = ('.html', '.js', '.py', '.txt')
+TOKEN_RE = re.compile(r'[A-Za-z_][\w-]*')
+SELECTOR_NAME_RE = re.compile(r'[.#](-?[_a-zA-Z][\w-]*)')
+NOT_ARGUMENT_RE = re.compile(r':not\([^()]*\)')
+ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+
+
+def _skip_string(css, i):
+    """Return the index just past the string literal starting at css[i]."""
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+
+def strip_comments(css):
+    """Remove /* ... */ comments, leaving string literals untouched."""
+    out = []
+    i = 0
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            end = _skip_string(css, i)
+            out.append(css[i:end])
+            i = end
+        elif css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = len(css) if end == -1 else end + 2
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out)
+
+
+def _find(css, i, stops):
+    """Return the index of the first character in `stops` at or after i, outside strings and parentheses."""
+    depth = 0
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+            continue
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth <= 0 and char in stops:
+            return i
+        i += 1
+    return len(css)
+
+
+def _matching_brace(css, i):
+    """Return the index of the '}' closing the '{' at css[i]."""
+    depth = 0
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(css)
+
+
+def parse_css(css):
+    """
+    Parse comment-free CSS into a list of nodes.
+
+    Nodes are ('rule', selector, declarations), ('group', prelude, children),
+    ('block', prelude, body) and ('statement', text).
+    """
+    nodes = []
+    i = 0
+    while i < len(css):
+        if css[i].isspace() or css[i] == ';':
+            i += 1
+            continue
+        end = _find(css, i, '{;' if css[i] == '@' else '{')
+        prelude = css[i:end].strip()
+        if end >= len(css) or css[end] == ';':
+            if prelude:
+                nodes.append(('statement', prelude))
+            i = end + 1
+            continue
+        close = _matching_brace(css, end)
+        body = css[end + 1:close]
+        if prelude.startswith('@'):
+            name = re.match(r'@([\w-]+)', prelude)
+            if name and name.group(1).lower() in GROUPING_AT_RULES:
+                nodes.append(('group', prelude, parse_css(body)))
+            else:
+                nodes.append(('block', prelude, body))
+        else:
+            nodes.append(('rule', prelude, body))
+        i = close + 1
+    return nodes
+
+
+def split_selectors(selector):
+    """Split a selector list on its top-level commas."""
+    parts = []
+    start = 0
+    while start <= len(selector):
+        end = _find(selector, start, ',')
+        parts.append(selector[start:end].strip())
+        start = end + 1
+    return [part for part in parts if part]
+
+
+def collect_used_names(paths=None):
+    """
+    Return every identifier-like token found in the content sources.
+
+    Anything that looks like a word counts, so class names built in scripts or
+    set on form widgets are kept; the purge errs on the side of keeping rules.
+    """
+    if paths is None:
+        paths = getattr(settings, 'STATIC_CSS_PURGE_CONTENT', [])
+    used = set()
+    for path in paths:
+        path = str(path)
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = (
+                os.path.join(root, name)
+                for root, dirs, names in os.walk(path)
+                if 'migrations' not in root and '__pycache__' not in root
+                for name in names
+                if name.endswith(CONTENT_EXTENSIONS)
+            )
+        for file_path in files:
+            with open(file_path, encoding='utf-8', errors='ignore') as f:
+                used.update(TOKEN_RE.findall(f.read()))
+    return used
+
+
+def _is_safelisted(name, safelist):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in safelist)
+
+
+def selector_is_used(selector, used, safelist=()):
+    """Return whether every class and id the selector requires appears in `used` or the safelist."""
+    if '\\' in selector:
+        # Escaped identifiers are not worth guessing about
+        return True
+    # Whatever is inside :not() or an attribute selector is not a required name
+    required = SELECTOR_NAME_RE.findall(ATTRIBUTE_RE.sub('', NOT_ARGUMENT_RE.sub('', selector)))
+    return all(name in used or _is_safelisted(name, safelist) for name in required)
+
+
+def purge_nodes(nodes, used, safelist=()):
+    """Return `nodes` without the rules and selectors nothing uses."""
+    kept = []
+    for node in nodes:
+        if node[0] == 'rule':
+            selectors = [s for s in split_selectors(node[1]) if selector_is_used(s, used, safelist)]
+            if selectors:
+                kept.append(('rule', ','.join(selectors), node[2]))
+        elif node[0] == 'group':
+            children = purge_nodes(node[2], used, safelist)
+            if children:
+                kept.append(('group', node[1], children))
+        else:
+            kept.append(node)
+    return kept
+
+
+def _compact(text, punctuation):
+    """Collapse whitespace outside strings and drop it around `punctuation`."""
+    out = []
+    i = 0
+    pending_space = False
+    while i < len(text):
+        char = text[i]
+        if char.isspace():
+            pending_space = True
+            i += 1
+            continue
+        if pending_space and out and out[-1] not in punctuation and char not in punctuation:
+            out.append(' ')
+        pending_space = False
+        if char in '"\'':
+            end = _skip_string(text, i)
+            out.append(text[i:end])
+            i = end
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out)
+
+
+def _minify_declarations(body):
+    return _compact(body, ';:,{}!').rstrip(';').replace(';}', '}')
+
+
+def _minify_selector(selector):
+    # '+' is left alone: inside :nth-child(2n + 1) the spaces are optional, but
+    # stripping it everywhere would gain little
+    return _compact(selector, ',>~')
+
+
+def serialize(nodes):
+    """Serialize parsed nodes as minified CSS."""
+    out = []
+    for node in nodes:
+        kind = node[0]
+        if kind == 'rule':
+            out.append(f"{_minify_selector(node[1])}{{{_minify_declarations(node[2])}}}")
+        elif kind == 'group':
+            out.append(f"{_compact(node[1], ',')}{{{serialize(node[2])}}}")
+        elif kind == 'block':
+            out.append(f"{_compact(node[1], ',')}{{{_minify_declarations(node[2])}}}")
+        else:
+            out.append(f"{_compact(node[1], ',')};")
+    return ''.join(out)
+
+
+def minify_css(css):
+    """Return `css` without comments and redundant whitespace."""
+    return serialize(parse_css(strip_comments(css)))
+
+
+def purge_css(css, used, safelist=None):
+    """Return `css` minified, keeping only the rules whose selectors use names in `used`."""
+    if safelist is None:
+        safelist = getattr(settings, 'STATIC_CSS_SAFELIST', [])
+    return serialize(purge_nodes(parse_css(strip_comments(css)), used, safelist))
+
+
+def template_names(template_path, template_dirs):
+    """
+    Return the names used by a template and everything it extends or includes.
+    """
+    used = set()
+    seen = set()
+    pending = [template_path]
+    tag_re = re.compile(r'{%\s*(?:extends|include)\s+["\']([^"\']+)["\']')
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        with open(path, encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        used.update(TOKEN_RE.findall(content))
+        for name in tag_re.findall(content):
+            for directory in template_dirs:
+                candidate = os.path.join(str(directory), name)
+                if os.path.exists(candidate):
+                    pending.append(candidate)
+                    break
+    return used
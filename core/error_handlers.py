@@ -5,7 +5,6 @@ These handlers ensure the application never crashes the Gunicorn worker.
 from django.shortcuts import render
 from django.http import JsonResponse
 import logging
-import traceback
 
 logger = logging.getLogger(__name__)
 
@@ -16,25 +15,14 @@ def handler500(request, *args, **kwargs):
     Logs the full error and returns a user-friendly page.
     """
     try:
-        # Log the full traceback
-        logger.error("=" * 80)
-        logger.error("500 INTERNAL SERVER ERROR")
-        logger.error("=" * 80)
-        logger.error(f"Path: {request.path}")
-        logger.error(f"Method: {request.method}")
-        logger.error(f"User: {request.user if hasattr(request, 'user') else 'Anonymous'}")
-        
-        # Log POST data (excluding sensitive fields)
+        # One record with the request context; django.request already logged the traceback
+        user = request.user if hasattr(request, 'user') else 'Anonymous'
+        post_data = ''
         if request.method == 'POST':
+            # POST data (excluding sensitive fields)
             safe_post = {k: v for k, v in request.POST.items() if k not in ['password', 'password1', 'password2']}
-            logger.error(f"POST data: {safe_post}")
-        
-        # Log the exception if available
-        if hasattr(kwargs, 'exception'):
-            logger.error(f"Exception: {kwargs['exception']}")
-            logger.error(traceback.format_exc())
-        
-        logger.error("=" * 80)
+            post_data = f", POST data: {safe_post}"
+        logger.error(f"500 Internal Server Error: {request.method} {request.path} (user: {user}{post_data})")
         
     except Exception as e:
         # Even error logging shouldn't crash
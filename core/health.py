@@ -0,0 +1,129 @@
+"""
+Liveness and readiness endpoints for load balancers and platform probes.
+
+- /healthz: the process is up and serving requests. No I/O at all.
+- /readyz: the process can do useful work: one trivial database query, a
+  round trip to each cache shared between processes (per-process LocMem
+  caches prove nothing and are skipped) and a PDF engine import check. The
+  result is kept for HEALTH_CHECK_CACHE_SECONDS, so frequent probes from
+  several sources run the checks at most once per interval per process.
+  Answers 503 when a check fails.
+
+HealthCheckMiddleware answers both paths before the rest of the middleware
+stack runs: no session or user lookup, no metrics, and no host validation or
+HTTPS redirect (probes usually connect by IP over plain HTTP). Since anyone
+can call them, responses only say "ok" or "failed" per check; the reason for
+a failure is logged, never returned.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+_ready_lock = threading.Lock()
+_ready_result = None  # (expires, status, body)
+
+
+def _check_database():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+# Backends that live inside one process; a round trip to them says nothing about shared infrastructure
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def _shared_caches():
+    return [alias for alias, config in settings.CACHES.items() if config.get('BACKEND') not in LOCAL_CACHE_BACKENDS]
+
+
+def _check_caches():
+    key = f"readyz:{threading.get_ident()}"
+    for alias in _shared_caches():
+        caches[alias].set(key, 1, 30)
+        if caches[alias].get(key) != 1:
+            raise RuntimeError(f"cache '{alias}': value not read back")
+
+
+def _check_pdf():
+    from resume import engines
+
+    # Imports the engines on the first check; the outcome is remembered
+    if not (engines.weasyprint.available or engines.reportlab.available):
+        raise RuntimeError('no PDF engine could be imported')
+
+
+CHECKS = {
+    'database': _check_database,
+    # Only checked when some cache is shared between processes (Redis, Memcached, database, files)
+    **({'cache': _check_caches} if _shared_caches() else {}),
+    'pdf': _check_pdf,
+}
+
+
+def run_checks():
+    """Run every readiness check; returns (all passed, {name: 'ok' or 'failed'})."""
+    results = {}
+    for name, check in CHECKS.items():
+        try:
+            check()
+        except Exception as e:
+            logger.warning(f"⚠️ Readiness check '{name}' failed: {e}")
+            results[name] = 'failed'
+            continue
+        results[name] = 'ok'
+    return all(result == 'ok' for result in results.values()), results
+
+
+def _no_store(response):
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+def healthz(request):
+    """Liveness: the process answers."""
+    return _no_store(JsonResponse({'status': 'ok'}))
+
+
+def readyz(request):
+    """Readiness: database, shared cache and PDF engine checks, cached for a few seconds."""
+    global _ready_result
+    with _ready_lock:
+        now = time.monotonic()
+        if _ready_result is None or now >= _ready_result[0]:
+            ok, checks = run_checks()
+            body = {'status': 'ok' if ok else 'unavailable', 'checks': checks}
+            _ready_result = (now + settings.HEALTH_CHECK_CACHE_SECONDS, 200 if ok else 503, body)
+        _, status, body = _ready_result
+    return _no_store(JsonResponse(body, status=status))
+
+
+PROBES = {
+    '/healthz': healthz,
+    '/readyz': readyz,
+}
+
+
+class HealthCheckMiddleware:
+    """
+    Answer probe requests directly, skipping the rest of the middleware stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        probe = PROBES.get(request.path_info.rstrip('/'))
+        if probe is not None and request.method in ('GET', 'HEAD'):
+            return probe(request)
+        return self.get_response(request)
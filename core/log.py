@@ -0,0 +1,194 @@
+"""
+Non-blocking, structured logging.
+
+QueuedStreamHandler puts records on a bounded in-memory queue and returns;
+a QueueListener thread formats them and writes them to the stream, so a slow
+stdout (a busy log collector, a full pipe) never stalls request threads. If
+the queue fills up, records are dropped and counted instead of blocking, and
+the count is reported once the listener catches up.
+
+JSONFormatter writes one JSON object per line. RequestIdMiddleware gives
+every request an id (taken from a valid X-Request-ID header, or generated),
+which RequestIdFilter adds to the records logged while handling it.
+RateLimitFilter drops repetitive records: at most `rate` records per call
+site every `period` seconds, then a count of what was suppressed.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import time
+import uuid
+
+request_id_var = contextvars.ContextVar('request_id', default='-')
+
+REQUEST_ID_RE = re.compile(r'^[\w.-]{1,64}$')
+
+# LogRecord attributes that are not "extra" fields
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+
+class RequestIdMiddleware:
+    """
+    Assign a request id, exposed to log records and returned in the X-Request-ID header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.headers.get('x-request-id', '')
+        if not REQUEST_ID_RE.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        token = request_id_var.set(request_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response['X-Request-ID'] = request_id
+        return response
+
+
+class RequestIdFilter(logging.Filter):
+    """Add the current request id to records (as record.request_id)."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let through at most `rate` records per call site every `period` seconds.
+
+    Records at `max_level` or above (ERROR by default) are never dropped. The
+    first record let through after a suppression says how many were dropped.
+    Counts are kept without a lock: with several threads they are approximate.
+    """
+
+    def __init__(self, rate=20, period=60, max_level='ERROR'):
+        super().__init__()
+        self.rate = rate
+        self.period = period
+        self.max_level = logging.getLevelName(max_level) if isinstance(max_level, str) else max_level
+        self.windows = {}
+
+    def filter(self, record):
+        if record.levelno >= self.max_level:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        window = self.windows.get(key)
+        if window is None or now - window[0] >= self.period:
+            suppressed = window[2] if window else 0
+            self.windows[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+                record.args = None
+            return True
+        if window[1] < self.rate:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including extra fields."""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+            'process': record.process,
+            'thread': record.thread,
+            'module': record.module,
+            'line': record.lineno,
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            record.exc_text = record.exc_text or self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        if record.stack_info:
+            data['stack'] = record.stack_info
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class QueuedStreamHandler(logging.handlers.QueueHandler):
+    """
+    Write records to a stream from a background thread.
+
+    Configured like a StreamHandler (formatter, filters, level); the formatter
+    runs on the listener thread. The listener is started on first use in each
+    process, so it also works in workers forked after configuration.
+    """
+
+    def __init__(self, stream=None, queue_size=10000):
+        super().__init__(queue.Queue(queue_size))
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+
+    def setFormatter(self, fmt):
+        # Formatting happens in the listener thread
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Merge args and render the traceback now: they may not be safe to use from another thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self._start_listener()
+        if self.dropped and not self.queue.full():
+            dropped, self.dropped = self.dropped, 0
+            self.enqueue(logging.makeLogRecord({
+                'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': f"⚠️ Log queue full: {dropped} records dropped", 'request_id': '-',
+            }))
+        super().emit(record)
+
+    def _start_listener(self):
+        self._pid = os.getpid()
+        # A queue inherited through fork may hold a lock taken by a parent thread
+        self.queue = queue.Queue(self.queue.maxsize)
+        self._listener = logging.handlers.QueueListener(self.queue, self.target)
+        self._listener.start()
+        atexit.register(self.flush_and_stop)
+
+    def flush_and_stop(self):
+        """Write out everything still queued and stop the listener."""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+            self._pid = None
+
+    def close(self):
+        self.flush_and_stop()
+        self.target.close()
+        super().close()
@@ -0,0 +1,180 @@
+"""
+Authorized serving of uploaded media files.
+
+Every request for a file under MEDIA_URL goes through serve_media(), which
+checks that the user may see it (see can_access_media) and then, depending on
+settings.MEDIA_SERVE_BACKEND, either hands the transfer off to the front
+proxy or streams the file itself:
+
+- 'nginx': X-Accel-Redirect to the internal location MEDIA_ACCEL_REDIRECT_PREFIX
+- 'sendfile': X-Sendfile with the absolute path (Apache mod_xsendfile, lighttpd, Caddy)
+- 'django': FileResponse with ETag/Last-Modified revalidation and single byte
+  ranges, for development and deployments without a proxy
+
+With a proxy the worker only authorizes and stats the file, so its time per
+request no longer depends on the file size.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Resized copies are named by a hash of their content and never change
+IMMUTABLE_FOLDERS = {'image_derivatives'}
+
+
+def _owns_profile_photo(user, name):
+    # request.user is loaded fresh for every request, so no query is needed
+    return user.profile_photo.name == name
+
+
+def _owns_project_thumbnail(user, name):
+    from resume.models import Project
+
+    return Project.objects.filter(user=user, thumbnail=name).exists()
+
+
+def _any_user(user, name):
+    # Derivative names are unguessable content hashes, handed out only on the owner's pages
+    return True
+
+
+# Top-level media folder -> check(user, name) for non-staff users; other folders are staff only
+ACCESS_CHECKS = {
+    'profile_photos': _owns_profile_photo,
+    'project_thumbnails': _owns_project_thumbnail,
+    'image_derivatives': _any_user,
+}
+
+
+def can_access_media(user, name):
+    """Return whether `user` may download the media file stored as `name`."""
+    if not user.is_authenticated:
+        return False
+    if user.is_staff:
+        return True
+    check = ACCESS_CHECKS.get(name.split('/', 1)[0])
+    return bool(check and check(user, name))
+
+
+def _etag(st):
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def parse_range(header, size):
+    """
+    Parse a single "bytes=start-end" range against a file of `size` bytes.
+
+    Returns (start, end) inclusive, None to ignore the header (malformed or
+    several ranges: the whole file is sent), or False if it cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        if end and int(end) < start:
+            return None
+        if start >= size:
+            return False
+        end = min(int(end), size - 1) if end else size - 1
+    else:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if not length:
+            return False
+        start, end = max(0, size - length), size - 1
+    return start, end
+
+
+class FileRange:
+    """Read-only view of bytes start..end (inclusive) of an open file, for FileResponse."""
+
+    def __init__(self, file, start, end):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = end - start + 1
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _cache_control(name):
+    if name.split('/', 1)[0] in IMMUTABLE_FOLDERS:
+        return f"private, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable"
+    # Uploads can be replaced under the same name: revalidate, which is a cheap 304
+    return 'private, no-cache'
+
+
+def serve_media(request, path):
+    """
+    Serve MEDIA_ROOT/<path> to users allowed to see it; anyone else gets a 404.
+    """
+    name = posixpath.normpath(path).lstrip('/')
+    if name.startswith('..') or not can_access_media(request.user, name):
+        raise Http404('File not found')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+        st = os.stat(full_path)
+    except (OSError, ValueError):
+        raise Http404('File not found')
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404('File not found')
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    backend = settings.MEDIA_SERVE_BACKEND
+    if backend in ('nginx', 'sendfile'):
+        # The proxy streams the file and answers Range and conditional requests itself
+        response = HttpResponse(content_type=content_type)
+        if backend == 'nginx':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + quote(name)
+        else:
+            response['X-Sendfile'] = full_path
+        response['Cache-Control'] = _cache_control(name)
+        return response
+
+    etag = _etag(st)
+    response = get_conditional_response(request, etag=etag, last_modified=int(st.st_mtime))
+    if response is None:
+        file = open(full_path, 'rb')
+        byte_range = None
+        if_range = request.headers.get('if-range')
+        if 'range' in request.headers and (
+            not if_range or if_range == etag or parse_http_date_safe(if_range) == int(st.st_mtime)
+        ):
+            byte_range = parse_range(request.headers['range'], st.st_size)
+        if byte_range is False:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{st.st_size}'
+        elif byte_range:
+            start, end = byte_range
+            response = FileResponse(FileRange(file, start, end), status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{st.st_size}'
+            response['Content-Length'] = end - start + 1
+        else:
+            response = FileResponse(file, content_type=content_type)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(st.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = _cache_control(name)
+    return response
@@ -0,0 +1,265 @@
+"""
+Per-view request metrics in Prometheus text format.
+
+MetricsMiddleware records, for every request, the latency and response size
+by URL name and the status code. For a sample of requests
+(settings.METRICS_SAMPLE_RATE) it also counts database queries and their time
+(connection.execute_wrapper) and times template rendering. With the rate at 0
+the middleware only reads the clock twice per request.
+
+Series are aggregated per process without locks: each thread updates its own
+dict, registered once in _stores, and metrics_view merges them when scraped.
+The dicts of finished threads are folded into _retired (when a thread
+registers and on each scrape), so servers that start a thread per request
+don't accumulate them.
+Every worker process keeps its own numbers, so with several workers a scrape
+shows the worker that answered it.
+"""
+import hmac
+import random
+import threading
+from bisect import bisect_left
+from contextlib import ExitStack
+from functools import wraps
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Metric:
+    """A metric family: a counter, or a histogram when `buckets` is given."""
+
+    def __init__(self, name, help_text, labels, buckets=None):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+
+    @property
+    def kind(self):
+        return 'histogram' if self.buckets else 'counter'
+
+
+REQUESTS = Metric('app_http_requests_total', 'Requests by view, method and status.', ('view', 'method', 'status'))
+LATENCY = Metric('app_http_request_duration_seconds', 'Time spent in the view and middleware.',
+                 ('view', 'method'), LATENCY_BUCKETS)
+RESPONSE_SIZE = Metric('app_http_response_size_bytes', 'Response body size (when known).', ('view',), SIZE_BUCKETS)
+QUERIES = Metric('app_db_queries_per_request', 'Database queries per sampled request.',
+                 ('view',), QUERY_COUNT_BUCKETS)
+QUERY_TIME = Metric('app_db_query_duration_seconds', 'Database time per sampled request.', ('view',), LATENCY_BUCKETS)
+TEMPLATE_TIME = Metric('app_template_render_duration_seconds', 'Template render time per sampled request.',
+                       ('view',), LATENCY_BUCKETS)
+METRICS = (REQUESTS, LATENCY, RESPONSE_SIZE, QUERIES, QUERY_TIME, TEMPLATE_TIME)
+
+_local = threading.local()
+# Thread -> its series dict; only the owning thread writes to it
+_stores = {}
+# Series of finished threads, merged under _retire_lock
+_retired = {}
+_retire_lock = threading.Lock()
+
+
+def _merge(merged, store):
+    for key, series in list(store.items()):
+        if isinstance(series, list):
+            total = merged.setdefault(key, [0] * len(series))
+            for i, value in enumerate(list(series)):
+                total[i] += value
+        else:
+            merged[key] = merged.get(key, 0) + series
+
+
+def _retire_finished_threads():
+    """Fold the series of threads that have ended into _retired; call with _retire_lock held."""
+    for thread, store in list(_stores.items()):
+        if not thread.is_alive():
+            _merge(_retired, store)
+            del _stores[thread]
+
+
+def _store():
+    try:
+        return _local.store
+    except AttributeError:
+        store = _local.store = {}
+        with _retire_lock:
+            _retire_finished_threads()
+            _stores[threading.current_thread()] = store
+        return store
+
+
+def observe(metric, labels, value=1):
+    """Add `value` to a counter, or record it in a histogram, for this thread."""
+    store = _store()
+    key = (metric, labels)
+    series = store.get(key)
+    if metric.buckets is None:
+        store[key] = (series or 0) + value
+        return
+    if series is None:
+        # Per-bucket counts (the last one is +Inf), then sum and count
+        series = store[key] = [0] * (len(metric.buckets) + 3)
+    series[bisect_left(metric.buckets, value)] += 1
+    series[-2] += value
+    series[-1] += 1
+
+
+def collect():
+    """Merge the series of every thread into {(metric, labels): value or list}."""
+    merged = {}
+    # Under the lock, so a store cannot move to _retired between the two merges
+    with _retire_lock:
+        _retire_finished_threads()
+        _merge(merged, _retired)
+        for store in list(_stores.values()):
+            _merge(merged, store)
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def render_prometheus():
+    """Return all metrics in the Prometheus text exposition format."""
+    merged = collect()
+    lines = []
+    for metric in METRICS:
+        lines.append(f'# HELP {metric.name} {metric.help_text}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        series = sorted((labels, value) for (series_metric, labels), value in merged.items() if series_metric is metric)
+        for labels, value in series:
+            if metric.buckets is None:
+                lines.append(f'{metric.name}{_label_text(metric.labels, labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + ('+Inf',), value):
+                cumulative += count
+                lines.append(f'{metric.name}_bucket{_label_text(metric.labels, labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{metric.name}_sum{_label_text(metric.labels, labels)} {value[-2]:.6f}')
+            lines.append(f'{metric.name}_count{_label_text(metric.labels, labels)} {value[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+class RequestStats:
+    """Query and template timings of the sampled request running in this thread."""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+
+def _time_query(execute, sql, params, many, context):
+    stats = getattr(_local, 'current', None)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            stats.queries += 1
+            stats.query_time += perf_counter() - start
+
+
+_template_timer_installed = False
+
+
+def _install_template_timer():
+    """Wrap the Django template backend's render() to time sampled requests."""
+    global _template_timer_installed
+    if _template_timer_installed:
+        return
+    _template_timer_installed = True
+    from django.template.backends.django import Template
+
+    original = Template.render
+
+    @wraps(original)
+    def render(self, context=None, request=None):
+        stats = getattr(_local, 'current', None)
+        if stats is None:
+            return original(self, context, request)
+        # Only the outermost render is timed, so nested render_to_string calls are not counted twice
+        stats.template_depth += 1
+        start = perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_time += perf_counter() - start
+
+    Template.render = render
+
+
+class MetricsMiddleware:
+    """
+    Record per-view latency, status and response size, plus query and template timings for sampled requests.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 0.0)
+        if self.sample_rate > 0:
+            _install_template_timer()
+
+    def __call__(self, request):
+        start = perf_counter()
+        stats = None
+        if self.sample_rate and random.random() < self.sample_rate:
+            stats = _local.current = RequestStats()
+            try:
+                with ExitStack() as stack:
+                    for connection in connections.all():
+                        stack.enter_context(connection.execute_wrapper(_time_query))
+                    response = self.get_response(request)
+            finally:
+                _local.current = None
+        else:
+            response = self.get_response(request)
+        self.record(request, response, perf_counter() - start, stats)
+        return response
+
+    def record(self, request, response, duration, stats):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        observe(REQUESTS, (view, request.method, response.status_code))
+        observe(LATENCY, (view, request.method), duration)
+        if not response.streaming:
+            observe(RESPONSE_SIZE, (view,), len(response.content))
+        elif response.has_header('Content-Length'):
+            observe(RESPONSE_SIZE, (view,), int(response['Content-Length']))
+        if stats is not None:
+            observe(QUERIES, (view,), stats.queries)
+            observe(QUERY_TIME, (view,), stats.query_time)
+            observe(TEMPLATE_TIME, (view,), stats.template_time)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint, for staff users or a bearer token matching settings.METRICS_TOKEN.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    authorization = request.headers.get('authorization', '')
+    authorized = request.user.is_authenticated and request.user.is_staff
+    if not authorized and token and authorization.startswith('Bearer '):
+        authorized = hmac.compare_digest(authorization[len('Bearer '):].encode(), token.encode())
+    if not authorized:
+        # Don't advertise the endpoint
+        raise Http404
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,202 @@
+"""
+On-demand profiling of single requests, for staff.
+
+A staff user adds ?_profile=sample (or the header "X-Profile: sample") to a
+request and ProfilingMiddleware captures where the view spends its time:
+
+- 'sample': a background thread records the request thread's stack every
+  PROFILING_SAMPLE_INTERVAL seconds, saved as collapsed stacks (one
+  "frame;frame;frame count" line per stack) for flamegraph.pl or speedscope.
+  Cheap enough to use on slow production requests.
+- 'cprofile': deterministic cProfile capture, saved as a pstats file
+  (python -m pstats, snakeviz). Exact call counts, but slows the view down.
+
+Captures go to PROFILING_DIR, which keeps the latest PROFILING_MAX_CAPTURES,
+and can be browsed and downloaded at /admin/profiles/. The response carries
+the capture name in an X-Profile-Capture header.
+"""
+import cProfile
+import datetime
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, Http404
+from django.shortcuts import render
+
+logger = logging.getLogger(__name__)
+
+MODES = {'sample': 'collapsed', 'cprofile': 'prof'}
+CAPTURE_NAME_RE = re.compile(r'^[\w.-]+\.(collapsed|prof)$')
+
+
+class StackSampler:
+    """Sample the stack of one thread at a fixed interval from a background thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiling-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse_stack(frame)] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        """Return the samples in collapsed-stack format, most frequent first."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def collapse_stack(frame):
+    """Return "outermost;...;innermost" for the stack ending at `frame`."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def profiling_dir():
+    return str(settings.PROFILING_DIR)
+
+
+def list_captures():
+    """Return the metadata of the stored captures, newest first."""
+    directory = profiling_dir()
+    if not os.path.isdir(directory):
+        return []
+    captures = []
+    for name in os.listdir(directory):
+        if not CAPTURE_NAME_RE.match(name):
+            continue
+        try:
+            with open(os.path.join(directory, f"{name}.json"), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        meta['name'] = name
+        meta.setdefault('created', os.path.getmtime(os.path.join(directory, name)))
+        meta['captured_at'] = datetime.datetime.fromtimestamp(meta['created'], tz=datetime.timezone.utc)
+        captures.append(meta)
+    captures.sort(key=lambda meta: meta['created'], reverse=True)
+    return captures
+
+
+def _save(mode, write, meta):
+    directory = profiling_dir()
+    os.makedirs(directory, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.{MODES[mode]}"
+    path = os.path.join(directory, name)
+    write(path)
+    with open(f"{path}.json", 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    # Keep a bounded number of captures: drop the oldest
+    for old in list_captures()[settings.PROFILING_MAX_CAPTURES:]:
+        for stale in (old['name'], f"{old['name']}.json"):
+            try:
+                os.remove(os.path.join(directory, stale))
+            except OSError:
+                pass
+    return name
+
+
+class ProfilingMiddleware:
+    """
+    Profile the view of requests carrying ?_profile=<mode> or an X-Profile header, for staff users.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.GET.get('_profile') or request.headers.get('x-profile')
+        if not mode or not request.user.is_authenticated or not request.user.is_staff:
+            return self.get_response(request)
+        if mode not in MODES:
+            mode = 'sample'
+
+        start = time.perf_counter()
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            write = profiler.dump_stats
+        else:
+            with StackSampler(threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL) as sampler:
+                response = self.get_response(request)
+
+            def write(path):
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(sampler.collapsed())
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        meta = {
+            'created': time.time(),
+            'mode': mode,
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else '',
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'user': request.user.email,
+        }
+        try:
+            name = _save(mode, write, meta)
+        except OSError as e:
+            logger.error(f"❌ Could not save profile of {request.path}: {e}")
+            return response
+        logger.info(f"⏱️ Profiled {request.method} {request.path} ({mode}, {meta['duration_ms']} ms): {name}")
+        response['X-Profile-Capture'] = name
+        return response
+
+
+@staff_member_required
+def capture_list(request):
+    """Admin page listing the stored captures."""
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Request profiles',
+        'captures': list_captures(),
+        'max_captures': settings.PROFILING_MAX_CAPTURES,
+    }
+    return render(request, 'admin/profiles.html', context)
+
+
+@staff_member_required
+def capture_download(request, name):
+    """Download one capture."""
+    if not CAPTURE_NAME_RE.match(name):
+        raise Http404('Capture not found')
+    path = os.path.join(profiling_dir(), name)
+    if not os.path.isfile(path):
+        raise Http404('Capture not found')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
@@ -0,0 +1,167 @@
+"""
+Query analysis: N+1 detection and query budgets.
+
+QueryRecorder captures every query run inside it (on all database
+connections) and groups them by shape, i.e. the SQL with literal values and
+IN lists collapsed, so the same lookup repeated for each row of a list shows
+up as one shape run many times: the N+1 pattern.
+
+- QueryInspectorMiddleware logs suspected N+1 patterns of each request with
+  the line of project code that ran them. It is only active in DEBUG
+  (settings.QUERY_INSPECTOR_ENABLED).
+- assert_max_queries() is a context manager and decorator for tests that
+  fails when a block runs more queries than its budget, or repeats one
+  query shape more than allowed.
+"""
+import logging
+import re
+import traceback
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Shapes repeated this many times in one request are reported
+DEFAULT_REPEAT_THRESHOLD = 3
+
+
+def query_shape(sql):
+    """Return `sql` with literals and IN lists collapsed, so per-row repeats compare equal."""
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def _origin():
+    """Return "file:line in function" of the innermost project frame outside this module."""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-3]):
+        filename = frame.filename
+        if filename.startswith(base_dir) and 'site-packages' not in filename and not filename.endswith('queries.py'):
+            return f"{filename[len(base_dir) + 1:]}:{frame.lineno} in {frame.name}"
+    return 'unknown'
+
+
+class QueryRecorder:
+    """
+    Context manager recording (sql, duration, origin) for every query run inside it.
+
+    Stack origins are only captured with `origins=True`, as walking the stack
+    for every query is slow.
+    """
+
+    def __init__(self, using=None, origins=False):
+        self.using = using
+        self.origins = origins
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, perf_counter() - start, _origin() if self.origins else None))
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        aliases = [self.using] if self.using else list(connections)
+        for alias in aliases:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def __len__(self):
+        return len(self.queries)
+
+    def repeated(self, threshold=DEFAULT_REPEAT_THRESHOLD):
+        """
+        Return [(shape, count, origin)] for shapes run at least `threshold` times, most repeated first.
+        """
+        counts = Counter(query_shape(sql) for sql, duration, origin in self.queries)
+        first_origin = {}
+        for sql, duration, origin in self.queries:
+            first_origin.setdefault(query_shape(sql), origin)
+        return [
+            (shape, count, first_origin[shape])
+            for shape, count in counts.most_common()
+            if count >= threshold
+        ]
+
+    def report(self):
+        """Numbered list of the recorded queries, for assertion messages."""
+        return '\n'.join(f"{i}. {sql}" for i, (sql, duration, origin) in enumerate(self.queries, 1))
+
+
+class assert_max_queries(ContextDecorator):
+    """
+    Fail if the block runs more than `budget` queries, or one query shape more than `max_repeats` times.
+
+        with assert_max_queries(6):
+            self.client.get(reverse('dashboard'))
+
+        @assert_max_queries(4)
+        def test_resume_list(self): ...
+    """
+
+    def __init__(self, budget, max_repeats=None, using=None):
+        self.budget = budget
+        self.max_repeats = max_repeats
+        self.using = using
+
+    def __enter__(self):
+        self.recorder = QueryRecorder(using=self.using).__enter__()
+        return self.recorder
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.recorder.__exit__(exc_type, exc_value, tb)
+        if exc_type is not None:
+            return False
+        count = len(self.recorder)
+        if count > self.budget:
+            raise AssertionError(
+                f"{count} queries executed, budget is {self.budget}\n{self.recorder.report()}"
+            )
+        if self.max_repeats is not None:
+            repeated = self.recorder.repeated(self.max_repeats + 1)
+            if repeated:
+                shape, times, origin = repeated[0]
+                raise AssertionError(
+                    f"Query repeated {times} times (max {self.max_repeats}), likely N+1: {shape}\n"
+                    f"{self.recorder.report()}"
+                )
+        return False
+
+
+class QueryInspectorMiddleware:
+    """
+    Log the query count of each request and any query shape repeated often enough to suggest an N+1.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSPECTOR_ENABLED', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'QUERY_INSPECTOR_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD)
+
+    def __call__(self, request):
+        with QueryRecorder(origins=True) as recorder:
+            response = self.get_response(request)
+        repeated = recorder.repeated(self.threshold)
+        for shape, count, origin in repeated:
+            logger.warning(f"🔁 N+1 suspected on {request.method} {request.path}: {count}x from {origin}: {shape}")
+        if repeated:
+            logger.warning(f"🔁 {request.method} {request.path} ran {len(recorder)} queries")
+        return response
@@ -0,0 +1,244 @@
+"""
+Cache-backed rate limiting.
+
+Limits are sliding-window counters stored in Django's cache (settings.
+RATELIMIT_CACHE). A window is approximated from the counts of the current
+and the previous fixed window, weighted by how much of the previous window
+still overlaps, so checking a limit is one get_many() and recording a hit
+one add()/incr(): no database query and no password hashing is needed to
+turn abusive traffic away.
+
+Limits are named in settings.RATE_LIMITS, e.g. {'login:ip': '20/5m'}, and
+applied to a key such as a client IP, an email address or a user id.
+cooldown_remaining() and start_cooldown() enforce a minimum interval between
+two events instead.
+"""
+import hashlib
+import logging
+import math
+import re
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.shortcuts import render
+
+logger = logging.getLogger(__name__)
+
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+
+
+def parse_rate(rate):
+    """
+    Parse "<count>/<period>" (e.g. "5/m", "10/15m", "100/h") into (count, seconds).
+    """
+    match = RATE_RE.match(rate.strip())
+    if not match:
+        raise ValueError(f"Invalid rate '{rate}'")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * UNITS[unit]
+
+
+def get_rate(name):
+    """Return (limit, window seconds) for a named limit, or None if it is not configured."""
+    rate = getattr(settings, 'RATE_LIMITS', {}).get(name)
+    return parse_rate(rate) if rate else None
+
+
+def get_client_ip(request):
+    """
+    Return the client IP, honouring X-Forwarded-For set by trusted proxies.
+
+    settings.RATELIMIT_PROXY_COUNT is the number of reverse proxies in front of
+    the application; addresses they append are trusted, anything the client
+    sent before them is not.
+    """
+    proxies = getattr(settings, 'RATELIMIT_PROXY_COUNT', 0)
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if proxies and forwarded:
+        hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+        if hops:
+            return hops[-min(proxies, len(hops))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _cache():
+    return caches[getattr(settings, 'RATELIMIT_CACHE', 'default')]
+
+
+def _keys(name, key, window, now):
+    # Hash the key so emails and IPs of any length make valid memcached keys
+    digest = hashlib.sha1(str(key).lower().encode()).hexdigest()
+    current = int(now // window)
+    return f"rl:{name}:{digest}:{current}", f"rl:{name}:{digest}:{current - 1}", now % window / window
+
+
+def _usage(name, key, rate, now):
+    limit, window = rate
+    current_key, previous_key, elapsed = _keys(name, key, window, now)
+    counts = _cache().get_many([current_key, previous_key])
+    return counts.get(previous_key, 0) * (1 - elapsed) + counts.get(current_key, 0)
+
+
+def is_limited(name, key):
+    """
+    Return the number of seconds to wait if `key` has exhausted the named limit, else 0.
+
+    Does not count as a hit.
+    """
+    rate = get_rate(name)
+    if not rate or not key or not getattr(settings, 'RATELIMIT_ENABLED', True):
+        return 0
+    limit, window = rate
+    now = time.time()
+    if _usage(name, key, rate, now) < limit:
+        return 0
+    # Conservative estimate: the previous window has fully slid out by then
+    return max(1, int(window - now % window))
+
+
+def hit(name, key):
+    """Record one event for `key` against the named limit."""
+    rate = get_rate(name)
+    if not rate or not key or not getattr(settings, 'RATELIMIT_ENABLED', True):
+        return
+    limit, window = rate
+    current_key, _, _ = _keys(name, key, window, time.time())
+    cache = _cache()
+    # Keep the counter for two windows so it can serve as "previous" later
+    if not cache.add(current_key, 1, timeout=window * 2):
+        try:
+            cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.add(current_key, 1, timeout=window * 2)
+
+
+def check_and_hit(name, key):
+    """
+    Count one event and return the seconds to wait if the limit was already exhausted, else 0.
+
+    Rejected events are not counted, so a client is not locked out longer for retrying.
+    """
+    retry_after = is_limited(name, key)
+    if not retry_after:
+        hit(name, key)
+    return retry_after
+
+
+def remaining(name, key):
+    """Return how many more events `key` may have under the named limit (None if unlimited)."""
+    rate = get_rate(name)
+    if not rate or not key or not getattr(settings, 'RATELIMIT_ENABLED', True):
+        return None
+    return max(0, rate[0] - math.ceil(_usage(name, key, rate, time.time())))
+
+
+def check_otp_request(scope, request, email):
+    """
+    Count a request for an OTP email against '<scope>:ip' and '<scope>:email'.
+
+    Returns the seconds to wait if either limit is exhausted (nothing is
+    counted then), otherwise 0.
+    """
+    ip = get_client_ip(request)
+    email = (email or '').strip().lower()
+    retry_after = max(is_limited(f'{scope}:ip', ip), is_limited(f'{scope}:email', email))
+    if not retry_after:
+        hit(f'{scope}:ip', ip)
+        hit(f'{scope}:email', email)
+    return retry_after
+
+
+def _cooldown_key(name, key):
+    rate = get_rate(name)
+    if not rate or not key or not getattr(settings, 'RATELIMIT_ENABLED', True):
+        return None, 0
+    return _keys(name, key, rate[1], 0)[0], rate[1]
+
+
+def cooldown_remaining(name, key):
+    """
+    Return the seconds left of a running cooldown, e.g. between OTP emails to
+    one address, or 0. Does not start one: call start_cooldown() once the event
+    has actually happened (the email was queued), so a request that is then
+    throttled or fails does not lock the user out.
+
+    The interval is the period of the named rate (its count is ignored).
+    """
+    cache_key, seconds = _cooldown_key(name, key)
+    if not cache_key:
+        return 0
+    expires_at = _cache().get(cache_key)
+    now = time.time()
+    if not expires_at or expires_at <= now:
+        return 0
+    return max(1, int(expires_at - now + 0.999))
+
+
+def start_cooldown(name, key):
+    """Start (or restart) the cooldown of `key` for the named interval."""
+    cache_key, seconds = _cooldown_key(name, key)
+    if cache_key:
+        _cache().set(cache_key, time.time() + seconds, timeout=seconds)
+
+
+def reset(name, key):
+    """Forget all events of `key` for the named limit (e.g. after a successful login)."""
+    rate = get_rate(name)
+    if not rate or not key:
+        return
+    current_key, previous_key, _ = _keys(name, key, rate[1], time.time())
+    _cache().delete_many([current_key, previous_key])
+
+
+def ratelimited_response(request, retry_after, message=None):
+    """
+    Build a 429 response with a Retry-After header.
+
+    AJAX/JSON clients get JSON, browsers the errors/429.html page.
+    """
+    message = message or 'Too many requests. Please wait a moment and try again.'
+    logger.warning(f"🚦 Rate limit hit: {request.method} {request.path} from {get_client_ip(request)}")
+    wants_json = (
+        request.headers.get('x-requested-with') == 'XMLHttpRequest'
+        or 'application/json' in request.headers.get('accept', '')
+    )
+    if wants_json:
+        response = JsonResponse({'error': message, 'retry_after': retry_after}, status=429)
+    else:
+        context = {
+            'error_code': 429,
+            'error_title': 'Too Many Requests',
+            'error_message': message,
+            'retry_after': retry_after,
+        }
+        response = render(request, 'errors/429.html', context, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def ratelimit(name, key='user', methods=('POST',), message=None):
+    """
+    View decorator applying the named limit before the view runs.
+
+    `key` is 'user' (authenticated user id, falling back to the IP) or 'ip'.
+    Only requests using one of `methods` are counted.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            if request.method in methods:
+                if key == 'user' and request.user.is_authenticated:
+                    value = f"user:{request.user.pk}"
+                else:
+                    value = f"ip:{get_client_ip(request)}"
+                retry_after = check_and_hit(name, value)
+                if retry_after:
+                    return ratelimited_response(request, retry_after, message)
+            return view_func(request, *args, **kwargs)
+        return wrapped
+    return decorator
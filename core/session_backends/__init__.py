@@ -0,0 +1,14 @@
+"""
+Session engines with write coalescing.
+
+Django's SessionMiddleware already saves a session at most once per request,
+but it saves whenever the session was *touched*: a view that re-assigns the
+same values, or sets a flag and pops it again before the response, still costs
+an UPDATE. The engines in this package remember what was loaded and skip the
+write when the data is unchanged at the end of the request.
+
+- core.session_backends.db: database sessions (the default)
+- core.session_backends.cached_db: write-through cache in front of the database
+
+Select one with the SESSION_BACKEND environment variable (see core/settings.py).
+"""
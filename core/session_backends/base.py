@@ -0,0 +1,38 @@
+import hashlib
+
+from django.conf import settings
+
+
+class CoalescingSessionMixin:
+    """
+    Skip saving a loaded session whose data has not changed.
+
+    A digest of the session data is taken when it is loaded from the store and
+    compared again in save(). New sessions, key rotation (must_create) and
+    SESSION_SAVE_EVERY_REQUEST (which relies on saves to refresh the expiry)
+    always go through to the store.
+    """
+
+    _loaded_digest = None
+
+    def _data_digest(self, data):
+        return hashlib.sha1(self.serializer().dumps(data)).hexdigest()
+
+    def load(self):
+        data = super().load()
+        self._loaded_digest = self._data_digest(data) if self._session_key else None
+        return data
+
+    def save(self, must_create=False):
+        if (
+            not must_create
+            and self._loaded_digest is not None
+            and self.session_key is not None
+            and not settings.SESSION_SAVE_EVERY_REQUEST
+        ):
+            digest = self._data_digest(self._get_session(no_load=must_create))
+            if digest == self._loaded_digest:
+                return
+        super().save(must_create=must_create)
+        if self.session_key is not None:
+            self._loaded_digest = self._data_digest(self._get_session(no_load=must_create))
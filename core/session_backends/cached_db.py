@@ -0,0 +1,12 @@
+from django.contrib.sessions.backends import cached_db
+
+from .base import CoalescingSessionMixin
+
+
+class SessionStore(CoalescingSessionMixin, cached_db.SessionStore):
+    """
+    Cache + database sessions that only write when the data changed.
+
+    Reads are served from the SESSION_CACHE_ALIAS cache and fall back to the
+    database; writes go to both.
+    """
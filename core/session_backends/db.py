@@ -0,0 +1,9 @@
+from django.contrib.sessions.backends import db
+
+from .base import CoalescingSessionMixin
+
+
+class SessionStore(CoalescingSessionMixin, db.SessionStore):
+    """
+    Database-backed sessions that only write when the data changed.
+    """
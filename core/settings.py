@@ -80,8 +80,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Answers /healthz and /readyz before anything else runs (core/health.py)
+    'core.health.HealthCheckMiddleware',
+    # Early, so everything logged while handling a request carries its id
+    'core.log.RequestIdMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # After WhiteNoise, so static file hits are not recorded
+    'core.metrics.MetricsMiddleware',
+    # Logs suspected N+1 query patterns (DEBUG only, see QUERY_INSPECTOR_ENABLED)
+    'core.queries.QueryInspectorMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -89,6 +97,8 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    # Profiles requests of staff users that ask for it with ?_profile= (core/profiling.py)
+    'core.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -220,12 +230,50 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# WhiteNoise's hashed + Brotli/gzip storage, with a CSS purge/minify stage in front (core/storage.py)
+STATICFILES_STORAGE = 'core.storage.OptimizedStaticFilesStorage'
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    # Data files generated from Python modules (resume/finders.py)
+    'resume.finders.GeneratedAssetsFinder',
+]
+# Build directory for generated static files (not committed; collected like any other static file)
+GENERATED_STATIC_ROOT = BASE_DIR / 'build' / 'static'
+
+# CSS optimization during collectstatic (core/assets.py)
+STATIC_CSS_OPTIMIZE = os.getenv('STATIC_CSS_OPTIMIZE', 'True') == 'True'
+# Stylesheets purged of unused selectors and minified
+STATIC_CSS_OPTIMIZE_FILES = ['css/theme.css', 'css/style.css']
+# Sources scanned for the class names and ids in use
+STATIC_CSS_PURGE_CONTENT = [
+    BASE_DIR / 'templates',
+    BASE_DIR / 'static' / 'js',
+    BASE_DIR / 'core',
+    BASE_DIR / 'resume',
+    BASE_DIR / 'users',
+]
+# Class names only ever built at runtime (template variables, Bootstrap and Select2 scripts)
+STATIC_CSS_SAFELIST = [
+    'alert-*', 'template-*', 'select2*', 'show', 'showing', 'hiding', 'collapsing', 'fade',
+    'active', 'disabled', 'modal-*', 'tooltip*', 'popover*', 'bs-*', 'was-validated',
+]
+# Inline the part of each stylesheet base.html uses and load the rest without blocking rendering
+STATIC_CRITICAL_CSS = os.getenv('STATIC_CRITICAL_CSS', 'False') == 'True'
 
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Local media is served by core.media.serve_media after checking the user may see the file.
+# 'nginx' hands the transfer to nginx with X-Accel-Redirect, 'sendfile' to Apache/lighttpd/Caddy
+# with X-Sendfile; 'django' streams it from the worker (development, or no proxy in front)
+MEDIA_SERVE_BACKEND = os.getenv('MEDIA_SERVE_BACKEND', 'django')
+# nginx 'internal' location aliased to MEDIA_ROOT, used with MEDIA_SERVE_BACKEND=nginx
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+# Browser cache lifetime of content-hashed image derivatives
+MEDIA_IMMUTABLE_MAX_AGE = int(os.getenv('MEDIA_IMMUTABLE_MAX_AGE', str(60 * 60 * 24 * 365)))
+
 # Cloudinary Configuration for persistent media storage
 CLOUDINARY_STORAGE = {
     'CLOUD_NAME': os.getenv('CLOUDINARY_CLOUD_NAME', ''),
@@ -278,13 +326,59 @@ ACCOUNT_ADAPTER = 'users.adapters.CustomAccountAdapter'  # Use custom adapter fo
 PASSWORD_RESET_TIMEOUT = 3600  # 1 hour
 
 
+# Caches
+# The 'sessions' cache is process-local unless SESSION_CACHE_BACKEND/SESSION_CACHE_LOCATION
+# point at a shared cache (e.g. django.core.cache.backends.redis.RedisCache). Use a shared
+# cache with SESSION_BACKEND=cached_db when running more than one worker process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'default',
+    },
+    'sessions': {
+        'BACKEND': os.getenv('SESSION_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('SESSION_CACHE_LOCATION', 'sessions'),
+    },
+    # Rate limit counters. locmem is per process: with several workers point this at
+    # a shared cache (e.g. RATELIMIT_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache)
+    'ratelimit': {
+        'BACKEND': os.getenv('RATELIMIT_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('RATELIMIT_CACHE_LOCATION', 'ratelimit'),
+    },
+}
+
+# Rate limiting (core/ratelimit.py)
+# Checked against the cache before any database query or password hash is computed.
+RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'True') == 'True'
+RATELIMIT_CACHE = 'ratelimit'
+# Number of reverse proxies that append to X-Forwarded-For (Render runs one)
+RATELIMIT_PROXY_COUNT = int(os.getenv('RATELIMIT_PROXY_COUNT', '1' if os.getenv('RENDER_EXTERNAL_HOSTNAME') else '0'))
+# "<count>/<period>" with period in s, m, h or d, optionally prefixed by a multiplier ("5/15m")
+RATE_LIMITS = {
+    'login:ip': os.getenv('RATELIMIT_LOGIN_IP', '30/5m'),
+    'login:account': os.getenv('RATELIMIT_LOGIN_ACCOUNT', '5/15m'),
+    'signup_otp:ip': '10/h',
+    'signup_otp:email': '5/h',
+    'signup_otp:cooldown': '1/10s',
+    'signup_verify:email': '5/15m',
+    'reset_otp:ip': '10/h',
+    'reset_otp:email': '5/h',
+    'reset_otp:cooldown': '1/10s',
+    'reset_verify:email': '5/15m',
+    'generate:user': os.getenv('RATELIMIT_GENERATE', '10/10m'),
+}
+
 # Login/Logout URLs
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'home'
 LOGIN_URL = 'account_login'
 
 # Session Configuration
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # Store sessions in database
+# SESSION_BACKEND: 'db' stores sessions in the database, 'cached_db' puts a write-through
+# cache in front of it. Both skip the write when a request leaves the session data unchanged.
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'db')
+SESSION_ENGINE = f"core.session_backends.{'cached_db' if SESSION_BACKEND == 'cached_db' else 'db'}"
+SESSION_CACHE_ALIAS = 'sessions'
 SESSION_COOKIE_AGE = 1209600  # 2 weeks in seconds
 SESSION_SAVE_EVERY_REQUEST = False  # Only save if session is modified
 SESSION_COOKIE_NAME = 'sessionid'
@@ -306,7 +400,10 @@ EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 
 # Use SMTP if credentials are provided, otherwise use console backend
 if EMAIL_HOST_USER and EMAIL_HOST_PASSWORD:
-    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    # Pooled backend keeps authenticated SMTP connections open between sends
+    EMAIL_BACKEND = 'users.mail_backends.PooledSMTPEmailBackend'
+    if os.getenv('EMAIL_SMTP_POOL', 'True') != 'True':
+        EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
     EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
     EMAIL_PORT = int(os.getenv('EMAIL_PORT', '587'))
     EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
@@ -316,12 +413,42 @@ else:
     print("⚠️  Email not configured: Emails will be printed to console")
     print("   Set EMAIL_HOST_USER and EMAIL_HOST_PASSWORD to send real emails")
 
+# Outbound mail queue: send_mail() only stores the message (users/mail_queue.py) and a
+# background worker delivers it through EMAIL_DELIVERY_BACKEND with retries and backoff.
+EMAIL_QUEUE_ENABLED = os.getenv('EMAIL_QUEUE_ENABLED', 'True') == 'True'
+EMAIL_DELIVERY_BACKEND = EMAIL_BACKEND
+if EMAIL_QUEUE_ENABLED:
+    EMAIL_BACKEND = 'users.mail_backends.QueuedEmailBackend'
+# Deliver from a thread inside each web process; set to False when running `manage.py send_queued_mail --loop`
+EMAIL_QUEUE_WORKER_THREAD = os.getenv('EMAIL_QUEUE_WORKER_THREAD', 'True') == 'True'
+EMAIL_QUEUE_POLL_INTERVAL = int(os.getenv('EMAIL_QUEUE_POLL_INTERVAL', '10'))  # seconds
+EMAIL_QUEUE_MAX_ATTEMPTS = int(os.getenv('EMAIL_QUEUE_MAX_ATTEMPTS', '5'))
+EMAIL_QUEUE_RETRY_DELAY = int(os.getenv('EMAIL_QUEUE_RETRY_DELAY', '30'))  # seconds, doubled per attempt
+# SMTP connection pool (users.mail_backends.PooledSMTPEmailBackend), per process
+EMAIL_POOL_SIZE = int(os.getenv('EMAIL_POOL_SIZE', '4'))
+EMAIL_POOL_IDLE_TIMEOUT = int(os.getenv('EMAIL_POOL_IDLE_TIMEOUT', '60'))  # seconds before an idle connection is closed
+EMAIL_POOL_HEALTH_CHECK_INTERVAL = int(os.getenv('EMAIL_POOL_HEALTH_CHECK_INTERVAL', '15'))  # idle seconds before NOOP check
+
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER if EMAIL_HOST_USER else 'noreply@airesume.com')
 SERVER_EMAIL = os.getenv('SERVER_EMAIL', EMAIL_HOST_USER if EMAIL_HOST_USER else 'server@airesume.com')
 
 # OpenAI API Key (set in environment variables)
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 
+# Bulk export: number of worker processes rendering PDFs in parallel (1 = render inline).
+# The pool is created once per web worker process and shared by its exports.
+EXPORT_PDF_WORKERS = int(os.getenv('EXPORT_PDF_WORKERS', '2'))
+# Exports of one web worker that may use the pool at the same time; others render inline
+EXPORT_POOL_CONCURRENCY = int(os.getenv('EXPORT_POOL_CONCURRENCY', '1'))
+# Maximum number of documents queued or held in memory during an export
+EXPORT_MAX_IN_FLIGHT = int(os.getenv('EXPORT_MAX_IN_FLIGHT', str(max(EXPORT_PDF_WORKERS, 1) * 2)))
+
+# Expired OTP/session cleanup (see users/maintenance.py and `manage.py purge_expired`)
+# Run the purge in a background thread every N seconds (0 = disabled, use cron + purge_expired instead)
+MAINTENANCE_INTERVAL_SECONDS = int(os.getenv('MAINTENANCE_INTERVAL_SECONDS', '0'))
+# Maximum number of rows deleted per transaction
+MAINTENANCE_BATCH_SIZE = int(os.getenv('MAINTENANCE_BATCH_SIZE', '1000'))
+
 # Theme settings removed: site fixed to light theme and theme toggle removed
 
 # Security settings (only in production)
@@ -344,24 +471,80 @@ else:
     SESSION_COOKIE_SECURE = False
     CSRF_COOKIE_SECURE = False
 
+# Request metrics (core/metrics.py), exposed in Prometheus format at /metrics/
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+# Share of requests whose queries and template rendering are also timed (0 disables that).
+# Kept low so the per-query wrapper stays off almost every request; raise it while investigating.
+METRICS_SAMPLE_RATE = float(os.getenv('METRICS_SAMPLE_RATE', '0.01'))
+# Bearer token for scrapers; staff users can always read the endpoint
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Import the PDF and LLM libraries at startup rather than on first use (resume/engines.py);
+# worth it with gunicorn --preload, where forked workers share them
+PRELOAD_ENGINES = os.getenv('PRELOAD_ENGINES', 'False') == 'True'
+# Run the full warm-up (resume/warmup.py: templates, static manifest, lookup tables, fonts) in
+# ResumeConfig.ready(). Only for the web server with --preload: every manage.py command would pay
+# for it too. gunicorn.conf.py warms up the master without this setting. Either way the maintenance
+# scheduler (MAINTENANCE_INTERVAL_SECONDS) is not started in the master but by each worker's first request.
+WARMUP_ON_STARTUP = os.getenv('WARMUP_ON_STARTUP', 'False') == 'True'
+
+# Seconds a /readyz result (database, shared cache and PDF engine checks) is reused
+HEALTH_CHECK_CACHE_SECONDS = float(os.getenv('HEALTH_CHECK_CACHE_SECONDS', '5'))
+
+# On-demand request profiling for staff (?_profile=sample|cprofile), browsable at /admin/profiles/
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'True') == 'True'
+PROFILING_DIR = os.getenv('PROFILING_DIR', str(BASE_DIR / 'profiles'))
+# Captures kept on disk; older ones are deleted
+PROFILING_MAX_CAPTURES = int(os.getenv('PROFILING_MAX_CAPTURES', '50'))
+# Seconds between stack samples in 'sample' mode
+PROFILING_SAMPLE_INTERVAL = float(os.getenv('PROFILING_SAMPLE_INTERVAL', '0.005'))
+
+# Log query shapes repeated within one request (N+1 patterns); core/queries.py
+QUERY_INSPECTOR_ENABLED = os.getenv('QUERY_INSPECTOR_ENABLED', str(DEBUG)) == 'True'
+QUERY_INSPECTOR_REPEAT_THRESHOLD = int(os.getenv('QUERY_INSPECTOR_REPEAT_THRESHOLD', '3'))
+
 # Logging: ensure errors are visible in platform logs (console)
+# Log output: 'json' (one object per line, with request ids) or 'text'
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text' if DEBUG else 'json')
+# Records waiting for the background log writer; more are dropped (and counted) rather than blocking requests
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# At most LOG_RATE_LIMIT records below ERROR per logging call site every LOG_RATE_LIMIT_PERIOD seconds
+LOG_RATE_LIMIT = int(os.getenv('LOG_RATE_LIMIT', '20'))
+LOG_RATE_LIMIT_PERIOD = int(os.getenv('LOG_RATE_LIMIT_PERIOD', '60'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {
+            '()': 'core.log.RequestIdFilter',
+        },
+        'rate_limit': {
+            '()': 'core.log.RateLimitFilter',
+            'rate': LOG_RATE_LIMIT,
+            'period': LOG_RATE_LIMIT_PERIOD,
+        },
+    },
     'formatters': {
         'verbose': {
-            'format': '[{levelname}] {asctime} {module} {process:d} {thread:d} {message}',
+            'format': '[{levelname}] {asctime} {module} {process:d} {thread:d} {request_id} {message}',
             'style': '{',
         },
         'simple': {
             'format': '[{levelname}] {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'core.log.JSONFormatter',
+        },
     },
     'handlers': {
+        # Written by a background thread (core/log.py), so request threads never wait on stdout
         'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            'class': 'core.log.QueuedStreamHandler',
+            'queue_size': LOG_QUEUE_SIZE,
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'verbose',
+            'filters': ['request_id', 'rate_limit'],
         },
     },
     'root': {
@@ -374,10 +557,10 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
-        # Enable verbose logging for the mail backend to help diagnose SMTP issues
+        # Verbose mail backend logging helps diagnose SMTP issues during development
         'django.core.mail': {
             'handlers': ['console'],
-            'level': 'DEBUG',
+            'level': 'DEBUG' if DEBUG else 'INFO',
             'propagate': False,
         },
         'django.request': {
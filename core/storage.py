@@ -0,0 +1,78 @@
+"""
+Static files storage with a CSS optimization stage.
+
+OptimizedStaticFilesStorage runs before WhiteNoise's hashing and compression:
+the stylesheets listed in settings.STATIC_CSS_OPTIMIZE_FILES are purged of
+selectors the templates never use and minified (core/assets.py), so the
+hashed, Brotli and gzip variants are all produced from the smaller file.
+
+With STATIC_CRITICAL_CSS enabled it also writes "<name>.critical.css", the
+subset of each stylesheet used by base.html, for the {% stylesheet %} tag to
+inline.
+"""
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from . import assets
+
+logger = logging.getLogger(__name__)
+
+
+def critical_name(path):
+    """Return the static path of the critical CSS subset of `path`."""
+    root, ext = posixpath.splitext(path)
+    return f"{root}.critical{ext}"
+
+
+class OptimizedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    CompressedManifestStaticFilesStorage that purges and minifies the project CSS first.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run and getattr(settings, 'STATIC_CSS_OPTIMIZE', True):
+            paths = dict(paths)
+            self.optimize_css(paths)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def optimize_css(self, paths):
+        """
+        Overwrite the collected copies of the configured stylesheets with optimized CSS.
+
+        The source is read from the finder's storage rather than STATIC_ROOT, so
+        repeated collectstatic runs never optimize an already purged file.
+        """
+        targets = [path for path in getattr(settings, 'STATIC_CSS_OPTIMIZE_FILES', []) if path in paths]
+        if not targets:
+            return
+        used = assets.collect_used_names()
+        critical = getattr(settings, 'STATIC_CRITICAL_CSS', False)
+        if critical:
+            base_used = assets.template_names(
+                str(settings.BASE_DIR / 'templates' / 'base.html'),
+                [settings.BASE_DIR / 'templates'],
+            )
+        for path in targets:
+            source_storage, source_path = paths[path]
+            with source_storage.open(source_path) as f:
+                original = f.read().decode('utf-8')
+            optimized = assets.purge_css(original, used)
+            self._replace(path, optimized)
+            # Hashing reads from the storage in `paths`: make it use the optimized copy
+            paths[path] = (self, path)
+            logger.info(
+                f"🎨 {path}: {len(original.encode())} -> {len(optimized.encode())} bytes after purge and minify"
+            )
+            if critical:
+                name = critical_name(path)
+                self._replace(name, assets.purge_css(original, base_used))
+                paths[name] = (self, name)
+
+    def _replace(self, path, content):
+        if self.exists(path):
+            self.delete(path)
+        self.save(path, ContentFile(content.encode('utf-8')))
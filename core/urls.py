@@ -1,11 +1,16 @@
 """
 URL configuration for core project.
 """
+import re
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.views.generic.base import RedirectView
 from django.conf import settings
 from django.conf.urls.static import static
+from core.health import healthz, readyz
+from core.media import serve_media
+from core.metrics import metrics_view
+from core.profiling import capture_download, capture_list
 from resume.password_reset_views import (
     PasswordResetRequestView,
     PasswordResetVerifyOTPView,
@@ -30,7 +35,12 @@ handler404 = 'core.error_handlers.handler404'
 handler500 = 'core.error_handlers.handler500'
 
 urlpatterns = [
+    path('admin/profiles/', capture_list, name='profile_capture_list'),
+    path('admin/profiles/<str:name>/', capture_download, name='profile_capture_download'),
     path('admin/', admin.site.urls),
+    path('metrics/', metrics_view, name='metrics'),
+    path('healthz', healthz, name='healthz'),
+    path('readyz', readyz, name='readyz'),
     
     # Diagnostic endpoints
     path('check-email-config/', check_email_config, name='check_email_config'),
@@ -62,9 +72,11 @@ urlpatterns = [
     path('', include('resume.urls')),
 ]
 
-# Serve media files in both development and production
-# For production: Consider using cloud storage (AWS S3, Cloudinary, etc.) for persistent storage
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Serve local media files in both development and production, to the users allowed to see them
+# (with Cloudinary configured, file URLs point at the CDN instead)
+urlpatterns += [
+    re_path(rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}(?P<path>.+)$', serve_media, name='serve_media'),
+]
 
 # Serve static files only in development (WhiteNoise handles in production)
 if settings.DEBUG:
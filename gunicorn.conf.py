@@ -0,0 +1,39 @@
+"""
+Gunicorn configuration, read automatically from the working directory:
+
+    gunicorn core.wsgi:application
+
+The master sets up Django and runs the warm-up (resume/warmup.py) before it
+forks, so workers share the compiled templates, lookup tables, PDF libraries
+and fonts copy-on-write, and serve their first request without building them.
+`python manage.py bench_warmup` measures the per-worker memory this saves.
+
+Nothing that starts threads or holds connections may run in the master:
+connections are closed after the warm-up, and the maintenance scheduler
+(MAINTENANCE_INTERVAL_SECONDS) is started by each worker's first request
+rather than by UsersConfig.ready(), so it never runs here.
+"""
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv('WEB_CONCURRENCY', '4'))
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))  # PDF rendering and AI generation can be slow
+# Restart workers now and then to bound memory growth; jitter avoids restarting them all at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', None)
+# Warm up the master before forking workers (set to False to boot workers cold)
+warmup = os.getenv('GUNICORN_WARMUP', 'True') == 'True'
+
+
+def on_starting(server):
+    if not warmup:
+        return
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    import django
+    django.setup()
+
+    from resume.warmup import warm_up
+    timings = warm_up()
+    server.log.info(f"Warmed up the master in {sum(timings.values()):.0f} ms")
@@ -21,6 +21,7 @@ class ProfileAdmin(admin.ModelAdmin):
         'created_at',
         'updated_at'
     ]
+    list_select_related = ['user']
     search_fields = ['user__email', 'user__first_name', 'user__last_name', 'location', 'summary']
     list_filter = ['created_at', 'updated_at']
     readonly_fields = ['created_at', 'updated_at', 'get_user_link']
@@ -68,6 +69,7 @@ class EducationAdmin(admin.ModelAdmin):
         'end_date',
         'created_at'
     ]
+    list_select_related = ['user']
     search_fields = ['user__email', 'user__first_name', 'user__last_name', 'institution', 'field_of_study', 'degree']
     list_filter = ['degree', 'start_date', 'end_date', 'created_at', 'currently_studying']
     readonly_fields = ['created_at', 'updated_at', 'get_user_link']
@@ -116,6 +118,7 @@ class ExperienceAdmin(admin.ModelAdmin):
         'currently_working_badge',
         'created_at'
     ]
+    list_select_related = ['user']
     search_fields = ['user__email', 'user__first_name', 'user__last_name', 'company', 'position']
     list_filter = ['employment_type', 'start_date', 'end_date', 'created_at', 'currently_working']
     readonly_fields = ['created_at', 'updated_at', 'get_user_link']
@@ -171,6 +174,7 @@ class ProjectAdmin(admin.ModelAdmin):
         'get_tech_count',
         'created_at'
     ]
+    list_select_related = ['user']
     search_fields = ['user__email', 'user__first_name', 'user__last_name', 'title', 'technologies']
     list_filter = ['start_date', 'end_date', 'created_at', 'currently_working']
     readonly_fields = ['created_at', 'updated_at', 'get_user_link']
@@ -220,6 +224,7 @@ class GeneratedResumeAdmin(admin.ModelAdmin):
         'title',
         'created_at'
     ]
+    list_select_related = ['user']
     search_fields = ['user__email', 'user__first_name', 'user__last_name', 'title']
     list_filter = ['created_at']
     readonly_fields = ['created_at', 'get_user_link']
@@ -261,6 +266,7 @@ class CoverLetterAdmin(admin.ModelAdmin):
         'position',
         'created_at'
     ]
+    list_select_related = ['user']
     search_fields = ['user__email', 'user__first_name', 'user__last_name', 'title', 'company_name', 'position']
     list_filter = ['created_at', 'company_name']
     readonly_fields = ['created_at', 'get_user_link']
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ResumeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'resume'
+
+    def ready(self):
+        # Build image derivatives when profile photos and thumbnails are uploaded
+        from . import images  # noqa: F401
+
+        # Load templates, lookup tables and the PDF/LLM libraries now, so a gunicorn
+        # --preload master shares them with its workers (resume/warmup.py)
+        if settings.WARMUP_ON_STARTUP:
+            from . import warmup
+            warmup.warm_up()
+        # Or only import WeasyPrint, ReportLab and OpenAI now instead of on first use (resume/engines.py)
+        elif settings.PRELOAD_ENGINES:
+            from . import engines
+            engines.preload()
@@ -0,0 +1,119 @@
+"""
+Conditional GET for the resume, cover letter and portfolio pages and their PDFs.
+
+Generated resumes and cover letters never change after creation, and the
+portfolio only changes when one of the user's records does, so each view gets
+an ETag and Last-Modified computed from timestamps (without loading the
+content) and revalidating clients get a 304 instead of a re-rendered page or
+PDF.
+
+The validators also cover everything else that shapes the output: the user's
+own details, the templates and PDF code (render_version), the CSRF cookie
+embedded in pages and any flash messages waiting to be shown.
+"""
+import hashlib
+import os
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .models import CoverLetter, Education, Experience, GeneratedResume, Profile, Project
+
+_render_version = None
+
+
+def render_version():
+    """
+    Fingerprint of the templates, the PDF code and the collected static files.
+
+    Computed once per process (every time under DEBUG, where templates are
+    edited in place), so a deploy changing any of them changes every ETag.
+    """
+    global _render_version
+    if _render_version is None or settings.DEBUG:
+        from . import engines, utils
+
+        paths = [utils.__file__, os.path.join(settings.STATIC_ROOT, 'staticfiles.json')]
+        for directory in settings.TEMPLATES[0]['DIRS']:
+            for root, dirs, names in os.walk(directory):
+                paths.extend(os.path.join(root, name) for name in names)
+        # Which PDF engines are installed, without importing them
+        digest = hashlib.sha1(f"{engines.weasyprint.installed()}:{engines.reportlab.installed()}".encode())
+        for path in sorted(paths):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            digest.update(f"{path}:{st.st_mtime_ns}:{st.st_size}".encode())
+        _render_version = digest.hexdigest()[:16]
+    return _render_version
+
+
+def portfolio_state(request):
+    """Latest update and row count of every model the portfolio shows, in one query."""
+    annotations = {}
+    for prefix, model in (('profile', Profile), ('education', Education),
+                          ('experience', Experience), ('project', Project)):
+        rows = model.objects.filter(user=OuterRef('pk')).order_by().values('user')
+        annotations[f'{prefix}_updated'] = Subquery(rows.annotate(latest=Max('updated_at')).values('latest'))
+        annotations[f'{prefix}_count'] = Subquery(rows.annotate(count=Count('pk')).values('count'))
+    values = get_user_model().objects.filter(pk=request.user.pk).annotate(**annotations).values(*annotations).get()
+    timestamps = [value for key, value in values.items() if key.endswith('_updated')]
+    return sorted(values.items()), max(filter(None, timestamps), default=None)
+
+
+def resume_state(request, pk):
+    row = GeneratedResume.objects.filter(pk=pk, user=request.user).values_list('created_at', 'template').first()
+    return (row, row[0]) if row else None
+
+
+def cover_letter_state(request, pk):
+    row = CoverLetter.objects.filter(pk=pk, user=request.user).values_list('created_at', 'template').first()
+    return (row, row[0]) if row else None
+
+
+def conditional_view(state_func, page=True):
+    """
+    Decorator adding ETag/Last-Modified validation to a view of the current user's data.
+
+    `state_func(request, *args, **kwargs)` returns (parts, last_modified) for
+    the requested object, computed cheaply, or None if it does not exist (the
+    view then runs and reports the 404). `parts` is anything whose repr()
+    changes with the output. With `page` set, the response is an HTML page
+    that embeds the CSRF token and shows flash messages.
+    """
+    def validators(request, *args, **kwargs):
+        if not hasattr(request, '_conditional_validators'):
+            request._conditional_validators = None
+            state = state_func(request, *args, **kwargs)
+            if state is not None and not (page and len(messages.get_messages(request))):
+                parts, last_modified = state
+                key = [
+                    render_version(), request.user.pk, request.user.updated_at, parts,
+                    sorted(request.GET.items()),
+                    request.META.get('CSRF_COOKIE', '') if page else '',
+                ]
+                last_modified = max(filter(None, (last_modified, request.user.updated_at)), default=None)
+                etag = f'W/"{hashlib.sha1(repr(key).encode()).hexdigest()}"'
+                request._conditional_validators = (etag, last_modified)
+        return request._conditional_validators
+
+    def etag_func(request, *args, **kwargs):
+        result = validators(request, *args, **kwargs)
+        return result[0] if result else None
+
+    def last_modified_func(request, *args, **kwargs):
+        result = validators(request, *args, **kwargs)
+        return result[1] if result else None
+
+    def decorator(view_func):
+        # Per-user content: browsers may keep it but must revalidate, shared caches must not store it
+        return wraps(view_func)(
+            cache_control(private=True, no_cache=True)(condition(etag_func, last_modified_func)(view_func))
+        )
+    return decorator
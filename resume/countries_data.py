@@ -603,3 +603,22 @@ PHONE_CODES = [
     ('+260', '🇿🇲 +260 (ZM)'),
     ('+263', '🇿🇼 +263 (ZW)'),
 ]
+
+# Postal abbreviations accepted in place of state names (e.g. "San Francisco, CA, United States")
+STATE_ABBREVIATIONS = {
+    'United States': [
+        'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS',
+        'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY',
+        'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV',
+        'WI', 'WY', 'DC',
+    ],
+    'Canada': ['AB', 'BC', 'MB', 'NB', 'NL', 'NT', 'NS', 'NU', 'ON', 'PE', 'QC', 'SK', 'YT'],
+    'Australia': ['ACT', 'NSW', 'NT', 'QLD', 'SA', 'TAS', 'VIC', 'WA'],
+}
+
+# Precomputed lookups for validating submitted locations; states are compared case-insensitively
+COUNTRY_NAMES = frozenset(code for code, label in COUNTRIES if code)
+STATE_NAMES_BY_COUNTRY = {
+    country: frozenset(state.casefold() for state in states + STATE_ABBREVIATIONS.get(country, []))
+    for country, states in STATES_BY_COUNTRY.items()
+}
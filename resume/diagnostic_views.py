@@ -14,6 +14,7 @@ def config_check(request):
     
     config_info = {
         "email_backend": settings.EMAIL_BACKEND,
+        "email_delivery_backend": getattr(settings, 'EMAIL_DELIVERY_BACKEND', settings.EMAIL_BACKEND),
         "email_host": getattr(settings, 'EMAIL_HOST', 'Not set'),
         "email_port": getattr(settings, 'EMAIL_PORT', 'Not set'),
         "email_host_user_set": bool(getattr(settings, 'EMAIL_HOST_USER', '')),
@@ -32,14 +33,17 @@ def config_check(request):
 def test_email_quick(request):
     """Quick test to send an email"""
     from django.core.mail import send_mail
+    from users.mail_queue import get_delivery_connection
     
     try:
+        # Bypass the outbound mail queue so delivery errors are reported here
         send_mail(
             'Test Email from Render',
             'This is a test email to verify email configuration.',
             settings.DEFAULT_FROM_EMAIL,
             ['mpandat0052@gmail.com'],
             fail_silently=False,
+            connection=get_delivery_connection(),
         )
         return JsonResponse({
             "status": "success",
@@ -14,6 +14,7 @@ def check_email_config(request):
     """
     config = {
         'email_backend': settings.EMAIL_BACKEND,
+        'email_delivery_backend': getattr(settings, 'EMAIL_DELIVERY_BACKEND', settings.EMAIL_BACKEND),
         'email_host': getattr(settings, 'EMAIL_HOST', 'Not set'),
         'email_port': getattr(settings, 'EMAIL_PORT', 'Not set'),
         'email_use_tls': getattr(settings, 'EMAIL_USE_TLS', 'Not set'),
@@ -26,7 +27,7 @@ def check_email_config(request):
     is_configured = (
         settings.EMAIL_HOST_USER and 
         settings.EMAIL_HOST_PASSWORD and
-        'smtp' in settings.EMAIL_BACKEND.lower()
+        'smtp' in getattr(settings, 'EMAIL_DELIVERY_BACKEND', settings.EMAIL_BACKEND).lower()
     )
     
     config['is_properly_configured'] = is_configured
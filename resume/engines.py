@@ -0,0 +1,115 @@
+"""
+Lazy loading of the heavy PDF and LLM libraries.
+
+WeasyPrint (with its Pango/font stack), ReportLab and the OpenAI client take
+several hundred milliseconds to import. They are imported on first use
+instead of when resume.utils or resume.services is imported, so worker boot
+and management commands that never render a PDF or call the API skip that
+cost.
+
+With PRELOAD_ENGINES set, ResumeConfig.ready() imports them up front: under
+gunicorn --preload that happens once in the master, and the forked workers
+share the loaded modules copy-on-write.
+"""
+import importlib.util
+import logging
+import threading
+import time
+from types import SimpleNamespace
+
+logger = logging.getLogger(__name__)
+
+
+class LazyEngine:
+    """
+    A library imported on first use.
+
+    `loader` does the imports and returns a namespace of the names callers
+    need. An import that fails (ImportError, or OSError for missing native
+    libraries) marks the engine unavailable; it is not retried.
+    """
+
+    def __init__(self, name, package, loader):
+        self.name = name
+        self.package = package
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._api = None
+        self.error = None
+        self.import_ms = None
+
+    def load(self):
+        """Import the library if needed; returns its namespace, or None if it is unavailable."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    start = time.perf_counter()
+                    try:
+                        self._api = self._loader()
+                    except (ImportError, OSError) as e:
+                        self.error = str(e).splitlines()[0] if str(e) else type(e).__name__
+                        logger.warning(f"⚠️ {self.name} is unavailable: {self.error}")
+                    self.import_ms = round((time.perf_counter() - start) * 1000, 1)
+                    self._loaded = True
+        return self._api
+
+    @property
+    def available(self):
+        return self.load() is not None
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def installed(self):
+        """Whether the package is installed, without importing it (it may still fail to load)."""
+        return importlib.util.find_spec(self.package) is not None
+
+    def status(self):
+        return {
+            'installed': self.installed(),
+            'loaded': self._loaded,
+            'available': self._api is not None if self._loaded else None,
+            'import_ms': self.import_ms,
+            'error': self.error,
+        }
+
+
+def _load_weasyprint():
+    from weasyprint import CSS, HTML
+    from weasyprint.text.fonts import FontConfiguration
+    return SimpleNamespace(HTML=HTML, CSS=CSS, FontConfiguration=FontConfiguration)
+
+
+def _load_reportlab():
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+    return SimpleNamespace(A4=A4, ParagraphStyle=ParagraphStyle, getSampleStyleSheet=getSampleStyleSheet,
+                           Paragraph=Paragraph, SimpleDocTemplate=SimpleDocTemplate, Spacer=Spacer)
+
+
+def _load_openai():
+    from openai import OpenAI
+    return SimpleNamespace(OpenAI=OpenAI)
+
+
+weasyprint = LazyEngine('WeasyPrint', 'weasyprint', _load_weasyprint)
+reportlab = LazyEngine('ReportLab', 'reportlab', _load_reportlab)
+openai = LazyEngine('OpenAI', 'openai', _load_openai)
+
+ENGINES = {'weasyprint': weasyprint, 'reportlab': reportlab, 'openai': openai}
+
+
+def preload():
+    """Import every engine now (e.g. in the gunicorn master before it forks workers)."""
+    start = time.perf_counter()
+    for engine in ENGINES.values():
+        engine.load()
+    logger.info(f"📦 Preloaded PDF and LLM libraries in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def status():
+    """Load state of every engine, without importing anything."""
+    return {name: engine.status() for name, engine in ENGINES.items()}
@@ -0,0 +1,260 @@
+"""
+Streaming bulk export of a user's documents as a ZIP archive.
+
+The archive is produced incrementally: each PDF is rendered (optionally in a
+pool of worker processes), written into the ZIP stream and handed to the client
+before the next one is collected, so memory stays bounded by the number of
+renders in flight rather than by the number of documents the user owns.
+
+The process pool is created once per web worker process and shared by its
+exports; at most EXPORT_POOL_CONCURRENCY exports use it at a time and any
+further concurrent export renders in its own thread instead of starting more.
+Worker processes are started from a forkserver (spawn where unavailable)
+rather than forked from the multi-threaded web worker.
+"""
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Profile, Education, Experience, Project, GeneratedResume, CoverLetter
+from .utils import (
+    render_pdf_bytes,
+    format_resume_for_pdf,
+    format_cover_letter_for_pdf,
+    create_portfolio_html,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ZipStreamBuffer:
+    """
+    Minimal write-only file object used as the ZipFile target.
+
+    It deliberately has no tell()/seek() so zipfile switches to its streaming
+    mode (data descriptors after each member). Written bytes are collected until
+    drain() hands them to the response generator.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def get_profile_data(user):
+    """
+    Collect the user's profile data as a JSON-serializable dictionary.
+    """
+    profile = Profile.objects.filter(user=user).values(
+        'career_objective', 'summary', 'skills', 'linkedin_url',
+        'github_url', 'portfolio_url', 'location', 'created_at', 'updated_at',
+    ).first()
+    excluded = ('id', 'user_id', 'thumbnail_derivatives')
+
+    def rows(model):
+        return [
+            {key: value for key, value in row.items() if key not in excluded}
+            for row in model.objects.filter(user=user).values()
+        ]
+
+    return {
+        'exported_at': timezone.now(),
+        'user': {
+            'email': user.email,
+            'username': user.username,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'phone': user.phone or '',
+        },
+        'profile': profile,
+        'education': rows(Education),
+        'experience': rows(Experience),
+        'projects': rows(Project),
+    }
+
+
+def iter_export_jobs(user):
+    """
+    Yield (archive name, HTML content, template) for every document of the user.
+
+    Querysets are consumed with iterator() so large collections are never fully
+    materialized.
+    """
+    yield 'portfolio.pdf', create_portfolio_html(user), 'modern'
+
+    resumes = GeneratedResume.objects.filter(user=user).order_by('created_at')
+    for resume in resumes.iterator(chunk_size=50):
+        template = resume.template or 'modern'
+        name = f"resumes/{resume.pk}_{slugify(resume.title)[:60] or 'resume'}.pdf"
+        yield name, format_resume_for_pdf(user, resume.content), template
+
+    cover_letters = CoverLetter.objects.filter(user=user).order_by('created_at')
+    for cover_letter in cover_letters.iterator(chunk_size=50):
+        template = cover_letter.template or 'classic'
+        name = f"cover_letters/{cover_letter.pk}_{slugify(cover_letter.company_name)[:60] or 'cover-letter'}.pdf"
+        yield name, format_cover_letter_for_pdf(user, cover_letter), template
+
+
+def _render_job(html_content, template):
+    """Worker entry point: render one document to PDF bytes."""
+    return render_pdf_bytes(html_content, template)
+
+
+_pool_lock = threading.Lock()
+_pool = None  # (pid, workers, executor) of this process
+_pool_slots = None  # (pid, limit, semaphore)
+
+
+def _get_pool(workers):
+    """
+    Return this process's shared render pool, creating it on first use.
+
+    The owning pid is checked so a process forked after the pool was created
+    (e.g. a gunicorn worker of a preloaded master) builds its own instead of
+    using one whose worker processes belong to the parent.
+
+    Forking a process that runs other threads can copy locks held mid-operation
+    into the child, so workers come from a forkserver (or spawn) and set up
+    Django themselves before their first render.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool[0] != os.getpid() or _pool[1] != workers:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(method),
+                initializer=django.setup,
+            )
+            _pool = (os.getpid(), workers, executor)
+        return _pool[2]
+
+
+def _discard_pool(executor):
+    """Drop a broken pool so the next export starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool[2] is executor:
+            _pool = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _pool_semaphore():
+    """Semaphore limiting how many exports of this process use the pool at once."""
+    global _pool_slots
+    limit = max(1, getattr(settings, 'EXPORT_POOL_CONCURRENCY', 1))
+    with _pool_lock:
+        if _pool_slots is None or _pool_slots[0] != os.getpid() or _pool_slots[1] != limit:
+            _pool_slots = (os.getpid(), limit, threading.BoundedSemaphore(limit))
+        return _pool_slots[2]
+
+
+def iter_rendered_documents(jobs, workers=None, max_in_flight=None):
+    """
+    Render export jobs to PDF, yielding (archive name, data) in submission order.
+
+    With more than one worker, renders run in the shared process pool, but
+    never more than `max_in_flight` documents are queued or held in memory at
+    once. When the pool is busy with other exports, documents are rendered in
+    this thread. When no PDF engine is available the HTML source is exported
+    instead.
+    """
+    if workers is None:
+        workers = getattr(settings, 'EXPORT_PDF_WORKERS', 2)
+    if max_in_flight is None:
+        max_in_flight = getattr(settings, 'EXPORT_MAX_IN_FLIGHT', max(workers, 1) * 2)
+
+    def finish(name, html_content, pdf_content):
+        if pdf_content is None:
+            return name[:-len('.pdf')] + '.html', html_content.encode('utf-8')
+        return name, pdf_content
+
+    slots = _pool_semaphore() if workers > 1 else None
+    if slots is None or not slots.acquire(blocking=False):
+        for name, html_content, template in jobs:
+            yield finish(name, html_content, _render_job(html_content, template))
+        return
+
+    executor = _get_pool(workers)
+    pending = deque()
+
+    def collect():
+        name, html_content, template, future = pending.popleft()
+        try:
+            pdf_content = future.result()
+        except BrokenProcessPool:
+            # A pool process died (e.g. killed for memory): render this one here
+            # and let the next export start a fresh pool
+            logger.warning("⚠️ Export render pool broke; rendering in-process")
+            _discard_pool(executor)
+            pdf_content = _render_job(html_content, template)
+        return finish(name, html_content, pdf_content)
+
+    try:
+        for name, html_content, template in jobs:
+            try:
+                future = executor.submit(_render_job, html_content, template)
+            except BrokenProcessPool:
+                _discard_pool(executor)
+                executor = _get_pool(workers)
+                future = executor.submit(_render_job, html_content, template)
+            pending.append((name, html_content, template, future))
+            if len(pending) >= max_in_flight:
+                yield collect()
+        while pending:
+            yield collect()
+    finally:
+        # Also runs when the client disconnects and the generator is closed early;
+        # the pool itself is shared and stays up
+        for *_, future in pending:
+            future.cancel()
+        slots.release()
+
+
+def stream_user_export(user, workers=None):
+    """
+    Generate the bytes of a ZIP archive containing all of the user's documents.
+
+    Each member is flushed to the caller as soon as it has been written, which
+    makes this suitable as the iterator of a StreamingHttpResponse.
+    """
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w') as archive:
+        profile_json = json.dumps(get_profile_data(user), cls=DjangoJSONEncoder, indent=2)
+        archive.writestr('profile.json', profile_json, compress_type=zipfile.ZIP_DEFLATED)
+        yield buffer.drain()
+
+        count = 0
+        for name, data in iter_rendered_documents(iter_export_jobs(user), workers=workers):
+            # PDFs are already compressed; storing them avoids wasted CPU
+            compress_type = zipfile.ZIP_DEFLATED if name.endswith('.html') else zipfile.ZIP_STORED
+            archive.writestr(name, data, compress_type=compress_type)
+            count += 1
+            yield buffer.drain()
+
+    # Central directory written on close
+    yield buffer.drain()
+    logger.info(f"Exported {count} document(s) for user {user.pk}")
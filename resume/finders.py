@@ -0,0 +1,77 @@
+"""
+Static files finder for assets generated from Python data.
+
+resume/data/countries.json is written from resume.countries_data into
+settings.GENERATED_STATIC_ROOT the first time the finder is used (by
+collectstatic, or by the static view during development), so the table is
+serialized once per build instead of being inlined into every form page.
+CompressedManifestStaticFilesStorage then gives the collected file a content
+hash and precompressed .gz/.br copies, which WhiteNoise serves with a
+far-future, immutable Cache-Control header.
+"""
+import json
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import BaseFinder
+from django.core.files.storage import FileSystemStorage
+
+from .countries_data import STATES_BY_COUNTRY
+
+
+def build_countries_json():
+    """Serialize the states/provinces of each country for the location form scripts."""
+    return json.dumps(STATES_BY_COUNTRY, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+
+# Static path -> function returning the file contents
+GENERATED_ASSETS = {
+    'resume/data/countries.json': build_countries_json,
+}
+
+
+class GeneratedAssetsFinder(BaseFinder):
+    """
+    Expose GENERATED_ASSETS as static files, (re)building them on first use.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.location = str(settings.GENERATED_STATIC_ROOT)
+        self.storage = FileSystemStorage(location=self.location)
+        self._built = False
+
+    def build(self):
+        """Write every generated asset whose contents changed; return the paths written."""
+        written = []
+        for path, generate in GENERATED_ASSETS.items():
+            content = generate().encode('utf-8')
+            full_path = os.path.join(self.location, path)
+            try:
+                with open(full_path, 'rb') as existing:
+                    if existing.read() == content:
+                        continue
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            # Keep the file untouched when nothing changed so its mtime stays stable
+            with open(full_path, 'wb') as f:
+                f.write(content)
+            written.append(path)
+        self._built = True
+        return written
+
+    def _ensure_built(self):
+        if not self._built:
+            self.build()
+
+    def find(self, path, all=False):
+        if path not in GENERATED_ASSETS:
+            return []
+        self._ensure_built()
+        full_path = os.path.join(self.location, path)
+        return [full_path] if all else full_path
+
+    def list(self, ignore_patterns):
+        self._ensure_built()
+        for path in GENERATED_ASSETS:
+            yield path, self.storage
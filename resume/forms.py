@@ -2,7 +2,25 @@ from django import forms
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Row, Column, Field
 from .models import Profile, Education, Experience, Project
-from .countries_data import COUNTRIES, STATES_BY_COUNTRY
+from .countries_data import COUNTRIES, COUNTRY_NAMES, STATE_NAMES_BY_COUNTRY
+
+
+def validate_location(form, cleaned_data):
+    """
+    Reject a state that is not listed for the selected country.
+
+    States are matched case-insensitively and may be postal abbreviations.
+    Countries without a states list accept any free-text state, and a state
+    left as it was on the saved instance is always accepted.
+    """
+    country = cleaned_data.get('country')
+    state = (cleaned_data.get('state') or '').strip()
+    states = STATE_NAMES_BY_COUNTRY.get(country)
+    if not state or states is None or state.casefold() in states:
+        return
+    if form.instance.pk and state == form.initial.get('state') and country == form.initial.get('country'):
+        return
+    form.add_error('state', f'Select a state/province from the list for {country}.')
 
 
 class ProfileForm(forms.ModelForm):
@@ -84,13 +102,18 @@ class ProfileForm(forms.ModelForm):
             elif len(location_parts) == 2:
                 self.initial['city'] = location_parts[0]
                 # Check if second part is a country or state
-                if location_parts[1] in [c[0] for c in COUNTRIES]:
+                if location_parts[1] in COUNTRY_NAMES:
                     self.initial['country'] = location_parts[1]
                 else:
                     self.initial['state'] = location_parts[1]
             else:
                 self.initial['city'] = self.instance.location
     
+    def clean(self):
+        cleaned_data = super().clean()
+        validate_location(self, cleaned_data)
+        return cleaned_data
+    
     def save(self, commit=True):
         instance = super().save(commit=False)
         # Combine city, state, and country into location
@@ -247,13 +270,18 @@ class ExperienceForm(forms.ModelForm):
             elif len(location_parts) == 2:
                 self.initial['city'] = location_parts[0]
                 # Check if second part is a country or state
-                if location_parts[1] in [c[0] for c in COUNTRIES]:
+                if location_parts[1] in COUNTRY_NAMES:
                     self.initial['country'] = location_parts[1]
                 else:
                     self.initial['state'] = location_parts[1]
             else:
                 self.initial['city'] = self.instance.location
     
+    def clean(self):
+        cleaned_data = super().clean()
+        validate_location(self, cleaned_data)
+        return cleaned_data
+    
     def save(self, commit=True):
         instance = super().save(commit=False)
         # Combine city, state, and country into location
@@ -361,3 +389,23 @@ class CoverLetterForm(forms.Form):
         }),
         help_text='Optional: Paste the job description to get a more tailored cover letter'
     )
+
+
+class ProfileImportForm(forms.Form):
+    """
+    Form for uploading a JSON Resume document or LinkedIn data export.
+    """
+    file = forms.FileField(
+        label='File',
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.json,.zip,.csv'
+        }),
+        help_text='JSON Resume (.json), LinkedIn data export (.zip) or Education/Positions/Projects CSV'
+    )
+    
+    def clean_file(self):
+        uploaded = self.cleaned_data['file']
+        if uploaded.size > 5 * 1024 * 1024:
+            raise forms.ValidationError('File is too large. The maximum size is 5 MB.')
+        return uploaded
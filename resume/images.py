@@ -0,0 +1,231 @@
+"""
+Resized derivatives of uploaded images (profile photos, project thumbnails).
+
+Each original gets a set of smaller WebP and JPEG copies, one per width of its
+kind (see VARIANTS), stored under DERIVATIVES_DIR with names derived from a
+hash of the original's content, so identical uploads share derivatives and
+the URLs can be cached forever. Derivatives are generated when the image is
+saved (see the post_save receivers below) or, for files uploaded before, on
+first use.
+
+The list of derivatives of an original (its manifest) is stored on the model,
+in the JSON field named after the image field with a `_derivatives` suffix,
+so pages don't touch the storage (or Cloudinary) once it has been built, in
+any worker or after a restart.
+"""
+import base64
+import hashlib
+import logging
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Project
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_DIR = 'image_derivatives'
+
+# kind -> (widths in pixels, crop to a square)
+VARIANTS = {
+    'avatar': ((96, 192, 384), True),
+    'thumbnail': ((320, 640, 960), False),
+}
+
+# Output formats, preferred first; JPEG is the fallback every browser and PDF engine reads
+FORMATS = (
+    ('webp', 'image/webp', {'quality': 80, 'method': 4}),
+    ('jpeg', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+CACHE_PREFIX = 'imgderiv:'
+# Manifests of images whose model has no manifest field live in the cache only
+CACHE_TIMEOUT = 60 * 60 * 24 * 30
+# Files that are not images are not retried for this long
+INVALID_IMAGE_CACHE_TIMEOUT = 60 * 10
+
+
+def _cache_key(name, kind):
+    return f"{CACHE_PREFIX}{kind}:{hashlib.sha1(name.encode()).hexdigest()}"
+
+
+def derivative_name(digest, kind, width, ext):
+    """Storage name of one derivative."""
+    return f"{DERIVATIVES_DIR}/{kind}/{digest[:20]}_{width}.{ext}"
+
+
+def _resize(image, width, square):
+    from PIL import Image, ImageOps
+
+    if square:
+        return ImageOps.fit(image, (width, width), Image.LANCZOS)
+    if image.width <= width:
+        return image.copy()
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def _encode(image, ext, options):
+    buffer = BytesIO()
+    if ext == 'jpeg' and image.mode not in ('RGB', 'L'):
+        # JPEG has no alpha channel: flatten onto white
+        from PIL import Image
+
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.convert('RGBA').getchannel('A'))
+        image = background
+    image.save(buffer, format=ext.upper(), **options)
+    return buffer.getvalue()
+
+
+def build_derivatives(fieldfile, kind):
+    """
+    Generate the missing derivatives of `fieldfile` and return their manifest.
+
+    The manifest maps each format extension to a list of (width, storage name),
+    smallest first. Returns {} if the file is not an image or too large to
+    decode safely, and None if it could not be read (e.g. a storage error), so
+    the caller can retry later.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    widths, square = VARIANTS[kind]
+    try:
+        with fieldfile.storage.open(fieldfile.name, 'rb') as f:
+            data = f.read()
+        image = ImageOps.exif_transpose(Image.open(BytesIO(data)))
+        image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, ValueError) as e:
+        # DecompressionBombError: dimensions beyond Image.MAX_IMAGE_PIXELS, refused before decoding
+        logger.warning(f"⚠️ {fieldfile.name} is not a usable image: {e}")
+        return {}
+    except OSError as e:
+        logger.warning(f"⚠️ Cannot build image derivatives for {fieldfile.name}: {e}")
+        return None
+
+    digest = hashlib.sha256(data).hexdigest()
+    if image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    manifest = {}
+    for ext, content_type, options in FORMATS:
+        entries = []
+        for width in widths:
+            if not square and entries and entries[-1][0] >= image.width:
+                # Never upscale: the original's own width was already produced
+                break
+            name = derivative_name(digest, kind, width, ext)
+            if not default_storage.exists(name):
+                resized = _resize(image, width, square)
+                saved_name = default_storage.save(name, ContentFile(_encode(resized, ext, options)))
+                if saved_name != name:
+                    # Lost a race with another worker producing the same file
+                    default_storage.delete(saved_name)
+            entries.append((min(width, image.width) if not square else width, name))
+        manifest[ext] = entries
+    logger.info(f"🖼️ Image derivatives ready for {fieldfile.name} ({kind})")
+    return manifest
+
+
+def _manifest_field(fieldfile):
+    """Name of the model field holding the manifest of `fieldfile`, or None if there is none."""
+    name = f"{fieldfile.field.name}_derivatives"
+    instance = getattr(fieldfile, 'instance', None)
+    return name if instance is not None and instance.pk and hasattr(instance, name) else None
+
+
+def _store_manifest(fieldfile, kind, manifest):
+    field = _manifest_field(fieldfile)
+    if field is None:
+        cache.set(_cache_key(fieldfile.name, kind), manifest, CACHE_TIMEOUT)
+        return
+    record = {'name': fieldfile.name, 'formats': manifest}
+    instance = fieldfile.instance
+    # A queryset update: no save signals, no updated_at bump, and nothing is written
+    # if the image was replaced in the meantime
+    type(instance)._default_manager.filter(
+        pk=instance.pk, **{fieldfile.field.name: fieldfile.name}
+    ).update(**{field: record})
+    setattr(instance, field, record)
+
+
+def get_derivatives(fieldfile, kind):
+    """
+    Return the derivative manifest of `fieldfile`, building it on first use.
+
+    Returns None when there is no file or it is not a readable image.
+    """
+    if not fieldfile:
+        return None
+    field = _manifest_field(fieldfile)
+    record = getattr(fieldfile.instance, field) if field else None
+    if record and record.get('name') == fieldfile.name:
+        return record['formats'] or None
+
+    key = _cache_key(fieldfile.name, kind)
+    manifest = cache.get(key)
+    if manifest is not None:
+        return manifest or None
+    manifest = build_derivatives(fieldfile, kind)
+    if manifest is None:
+        # Possibly transient (storage unavailable): try again on the next use
+        return None
+    if not manifest:
+        cache.set(key, manifest, INVALID_IMAGE_CACHE_TIMEOUT)
+        return None
+    _store_manifest(fieldfile, kind, manifest)
+    return manifest
+
+
+def derivative_srcset(entries):
+    """Format manifest entries as a srcset attribute value."""
+    return ', '.join(f"{default_storage.url(name)} {width}w" for width, name in entries)
+
+
+def best_entry(entries, width):
+    """Return the smallest entry at least `width` pixels wide, or the largest available."""
+    for entry in entries:
+        if entry[0] >= width:
+            return entry
+    return entries[-1]
+
+
+def image_data_uri(fieldfile, kind, width):
+    """
+    Return a JPEG data: URI of the derivative closest to `width`, for embedding in PDFs.
+
+    Returns None if no derivative is available.
+    """
+    manifest = get_derivatives(fieldfile, kind)
+    if not manifest or not manifest.get('jpeg'):
+        return None
+    name = best_entry(manifest['jpeg'], width)[1]
+    try:
+        with default_storage.open(name, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        logger.warning(f"⚠️ Cannot read image derivative {name}: {e}")
+        return None
+    return f"data:image/jpeg;base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def _build_after_commit(fieldfile, kind, update_fields):
+    # Saves that don't touch the image (e.g. last_login updates) are skipped
+    if fieldfile and (update_fields is None or fieldfile.field.name in update_fields):
+        transaction.on_commit(lambda: get_derivatives(fieldfile, kind))
+
+
+@receiver(post_save, sender=get_user_model())
+def _profile_photo_saved(sender, instance, update_fields=None, **kwargs):
+    _build_after_commit(instance.profile_photo, 'avatar', update_fields)
+
+
+@receiver(post_save, sender=Project)
+def _project_thumbnail_saved(sender, instance, update_fields=None, **kwargs):
+    _build_after_commit(instance.thumbnail, 'thumbnail', update_fields)
@@ -0,0 +1,419 @@
+"""
+Bulk import of education, experience and project entries.
+
+Supported sources:
+- JSON Resume documents (https://jsonresume.org/schema/)
+- LinkedIn data exports: the full ZIP archive or one of its
+  Education.csv / Positions.csv / Projects.csv files
+
+Every entry is validated with the same ModelForms used by the add views and
+all valid entries are written with bulk_create() inside a single transaction.
+"""
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime
+
+from django.db import transaction
+
+from .countries_data import COUNTRY_NAMES
+from .forms import EducationForm, ExperienceForm, ProjectForm
+from .models import Education, Experience, Project
+
+# Upper bound on entries accepted from one upload
+MAX_IMPORT_ENTRIES = 500
+
+# Upper bound on the uncompressed size of one CSV inside a LinkedIn ZIP archive;
+# the upload size limit does not bound what a (malicious) archive expands to
+MAX_ARCHIVE_MEMBER_SIZE = 2 * 1024 * 1024
+
+DATE_FORMATS = ['%Y-%m-%d', '%Y-%m', '%Y', '%b %Y', '%B %Y', '%m/%Y', '%m/%d/%Y', '%d %b %Y']
+
+DEGREE_KEYWORDS = [
+    ('phd', ['phd', 'ph.d', 'doctor']),
+    ('master', ['master', 'msc', 'm.sc', 'mba', 'm.s.', 'm.tech', 'meng']),
+    ('bachelor', ['bachelor', 'bsc', 'b.sc', 'b.s.', 'b.a.', 'b.tech', 'btech', 'beng', 'undergraduate']),
+    ('associate', ['associate']),
+    ('diploma', ['diploma']),
+    ('certificate', ['certificate', 'certification']),
+    ('high_school', ['high school', 'secondary']),
+]
+
+LINKEDIN_FILES = {
+    'education.csv': 'education',
+    'positions.csv': 'experience',
+    'projects.csv': 'projects',
+}
+
+
+class ImportFileError(ValueError):
+    """Raised when an uploaded file cannot be parsed."""
+
+
+class ImportResult:
+    """
+    Outcome of parsing and validating an import file.
+
+    Attributes:
+        entries: Dict of section -> list of normalized form data dicts
+        valid: Dict of section -> list of unsaved model instances
+        errors: List of (section, position, label, message) tuples
+    """
+
+    SECTIONS = ('education', 'experience', 'projects')
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.valid = {section: [] for section in self.SECTIONS}
+        self.errors = []
+
+    @property
+    def valid_count(self):
+        return sum(len(items) for items in self.valid.values())
+
+    @property
+    def total_count(self):
+        return sum(len(items) for items in self.entries.values())
+
+    def counts(self):
+        return {section: len(self.valid[section]) for section in self.SECTIONS}
+
+
+def parse_date(value):
+    """
+    Parse the loosely formatted dates found in resume exports.
+
+    Returns an ISO date string (YYYY-MM-DD) or an empty string.
+    """
+    value = (value or '').strip()
+    if not value or value.lower() in ('present', 'current', 'now'):
+        return ''
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    # Leave unparseable values untouched so the form reports them
+    return value
+
+
+def guess_degree(study_type):
+    """Map a free-text degree name onto Education.DEGREE_CHOICES."""
+    text = (study_type or '').lower()
+    for degree, keywords in DEGREE_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return degree
+    return 'other'
+
+
+def split_location(location):
+    """Split "City, State, Country" into the city/state/country form fields."""
+    parts = [part.strip() for part in (location or '').split(',') if part.strip()]
+    fields = {'city': '', 'state': '', 'country': ''}
+    if parts and parts[-1] in COUNTRY_NAMES:
+        fields['country'] = parts.pop()
+    if len(parts) >= 2:
+        fields['state'] = parts.pop()
+    fields['city'] = ', '.join(parts)[:100]
+    return fields
+
+
+def _join_description(*parts, highlights=None):
+    text = '\n'.join(part.strip() for part in parts if part and part.strip())
+    if highlights:
+        bullets = '\n'.join(f'- {str(item).strip()}' for item in highlights if item and str(item).strip())
+        text = f'{text}\n{bullets}' if text else bullets
+    return text
+
+
+def _education_entry(institution, degree_name, field, start, end, grade='', description=''):
+    end_date = parse_date(end)
+    return {
+        'institution': (institution or '').strip(),
+        'degree': guess_degree(degree_name),
+        'field_of_study': (field or degree_name or '').strip(),
+        'start_date': parse_date(start),
+        'end_date': end_date,
+        'currently_studying': 'on' if not end_date else '',
+        'grade': (grade or '').strip(),
+        'description': description,
+    }
+
+
+def _experience_entry(company, position, location, start, end, description):
+    end_date = parse_date(end)
+    entry = {
+        'company': (company or '').strip(),
+        'position': (position or '').strip(),
+        'employment_type': 'full_time',
+        'location': (location or '').strip(),
+        'start_date': parse_date(start),
+        'end_date': end_date,
+        'currently_working': 'on' if not end_date else '',
+        'description': description,
+    }
+    entry.update(split_location(location))
+    return entry
+
+
+def _project_entry(title, description, technologies, url, start, end):
+    end_date = parse_date(end)
+    return {
+        'title': (title or '').strip(),
+        'description': description,
+        'technologies': ', '.join(technologies)[:500] if technologies else '',
+        'project_url': (url or '').strip(),
+        'start_date': parse_date(start),
+        'end_date': end_date,
+        'currently_working': 'on' if not end_date else '',
+    }
+
+
+def _json_items(data, section):
+    """The entries of a JSON Resume section, which must be a list of objects."""
+    items = data.get(section)
+    if items is None:
+        return []
+    if not isinstance(items, list):
+        raise ImportFileError(f'"{section}" must be a list in a JSON Resume file.')
+    for position, item in enumerate(items, 1):
+        if not isinstance(item, dict):
+            raise ImportFileError(f'Entry {position} of "{section}" must be an object.')
+    return items
+
+
+def _json_text(item, key):
+    """A text field of a JSON Resume entry; numbers are converted, other values rejected."""
+    value = item.get(key)
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ImportFileError(f'"{key}" must be text in a JSON Resume file.')
+
+
+def _json_list(item, key):
+    """A list-of-strings field of a JSON Resume entry; items that are not text or numbers are skipped."""
+    value = item.get(key)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ImportFileError(f'"{key}" must be a list in a JSON Resume file.')
+    return [
+        str(element) for element in value
+        if isinstance(element, str) or (isinstance(element, (int, float)) and not isinstance(element, bool))
+    ]
+
+
+def parse_json_resume(data):
+    """
+    Convert a JSON Resume document into normalized form data.
+
+    Entries with the wrong shape raise ImportFileError rather than being guessed at.
+    """
+    if not isinstance(data, dict):
+        raise ImportFileError('The JSON file must contain a JSON Resume object.')
+
+    entries = {section: [] for section in ImportResult.SECTIONS}
+
+    for item in _json_items(data, 'education'):
+        entries['education'].append(_education_entry(
+            _json_text(item, 'institution'),
+            _json_text(item, 'studyType'),
+            _json_text(item, 'area'),
+            _json_text(item, 'startDate'),
+            _json_text(item, 'endDate'),
+            grade=_json_text(item, 'score'),
+            description=_join_description(highlights=_json_list(item, 'courses')),
+        ))
+
+    for item in _json_items(data, 'work'):
+        entries['experience'].append(_experience_entry(
+            _json_text(item, 'name') or _json_text(item, 'company'),
+            _json_text(item, 'position'),
+            _json_text(item, 'location'),
+            _json_text(item, 'startDate'),
+            _json_text(item, 'endDate'),
+            _join_description(_json_text(item, 'summary'), highlights=_json_list(item, 'highlights')),
+        ))
+
+    for item in _json_items(data, 'projects'):
+        entries['projects'].append(_project_entry(
+            _json_text(item, 'name'),
+            _join_description(_json_text(item, 'description'), highlights=_json_list(item, 'highlights')),
+            _json_list(item, 'keywords'),
+            _json_text(item, 'url'),
+            _json_text(item, 'startDate'),
+            _json_text(item, 'endDate'),
+        ))
+
+    return entries
+
+
+def _parse_linkedin_csv(section, text, entries):
+    reader = csv.DictReader(io.StringIO(text))
+    for row in reader:
+        row = {key.strip(): (value or '').strip() for key, value in row.items() if key is not None}
+        if section == 'education':
+            entries['education'].append(_education_entry(
+                row.get('School Name'),
+                row.get('Degree Name'),
+                row.get('Degree Name'),
+                row.get('Start Date'),
+                row.get('End Date'),
+                description=_join_description(row.get('Notes', ''), row.get('Activities', '')),
+            ))
+        elif section == 'experience':
+            entries['experience'].append(_experience_entry(
+                row.get('Company Name'),
+                row.get('Title'),
+                row.get('Location'),
+                row.get('Started On'),
+                row.get('Finished On'),
+                row.get('Description', ''),
+            ))
+        elif section == 'projects':
+            entries['projects'].append(_project_entry(
+                row.get('Title'),
+                row.get('Description', ''),
+                [],
+                row.get('Url'),
+                row.get('Started On'),
+                row.get('Finished On'),
+            ))
+
+
+def _detect_linkedin_section(filename, text):
+    section = LINKEDIN_FILES.get(filename.rsplit('/', 1)[-1].lower())
+    if section:
+        return section
+    header = text.split('\n', 1)[0]
+    if 'School Name' in header:
+        return 'education'
+    if 'Company Name' in header:
+        return 'experience'
+    if 'Title' in header and 'Url' in header:
+        return 'projects'
+    return None
+
+
+def _read_archive_member(archive, info):
+    """
+    Read one archive member as text, refusing members that expand past
+    MAX_ARCHIVE_MEMBER_SIZE. The declared size is checked first and the read is
+    bounded too, since the header of a crafted archive can understate it.
+    """
+    too_large = ImportFileError(
+        f'{info.filename} is too large. Each file in the archive is limited to '
+        f'{MAX_ARCHIVE_MEMBER_SIZE // (1024 * 1024)} MB uncompressed.'
+    )
+    if info.file_size > MAX_ARCHIVE_MEMBER_SIZE:
+        raise too_large
+    try:
+        with archive.open(info) as member:
+            data = member.read(MAX_ARCHIVE_MEMBER_SIZE + 1)
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, RuntimeError, EOFError):
+        raise ImportFileError('The uploaded ZIP archive is not valid.')
+    if len(data) > MAX_ARCHIVE_MEMBER_SIZE:
+        raise too_large
+    return data.decode('utf-8-sig', errors='replace')
+
+
+def parse_linkedin_export(filename, content):
+    """
+    Convert a LinkedIn data export (ZIP archive or single CSV) into normalized form data.
+    """
+    entries = {section: [] for section in ImportResult.SECTIONS}
+
+    if filename.lower().endswith('.zip'):
+        try:
+            archive = zipfile.ZipFile(io.BytesIO(content))
+        except zipfile.BadZipFile:
+            raise ImportFileError('The uploaded ZIP archive is not valid.')
+        found = False
+        for info in archive.infolist():
+            section = LINKEDIN_FILES.get(info.filename.rsplit('/', 1)[-1].lower())
+            if section:
+                found = True
+                _parse_linkedin_csv(section, _read_archive_member(archive, info), entries)
+        if not found:
+            raise ImportFileError('No Education.csv, Positions.csv or Projects.csv found in the archive.')
+        return entries
+
+    text = content.decode('utf-8-sig', errors='replace')
+    section = _detect_linkedin_section(filename, text)
+    if not section:
+        raise ImportFileError('Unrecognized CSV file. Upload Education.csv, Positions.csv or Projects.csv.')
+    _parse_linkedin_csv(section, text, entries)
+    return entries
+
+
+def parse_import_file(uploaded_file):
+    """
+    Parse an uploaded file into normalized form data, dispatching on its extension.
+    """
+    filename = uploaded_file.name or ''
+    content = uploaded_file.read()
+
+    if filename.lower().endswith('.json'):
+        try:
+            data = json.loads(content.decode('utf-8-sig'))
+        except (UnicodeDecodeError, ValueError):
+            raise ImportFileError('The uploaded file is not valid JSON.')
+        entries = parse_json_resume(data)
+    elif filename.lower().endswith(('.csv', '.zip')):
+        entries = parse_linkedin_export(filename, content)
+    else:
+        raise ImportFileError('Unsupported file type. Upload a JSON Resume (.json) or LinkedIn export (.zip or .csv).')
+
+    if sum(len(items) for items in entries.values()) > MAX_IMPORT_ENTRIES:
+        raise ImportFileError(f'Too many entries. A single import is limited to {MAX_IMPORT_ENTRIES} entries.')
+    return entries
+
+
+def validate_entries(entries):
+    """
+    Validate normalized entries with the regular ModelForms.
+
+    Returns an ImportResult holding unsaved instances for valid entries and a
+    readable message for each invalid one. No queries are issued.
+    """
+    result = ImportResult(entries)
+    form_classes = {
+        'education': (EducationForm, 'institution'),
+        'experience': (ExperienceForm, 'company'),
+        'projects': (ProjectForm, 'title'),
+    }
+    for section, (form_class, label_field) in form_classes.items():
+        for position, data in enumerate(entries.get(section, []), start=1):
+            form = form_class(data=data)
+            if form.is_valid():
+                result.valid[section].append(form.save(commit=False))
+            else:
+                messages = []
+                for field, errors in form.errors.items():
+                    prefix = '' if field == '__all__' else f"{form.fields[field].label or field}: "
+                    messages.extend(f'{prefix}{error}' for error in errors)
+                label = data.get(label_field) or f'Entry {position}'
+                result.errors.append((section, position, label, ' '.join(messages)))
+    return result
+
+
+def import_entries(user, result):
+    """
+    Write all valid entries of an ImportResult for the user in a single transaction.
+
+    Returns a dict of section -> number of created rows.
+    """
+    models = {'education': Education, 'experience': Experience, 'projects': Project}
+    with transaction.atomic():
+        for section, model in models.items():
+            instances = result.valid[section]
+            for instance in instances:
+                instance.user = user
+            if instances:
+                model.objects.bulk_create(instances, batch_size=200)
+    return result.counts()
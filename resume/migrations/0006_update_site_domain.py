@@ -6,7 +6,8 @@ from django.db import migrations
 
 def update_site_domain(apps, schema_editor):
     Site = apps.get_model('sites', 'Site')
-    site = Site.objects.get(id=1)
+    # The default site may not exist yet, e.g. in a fresh test database
+    site, _ = Site.objects.get_or_create(id=1)
     site.domain = 'ai-resume-builder-6jan.onrender.com'
     site.name = 'AI Resume Builder'
     site.save()
@@ -15,7 +16,7 @@ def update_site_domain(apps, schema_editor):
 
 def revert_site_domain(apps, schema_editor):
     Site = apps.get_model('sites', 'Site')
-    site = Site.objects.get(id=1)
+    site, _ = Site.objects.get_or_create(id=1)
     site.domain = 'example.com'
     site.name = 'example.com'
     site.save()
@@ -145,6 +145,8 @@ class Project(models.Model):
     technologies = models.CharField(max_length=500, help_text="Technologies used (comma-separated)")
     project_url = models.URLField(blank=True, validators=[URLValidator()], help_text="Live demo or repository URL")
     thumbnail = models.ImageField(upload_to='project_thumbnails/', blank=True, null=True)
+    # Manifest of the thumbnail's resized copies, kept by resume/images.py
+    thumbnail_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     start_date = models.DateField()
     end_date = models.DateField(blank=True, null=True)
     currently_working = models.BooleanField(default=False)
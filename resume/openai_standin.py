@@ -0,0 +1,114 @@
+"""
+Local OpenAI API stand-in server for load tests.
+
+Answers POST /v1/chat/completions with a canned HTML resume (or a plain text
+cover letter) in the OpenAI response format, after an optional delay that
+simulates the model's generation time. Point the OpenAI client at it with the
+OPENAI_BASE_URL environment variable.
+
+Usage:
+    with OpenAIStandIn(latency=0.5) as server:
+        env = {'OPENAI_API_KEY': 'stand-in', 'OPENAI_BASE_URL': server.base_url}
+"""
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESUME_HTML = (
+    '<div class="header"><h1>Stand-in Resume</h1><p class="contact-info">user@example.com</p></div>'
+    '<div class="section"><h2>Summary</h2><p>Engineer with experience building reliable web services.</p></div>'
+    '<div class="section"><h2>Experience</h2><div class="item"><h3>Software Engineer</h3>'
+    '<p class="company">Acme Corp</p><p class="date-range">2020 - Present</p>'
+    '<ul><li>Built and operated the billing platform.</li><li>Reduced page latency by 40%.</li></ul></div></div>'
+    '<div class="section"><h2>Skills</h2><ul class="skills-list"><li>Python</li><li>Django</li></ul></div>'
+)
+
+COVER_LETTER = (
+    "Dear Hiring Manager,\n\nI am excited to apply for this position. My experience building reliable "
+    "web services matches what your team is looking for.\n\nSincerely,\nStand-in Candidate"
+)
+
+
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            return self._send(400, {"error": {"message": "Invalid JSON", "type": "invalid_request_error"}})
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        system = " ".join(m.get("content", "") for m in request.get("messages", []) if m.get("role") == "system")
+        content = RESUME_HTML if "resume" in system.lower() else COVER_LETTER
+        self._send(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 500, "completion_tokens": 400, "total_tokens": 900},
+        })
+
+    def _send(self, status, data):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class OpenAIStandIn(ThreadingHTTPServer):
+    """
+    OpenAI chat completions server listening on a free local port in a background thread.
+
+    Attributes:
+        requests: Number of completions served
+        latency: Seconds slept before every completion
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        super().__init__((host, port), _OpenAIHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="openai-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -8,7 +8,7 @@ from django.contrib.auth import login
 from django.core.mail import send_mail
 from django.conf import settings
 from django.utils import timezone
-from datetime import timedelta
+from core import ratelimit
 from users.models import CustomUser, PasswordResetOTP
 from django import forms
 from django.utils.translation import gettext_lazy as _
@@ -18,8 +18,9 @@ from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode
 
 logger = logging.getLogger(__name__)
-# Cooldown in seconds between OTP sends (short for testing)
-COOLDOWN_SECONDS = 10
+# Cooldown in seconds between OTP sends to one address (settings.RATE_LIMITS['reset_otp:cooldown'])
+COOLDOWN_SECONDS = (ratelimit.get_rate('reset_otp:cooldown') or (1, 10))[1]
+TOO_MANY_OTP_REQUESTS = 'Too many OTP requests. Please try again later.'
 
 
 class PasswordResetRequestForm(forms.Form):
@@ -106,23 +107,22 @@ class PasswordResetRequestView(View):
         if form.is_valid():
             email = form.cleaned_data['email']
             
+            # Rate limiting (cache only, before any query): per-address cooldown, then per IP/address limits
+            wait = ratelimit.cooldown_remaining('reset_otp:cooldown', email)
+            if wait:
+                messages.warning(
+                    request,
+                    f'An OTP was recently sent to your email. Please wait {wait} seconds before requesting another one.'
+                )
+                logger.warning(f"Rate limit hit for password reset: {email}")
+                return render(request, self.template_name, {'form': form})
+            retry_after = ratelimit.check_otp_request('reset_otp', request, email)
+            if retry_after:
+                return ratelimit.ratelimited_response(request, retry_after, TOO_MANY_OTP_REQUESTS)
+            
             try:
                 user = CustomUser.objects.get(email=email, is_active=True)
                 
-                # Rate limiting: Check if user requested OTP recently (within last 1 minute)
-                recent_otp = PasswordResetOTP.objects.filter(
-                    user=user,
-                    created_at__gte=timezone.now() - timedelta(seconds=COOLDOWN_SECONDS)
-                ).first()
-                
-                if recent_otp:
-                    messages.warning(
-                        request,
-                        f'An OTP was recently sent to your email. Please wait {COOLDOWN_SECONDS} seconds before requesting another one.'
-                    )
-                    logger.warning(f"Rate limit hit for password reset: {email}")
-                    return render(request, self.template_name, {'form': form})
-                
                 # Generate OTP
                 otp_code = PasswordResetOTP.generate_otp()
                 
@@ -168,6 +168,9 @@ AI Resume Builder Team
                         fail_silently=False,
                     )
                     logger.info(f"✅ OTP email sent successfully to {email}")
+                    # A new code gets a fresh set of verification attempts
+                    ratelimit.start_cooldown('reset_otp:cooldown', email)
+                    ratelimit.reset('reset_verify:email', email)
                     # Store email and sent time in session for frontend banner and cooldown
                     request.session['password_reset_email'] = email
                     request.session['password_reset_sent_at'] = timezone.now().isoformat()
@@ -188,7 +191,7 @@ AI Resume Builder Team
                     logger.error(f"❌ Failed to send OTP email to {email}")
                     logger.error(f"Error type: {type(e).__name__}")
                     logger.error(f"Error message: {str(e)}")
-                    logger.error(f"Email Backend: {settings.EMAIL_BACKEND}")
+                    logger.error(f"Email Backend: {settings.EMAIL_BACKEND} (delivery: {getattr(settings, 'EMAIL_DELIVERY_BACKEND', settings.EMAIL_BACKEND)})")
                     logger.error(f"Email Host: {getattr(settings, 'EMAIL_HOST', 'NOT SET')}")
                     logger.error(f"Email Port: {getattr(settings, 'EMAIL_PORT', 'NOT SET')}")
                     logger.error(f"Email Host User: {settings.EMAIL_HOST_USER if settings.EMAIL_HOST_USER else 'NOT SET'}")
@@ -266,15 +269,15 @@ class PasswordResetCombinedView(View):
             form = PasswordResetRequestForm(request.POST)
             if form.is_valid():
                 email = form.cleaned_data['email']
+                wait = ratelimit.cooldown_remaining('reset_otp:cooldown', email)
+                if wait:
+                    messages.warning(request, f'An OTP was recently sent. Please wait {wait} seconds before requesting another one.')
+                    return redirect('password_reset_verify_otp')
+                retry_after = ratelimit.check_otp_request('reset_otp', request, email)
+                if retry_after:
+                    return ratelimit.ratelimited_response(request, retry_after, TOO_MANY_OTP_REQUESTS)
                 try:
                     user = CustomUser.objects.get(email=email, is_active=True)
-                    recent_otp = PasswordResetOTP.objects.filter(
-                        user=user,
-                        created_at__gte=timezone.now() - timedelta(seconds=COOLDOWN_SECONDS)
-                    ).first()
-                    if recent_otp:
-                        messages.warning(request, f'An OTP was recently sent. Please wait {COOLDOWN_SECONDS} seconds before requesting another one.')
-                        return redirect('password_reset_verify_otp')
 
                     otp_code = PasswordResetOTP.generate_otp()
                     PasswordResetOTP.objects.filter(user=user, is_used=False).delete()
@@ -283,6 +286,8 @@ class PasswordResetCombinedView(View):
                     subject = 'Secure Password Reset — AI Resume Builder'
                     message = f"""Hello {user.get_full_name()},\n\nYour 6-digit OTP code is: {otp_code}\n\nThis OTP is valid for 10 minutes."""
                     send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email], fail_silently=False)
+                    ratelimit.start_cooldown('reset_otp:cooldown', email)
+                    ratelimit.reset('reset_verify:email', email)
                     # Store email and sent time in session for frontend banner and cooldown
                     request.session['password_reset_email'] = email
                     request.session['password_reset_sent_at'] = timezone.now().isoformat()
@@ -309,21 +314,17 @@ class PasswordResetCombinedView(View):
             if form.is_valid():
                 email = form.cleaned_data['email']
                 otp = form.cleaned_data['otp']
+                if ratelimit.is_limited('reset_verify:email', email):
+                    messages.error(request, 'Too many failed attempts. Please request a new OTP.')
+                    return redirect('password_reset_request')
                 try:
                     user = CustomUser.objects.get(email=email, is_active=True)
-                    session_key = f'otp_attempts_{email}'
-                    attempts = request.session.get(session_key, 0)
-                    if attempts >= 5:
-                        messages.error(request, 'Too many failed attempts. Please request a new OTP.')
-                        request.session[session_key] = 0
-                        return redirect('password_reset_request')
-
                     otp_obj = PasswordResetOTP.objects.filter(user=user, otp=otp, is_used=False).order_by('-created_at').first()
                     if otp_obj and otp_obj.is_valid():
                         # Instead of redirecting, render the same page and show the new password form inline
                         request.session['reset_email'] = email
                         request.session['reset_otp'] = otp
-                        request.session[session_key] = 0
+                        ratelimit.reset('reset_verify:email', email)
                         messages.success(request, 'OTP verified successfully! Please set your new password.')
                         # Prepare forms for rendering: keep request/otp forms and show password form
                         request_form = PasswordResetRequestForm()
@@ -337,13 +338,14 @@ class PasswordResetCombinedView(View):
                             'resend_cooldown_remaining': 0,
                         })
                     else:
-                        request.session[session_key] = attempts + 1
-                        remaining = 5 - (attempts + 1)
-                        if remaining > 0:
+                        ratelimit.hit('reset_verify:email', email)
+                        remaining = ratelimit.remaining('reset_verify:email', email)
+                        if remaining:
                             messages.error(request, f'Invalid or expired OTP. You have {remaining} attempt(s) remaining.')
                         else:
                             messages.error(request, 'Invalid or expired OTP. Please request a new one.')
                 except CustomUser.DoesNotExist:
+                    ratelimit.hit('reset_verify:email', email)
                     messages.error(request, 'Invalid email address.')
             # Render page with errors
             request_form = PasswordResetRequestForm()
@@ -356,6 +358,9 @@ class PasswordResetCombinedView(View):
                 email = form.cleaned_data.get('email')
                 otp = form.cleaned_data.get('otp')
                 password = form.cleaned_data.get('password1')
+                if ratelimit.is_limited('reset_verify:email', email):
+                    messages.error(request, 'Too many failed attempts. Please request a new OTP.')
+                    return redirect('password_reset_request')
                 try:
                     user = CustomUser.objects.get(email=email, is_active=True)
 
@@ -381,6 +386,7 @@ class PasswordResetCombinedView(View):
                         messages.success(request, 'Password reset successful. You can now sign in with your new password.')
                         return redirect('password_reset_done')
                     else:
+                        ratelimit.hit('reset_verify:email', email)
                         messages.error(request, 'Invalid OTP. Please try again.')
                         return redirect('password_reset_verify_otp')
                 except CustomUser.DoesNotExist:
@@ -439,6 +445,10 @@ class PasswordResetConfirmView(View):
             otp = form.cleaned_data['otp']
             password = form.cleaned_data['password1']
             
+            if ratelimit.is_limited('reset_verify:email', email):
+                messages.error(request, 'Too many failed attempts. Please request a new OTP.')
+                return redirect('password_reset_request')
+            
             try:
                 user = CustomUser.objects.get(email=email, is_active=True)
 
@@ -480,6 +490,7 @@ class PasswordResetConfirmView(View):
                     messages.success(request, 'Your password has been reset successfully!')
                     return redirect('password_reset_done')
                 else:
+                    ratelimit.hit('reset_verify:email', email)
                     messages.error(request, 'Invalid or expired OTP.')
                     return redirect('password_reset_request')
                     
@@ -534,22 +545,21 @@ class ResendPasswordResetOTPView(View):
             messages.error(request, 'No password reset session found. Please request a reset first.')
             return redirect('password_reset_request')
 
+        # Rate limiting: avoid frequent resend, checked before any query
+        wait = ratelimit.cooldown_remaining('reset_otp:cooldown', email)
+        if wait:
+            messages.warning(
+                request,
+                f'An OTP was recently sent. Please wait {wait} seconds before requesting another one.'
+            )
+            return redirect('password_reset_verify_otp')
+        retry_after = ratelimit.check_otp_request('reset_otp', request, email)
+        if retry_after:
+            return ratelimit.ratelimited_response(request, retry_after, TOO_MANY_OTP_REQUESTS)
+
         try:
             user = CustomUser.objects.get(email=email, is_active=True)
 
-            # Rate limiting: avoid frequent resend (1 minute)
-            recent_otp = PasswordResetOTP.objects.filter(
-                user=user,
-                created_at__gte=timezone.now() - timedelta(seconds=COOLDOWN_SECONDS)
-            ).first()
-
-            if recent_otp:
-                messages.warning(
-                    request,
-                    f'An OTP was recently sent. Please wait {COOLDOWN_SECONDS} seconds before requesting another one.'
-                )
-                return redirect('password_reset_verify_otp')
-
             # Generate new OTP
             new_otp = PasswordResetOTP.generate_otp()
 
@@ -579,6 +589,8 @@ AI Resume Builder Team
                 [email],
                 fail_silently=False,
             )
+            ratelimit.start_cooldown('reset_otp:cooldown', email)
+            ratelimit.reset('reset_verify:email', email)
             # Store sent time so frontend can show cooldown
             request.session['password_reset_sent_at'] = timezone.now().isoformat()
             # Mark just-sent so the banner can be shown on next interaction
@@ -1,11 +1,27 @@
 """
 AI service for generating resumes and cover letters using OpenAI API.
 """
-from openai import OpenAI
+import threading
+
+import httpx
 from django.conf import settings
+from . import engines
 from .models import Profile, Education, Experience, Project
 
 
+# One httpx client (and connection pool) shared by every generator, created on first use
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def _get_http_client():
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client()
+        return _http_client
+
+
 class AIResumeGenerator:
     """
     Service class for generating AI-powered resumes and cover letters.
@@ -16,11 +32,14 @@ class AIResumeGenerator:
         self.api_key = settings.OPENAI_API_KEY
         self.client = None
         
-        if self.api_key:
+        # The openai package is only imported once a key is configured
+        openai = engines.openai.load() if self.api_key else None
+        if openai:
             try:
-                # Initialize OpenAI client with just the API key
-                # The client will handle all configuration
-                self.client = OpenAI(api_key=self.api_key)
+                # Pass our own httpx client: openai 1.3.5 builds its default one with the
+                # `proxies` argument that httpx 0.28 removed, which fails with a TypeError.
+                # Base URL and timeouts still come from the OpenAI client (OPENAI_BASE_URL).
+                self.client = openai.OpenAI(api_key=self.api_key, http_client=_get_http_client())
             except Exception as e:
                 # If client initialization fails, log it but don't crash
                 print(f"Warning: Could not initialize OpenAI client: {e}")
@@ -0,0 +1,274 @@
+"""
+Reproducible synthetic resume data, for benchmarks and load tests.
+
+Every function takes a random.Random so the same seed always produces the
+same users, profiles and entries. build_user() creates one complete user in
+the database; user_data() returns the same kind of content in the dict shape
+AIResumeGenerator._gather_user_data() produces, without touching the database.
+"""
+import datetime
+import math
+import re
+
+from .models import CoverLetter, Education, Experience, GeneratedResume, Profile, Project
+
+FIRST_NAMES = ['Aarav', 'Maya', 'Liam', 'Sofia', 'Noah', 'Priya', 'Lucas', 'Amara', 'Ethan', 'Yuki',
+               'Omar', 'Elena', 'Mateo', 'Zara', 'Daniel', 'Chloe', 'Ravi', 'Ines', 'Kofi', 'Hana']
+LAST_NAMES = ['Sharma', 'Garcia', 'Smith', 'Nguyen', 'Müller', 'Okafor', 'Rossi', 'Kim', 'Patel', 'Silva',
+              'Johansson', 'Haddad', 'Kowalski', 'Tanaka', 'Brown', 'Dubois', 'Ivanova', 'Mensah', 'Lopez', 'Chen']
+SKILLS = ['Python', 'Django', 'JavaScript', 'TypeScript', 'React', 'PostgreSQL', 'Docker', 'Kubernetes', 'AWS',
+          'Machine Learning', 'Data Analysis', 'REST APIs', 'GraphQL', 'Go', 'Rust', 'Java', 'Spring', 'CI/CD',
+          'Linux', 'Redis', 'Celery', 'Figma', 'Agile', 'Leadership', 'Public Speaking', 'Technical Writing']
+SKILL_GROUPS = ['Cloud (AWS, GCP, Azure)', 'Testing (pytest, Jest)', 'Frontend (HTML, CSS, Bootstrap)']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Enterprises',
+             'Hooli', 'Pied Piper', 'Vandelay Industries', 'Soylent Systems']
+POSITIONS = ['Software Engineer', 'Senior Developer', 'Data Scientist', 'Product Manager', 'DevOps Engineer',
+             'Frontend Developer', 'Backend Engineer', 'QA Engineer', 'Engineering Manager', 'Intern']
+INSTITUTIONS = ['State University', 'Institute of Technology', 'City College', 'National University',
+                'Polytechnic School', 'Open University']
+FIELDS = ['Computer Science', 'Information Systems', 'Mathematics', 'Electrical Engineering', 'Data Science',
+          'Business Administration', 'Physics']
+CITIES = ['Berlin', 'Bengaluru', 'New York', 'São Paulo', 'Lagos', 'Tokyo', 'Toronto', 'Paris', 'Sydney']
+WORDS = ('designed built led improved scalable reliable platform service pipeline customers team features '
+         'performance latency reduced increased automated migrated deployed monitoring analytics dashboard '
+         'api backend frontend mobile release quality tests coverage mentoring roadmap stakeholders data '
+         'models infrastructure cost security compliance integration workflow users revenue growth').split()
+TEMPLATES = ['modern', 'classic', 'creative', 'minimal', 'executive', 'technical']
+
+
+def distribution(spec):
+    """
+    Parse a count distribution and return a function rng -> int >= 0.
+
+    Accepted forms: '3' (always 3), '1-5' (uniform, inclusive), 'poisson:2.5'
+    and 'normal:40,10' (rounded and clipped at 0).
+    """
+    spec = str(spec).strip()
+    try:
+        if re.fullmatch(r'\d+', spec):
+            value = int(spec)
+            return lambda rng: value
+        match = re.fullmatch(r'(\d+)-(\d+)', spec)
+        if match:
+            low, high = sorted(int(n) for n in match.groups())
+            return lambda rng: rng.randint(low, high)
+        kind, _, args = spec.partition(':')
+        if kind == 'poisson':
+            mean = float(args)
+            if mean < 0:
+                raise ValueError
+            limit = math.exp(-mean)
+
+            def poisson(rng):
+                # Knuth's method, fine for the small means used here
+                count, product = 0, rng.random()
+                while product > limit:
+                    count += 1
+                    product *= rng.random()
+                return count
+            return poisson
+        if kind == 'normal':
+            mean, sd = (float(n) for n in args.split(','))
+            return lambda rng: max(0, round(rng.gauss(mean, sd)))
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid distribution '{spec}': use N, A-B, poisson:MEAN or normal:MEAN,SD")
+
+
+def words(rng, count):
+    return ' '.join(rng.choices(WORDS, k=count))
+
+
+def text(rng, word_count):
+    """Sentences of 8-16 words adding up to about `word_count` words."""
+    sentences = []
+    remaining = max(1, word_count)
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 16))
+        sentence = words(rng, length)
+        sentences.append(sentence[0].upper() + sentence[1:] + '.')
+        remaining -= length
+    return ' '.join(sentences)
+
+
+def skills_text(rng, count):
+    """A comma-separated skill list, with some parenthesised groups that contain commas."""
+    skills = rng.sample(SKILLS, min(count, len(SKILLS)))
+    if count > 4:
+        skills.insert(rng.randrange(len(skills)), rng.choice(SKILL_GROUPS))
+    return ', '.join(skills)
+
+
+def date_range(rng, years_back=15):
+    start = datetime.date(2024, 1, 1) - datetime.timedelta(days=rng.randint(90, 365 * years_back))
+    end = start + datetime.timedelta(days=rng.randint(60, 365 * 4))
+    return start, (end if end < datetime.date(2024, 1, 1) else None)
+
+
+def name(rng):
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+
+def profile_fields(rng, skill_count=12, description_words=60):
+    return {
+        'career_objective': text(rng, description_words // 3),
+        'summary': text(rng, description_words),
+        'skills': skills_text(rng, skill_count),
+        'location': rng.choice(CITIES),
+        'linkedin_url': 'https://www.linkedin.com/in/synthetic',
+        'github_url': 'https://github.com/synthetic',
+    }
+
+
+def education_fields(rng, description_words=30):
+    start, end = date_range(rng)
+    return {
+        'institution': rng.choice(INSTITUTIONS),
+        'degree': rng.choice(Education.DEGREE_CHOICES)[0],
+        'field_of_study': rng.choice(FIELDS),
+        'start_date': start,
+        'end_date': end,
+        'currently_studying': end is None,
+        'grade': f"{rng.uniform(2.5, 4.0):.2f} GPA",
+        'description': text(rng, description_words),
+    }
+
+
+def experience_fields(rng, description_words=80):
+    start, end = date_range(rng)
+    return {
+        'company': rng.choice(COMPANIES),
+        'position': rng.choice(POSITIONS),
+        'employment_type': rng.choice(Experience.EMPLOYMENT_TYPE_CHOICES)[0],
+        'location': rng.choice(CITIES),
+        'start_date': start,
+        'end_date': end,
+        'currently_working': end is None,
+        'description': text(rng, description_words),
+    }
+
+
+def project_fields(rng, description_words=50):
+    start, end = date_range(rng, years_back=6)
+    return {
+        'title': f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+        'description': text(rng, description_words),
+        'technologies': ', '.join(rng.sample(SKILLS, rng.randint(2, 6))),
+        'project_url': 'https://example.com/project',
+        'start_date': start,
+        'end_date': end,
+        'currently_working': end is None,
+    }
+
+
+def resume_html(rng, sections=4, description_words=80):
+    """Generated-resume-like HTML content."""
+    parts = ['<div class="header"><h1>Synthetic User</h1><p class="contact-info">user@example.com</p></div>']
+    for _ in range(sections):
+        parts.append(f'<div class="section"><h2>{rng.choice(WORDS).title()}</h2>'
+                     f'<div class="item"><p>{text(rng, description_words)}</p></div></div>')
+    return '\n'.join(parts)
+
+
+def resume_markdown(rng, sections=4, description_words=80):
+    """Generated-resume-like markdown content."""
+    parts = ['# Synthetic User', 'user@example.com']
+    for _ in range(sections):
+        parts.append(f"## {rng.choice(WORDS).title()}")
+        parts.append(f"**{rng.choice(POSITIONS)}** at {rng.choice(COMPANIES)}")
+        parts.extend(f"- {text(rng, description_words // 4)}" for _ in range(4))
+    return '\n\n'.join(parts)
+
+
+def user_data(rng, educations=2, experiences=3, projects=3, skill_count=12, description_words=60):
+    """Content in the shape of AIResumeGenerator._gather_user_data(), without the database."""
+    first, last = name(rng)
+    profile = profile_fields(rng, skill_count, description_words)
+    display = dict(Education.DEGREE_CHOICES)
+    employment = dict(Experience.EMPLOYMENT_TYPE_CHOICES)
+
+    def month(date):
+        return date.strftime('%B %Y') if date else 'Present'
+
+    return {
+        'name': f"{first} {last}",
+        'email': f"{first.lower()}@example.com",
+        'phone': '+1 555 0100',
+        'profile': {
+            'career_objective': profile['career_objective'],
+            'summary': profile['summary'],
+            'skills': Profile(skills=profile['skills']).get_skills_list(),
+            'location': profile['location'],
+            'linkedin': profile['linkedin_url'],
+            'github': profile['github_url'],
+            'portfolio': '',
+        },
+        'education': [
+            {**{k: e[k] for k in ('institution', 'grade', 'description')}, 'degree': display[e['degree']],
+             'field': e['field_of_study'], 'start_date': month(e['start_date']), 'end_date': month(e['end_date'])}
+            for e in (education_fields(rng, description_words // 2) for _ in range(educations))
+        ],
+        'experience': [
+            {**{k: e[k] for k in ('company', 'position', 'location', 'description')},
+             'type': employment[e['employment_type']],
+             'start_date': month(e['start_date']), 'end_date': month(e['end_date'])}
+            for e in (experience_fields(rng, description_words) for _ in range(experiences))
+        ],
+        'projects': [
+            {'title': p['title'], 'description': p['description'],
+             'technologies': [t.strip() for t in p['technologies'].split(',')], 'url': p['project_url'],
+             'start_date': month(p['start_date']), 'end_date': month(p['end_date'])}
+            for p in (project_fields(rng, description_words) for _ in range(projects))
+        ],
+    }
+
+
+def user_fields(rng, index, prefix='synthetic'):
+    """Fields of a CustomUser; the email and username are unique per (prefix, index)."""
+    first, last = name(rng)
+    return {
+        'email': f"{prefix}{index}@example.com",
+        'username': f"{prefix}{index}",
+        'first_name': first,
+        'last_name': last,
+        'phone': '+1 555 0100',
+    }
+
+
+def related_rows(rng, user, educations=2, experiences=3, projects=3, skill_count=12, description_words=60,
+                 resumes=1, cover_letters=1):
+    """Unsaved Profile, Education, Experience, Project, GeneratedResume and CoverLetter rows of `user`."""
+    rows = [Profile(user=user, **profile_fields(rng, skill_count, description_words))]
+    rows += [Education(user=user, **education_fields(rng, description_words // 2)) for _ in range(educations)]
+    rows += [Experience(user=user, **experience_fields(rng, description_words)) for _ in range(experiences)]
+    rows += [Project(user=user, **project_fields(rng, description_words)) for _ in range(projects)]
+    rows += [
+        GeneratedResume(user=user, content=resume_html(rng, description_words=description_words),
+                        template=rng.choice(TEMPLATES))
+        for _ in range(resumes)
+    ]
+    rows += [
+        CoverLetter(user=user, company_name=rng.choice(COMPANIES), position=rng.choice(POSITIONS),
+                    content=text(rng, description_words * 3))
+        for _ in range(cover_letters)
+    ]
+    return rows
+
+
+def bulk_create_rows(rows, batch_size=None):
+    """bulk_create a mixed list of model instances, one INSERT batch per model."""
+    by_model = {}
+    for row in rows:
+        by_model.setdefault(type(row), []).append(row)
+    for model, instances in by_model.items():
+        model.objects.bulk_create(instances, batch_size=batch_size)
+    return {model: len(instances) for model, instances in by_model.items()}
+
+
+def build_user(rng, index, password='password', prefix='synthetic', **counts):
+    """Create one user with a profile and entries (see related_rows for the counts); returns the user."""
+    from django.contrib.auth import get_user_model
+
+    user = get_user_model().objects.create_user(password=password, **user_fields(rng, index, prefix))
+    bulk_create_rows(related_rows(rng, user, **counts))
+    return user
@@ -0,0 +1,61 @@
+"""
+Template tags rendering uploaded images through their resized derivatives (resume/images.py).
+"""
+from django import template
+from django.core.files.storage import default_storage
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from ..images import FORMATS, best_entry, derivative_srcset, get_derivatives
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(fieldfile, kind, display_width, sizes=None, **attrs):
+    """
+    Render a <picture> with WebP and JPEG srcsets for an ImageField file.
+
+    `display_width` is the CSS width the image is shown at; the JPEG closest
+    to twice that width is the fallback src. Falls back to the original file
+    when no derivatives can be built. Extra keyword arguments become <img>
+    attributes (use class_ for "class").
+
+        {% responsive_image user.profile_photo 'avatar' 120 class_='profile-photo' alt='Profile Photo' %}
+    """
+    if not fieldfile:
+        return ''
+    attrs = {key.rstrip('_'): value for key, value in attrs.items()}
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    manifest = get_derivatives(fieldfile, kind)
+    if not manifest:
+        return format_html('<img src="{}"{}>', fieldfile.url, flatatt(attrs))
+
+    sizes = sizes or f"{display_width}px"
+    sources = [
+        format_html('<source type="{}" srcset="{}" sizes="{}">', content_type, derivative_srcset(manifest[ext]), sizes)
+        for ext, content_type, options in FORMATS
+        if ext != 'jpeg' and manifest.get(ext)
+    ]
+    fallback = manifest['jpeg']
+    src_name = best_entry(fallback, display_width * 2)[1]
+    img = format_html(
+        '<img src="{}" srcset="{}" sizes="{}"{}>',
+        default_storage.url(src_name), derivative_srcset(fallback), sizes, flatatt(attrs),
+    )
+    return format_html('<picture>{}{}</picture>', mark_safe(''.join(sources)), img)
+
+
+@register.simple_tag
+def derivative_url(fieldfile, kind, display_width):
+    """
+    Return the URL of the JPEG derivative suited to `display_width` (CSS pixels), or the original's URL.
+    """
+    if not fieldfile:
+        return ''
+    manifest = get_derivatives(fieldfile, kind)
+    if not manifest:
+        return fieldfile.url
+    return default_storage.url(best_entry(manifest['jpeg'], display_width * 2)[1])
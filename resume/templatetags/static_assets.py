@@ -0,0 +1,45 @@
+"""
+Template tags for stylesheets built by core.storage.OptimizedStaticFilesStorage.
+"""
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from core.storage import critical_name
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def _critical_css(path):
+    """Return the collected critical CSS for `path`, or None if it was not built."""
+    name = critical_name(path)
+    if not staticfiles_storage.exists(name):
+        return None
+    with staticfiles_storage.open(name) as f:
+        # A stray "</style" must not end the inline element early
+        return f.read().decode('utf-8').replace('</', '<\\/')
+
+
+@register.simple_tag
+def stylesheet(path):
+    """
+    Link a stylesheet, inlining its critical subset when STATIC_CRITICAL_CSS is enabled.
+
+    The full stylesheet is then preloaded and applied without blocking rendering.
+    """
+    url = static(path)
+    css = _critical_css(path) if getattr(settings, 'STATIC_CRITICAL_CSS', False) else None
+    if css is None:
+        return format_html('<link rel="stylesheet" href="{}">', url)
+    return format_html(
+        '<style>{}</style>'
+        '<link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(css), url, url,
+    )
@@ -1,3 +1,359 @@
-from django.test import TestCase
+import datetime
+import io
+import tempfile
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import URLPattern, reverse
+
+from core import health
+from core.queries import QueryRecorder, assert_max_queries, query_shape
+
+from . import engines, export, images, importers, urls as resume_urls
+from .forms import ExperienceForm
+from .models import CoverLetter, Education, Experience, GeneratedResume, Profile, Project
+
+# Rows created per model, so a per-row query shows up as a repeated shape
+ROWS = 4
+
+# url name -> (kwargs attribute names, query budget) for a GET by the signed-in owner.
+# Budgets include the session and user lookups done for every authenticated request.
+VIEW_BUDGETS = {
+    'config_check': ((), 2),
+    'test_email_quick': ((), 2),
+    'debug_last_otp': ((), 2),
+    'home': ((), 2),
+    'dashboard': ((), 13),
+    'terms_of_service': ((), 2),
+    'privacy_policy': ((), 2),
+    'profile_edit': ((), 3),
+    'profile_import': ((), 2),
+    'education_list': ((), 3),
+    'education_add': ((), 2),
+    'education_edit': (('education',), 3),
+    'education_delete': (('education',), 3),
+    'experience_list': ((), 3),
+    'experience_add': ((), 2),
+    'experience_edit': (('experience',), 3),
+    'experience_delete': (('experience',), 3),
+    'project_list': ((), 3),
+    'project_add': ((), 2),
+    'project_edit': (('project',), 3),
+    'project_delete': (('project',), 3),
+    'generate_resume': ((), 9),
+    'resume_list': ((), 3),
+    'resume_view': (('resume',), 4),
+    'resume_download_pdf': (('resume',), 4),
+    'resume_delete': (('resume',), 3),
+    'templates_gallery': ((), 2),
+    'generate_cover_letter': ((), 6),
+    'cover_letter_list': ((), 3),
+    'cover_letter_view': (('cover_letter',), 4),
+    'cover_letter_download_pdf': (('cover_letter',), 4),
+    'cover_letter_delete': (('cover_letter',), 3),
+    'portfolio_view': ((), 7),
+    'portfolio_download_pdf': ((), 7),
+    'export_all': ((), 12),
+}
+
+# Changelists listing user-owned rows (url name -> query budget); each row's user must come from a join
+ADMIN_CHANGELIST_BUDGETS = {
+    'admin:resume_profile_changelist': 5,
+    'admin:resume_education_changelist': 7,
+    'admin:resume_experience_changelist': 7,
+    'admin:resume_project_changelist': 7,
+    'admin:resume_generatedresume_changelist': 7,
+    'admin:resume_coverletter_changelist': 8,
+}
+
+
+@override_settings(
+    RATELIMIT_ENABLED=False,
+    EMAIL_DELIVERY_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class QueryBudgetTests(TestCase):
+    """
+    Every view in resume/urls.py must stay within its query budget and run no query once per row.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        start = datetime.date(2020, 1, 1)
+        users = [
+            User.objects.create_user(
+                email=f'user{i}@example.com', username=f'user{i}', password='password',
+                first_name='Test', last_name=f'User{i}', is_staff=True, is_superuser=True,
+            )
+            for i in range(ROWS)
+        ]
+        cls.user = users[0]
+        for user in users:
+            Profile.objects.create(user=user, skills='Python, Django', location='Berlin')
+            for i in range(ROWS):
+                Education.objects.create(user=user, institution='University', degree='BSc',
+                                         field_of_study='CS', start_date=start)
+                Experience.objects.create(user=user, company='Company', position='Developer',
+                                          start_date=start, description='Work')
+                Project.objects.create(user=user, title='Project', description='Description',
+                                       technologies='Python', start_date=start)
+                GeneratedResume.objects.create(user=user, content='# Resume\n\nContent')
+                CoverLetter.objects.create(user=user, company_name='Company', position='Developer',
+                                           content='Dear hiring manager')
+        cls.objects = {
+            'education': Education.objects.filter(user=cls.user).first(),
+            'experience': Experience.objects.filter(user=cls.user).first(),
+            'project': Project.objects.filter(user=cls.user).first(),
+            'resume': GeneratedResume.objects.filter(user=cls.user).first(),
+            'cover_letter': CoverLetter.objects.filter(user=cls.user).first(),
+        }
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_every_view_has_a_budget(self):
+        names = {pattern.name for pattern in resume_urls.urlpatterns if isinstance(pattern, URLPattern)}
+        self.assertEqual(names - set(VIEW_BUDGETS), set(), 'Add a query budget for new views')
+
+    def test_view_query_budgets(self):
+        for name, (objects, budget) in VIEW_BUDGETS.items():
+            kwargs = {'pk': self.objects[objects[0]].pk} if objects else {}
+            with self.subTest(view=name):
+                with assert_max_queries(budget, max_repeats=2):
+                    response = self.client.get(reverse(name, kwargs=kwargs))
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                self.assertLess(response.status_code, 500)
+
+    def test_admin_changelists_select_users(self):
+        for name, budget in ADMIN_CHANGELIST_BUDGETS.items():
+            with self.subTest(changelist=name):
+                with assert_max_queries(budget, max_repeats=2):
+                    response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+
+
+class QueryToolsTests(TestCase):
+    """
+    The query shape grouping and budget assertion used by the tests above.
+    """
+
+    def test_query_shape_collapses_literals_and_in_lists(self):
+        self.assertEqual(
+            query_shape("SELECT * FROM t WHERE id = 12 AND name = 'x''y' AND pk IN (%s, %s, %s)"),
+            query_shape("SELECT * FROM t WHERE id = 7 AND name = 'z' AND pk IN (%s)"),
+        )
+
+    def test_recorder_reports_repeated_shapes(self):
+        user = get_user_model().objects.create_user(email='a@example.com', username='a', password='password')
+        with QueryRecorder() as recorder:
+            for _ in range(3):
+                list(Project.objects.filter(user=user))
+        self.assertEqual(len(recorder), 3)
+        self.assertEqual(len(recorder.repeated(3)), 1)
+
+    def test_assert_max_queries_fails_over_budget(self):
+        with self.assertRaisesMessage(AssertionError, '2 queries executed, budget is 1'):
+            with assert_max_queries(1):
+                list(Project.objects.all())
+                list(Education.objects.all())
+
+    def test_assert_max_queries_fails_on_repeats(self):
+        with self.assertRaisesMessage(AssertionError, 'likely N+1'):
+            with assert_max_queries(10, max_repeats=1):
+                list(Project.objects.all())
+                list(Project.objects.all())
+
+
+class HealthCheckTests(TestCase):
+    """
+    Probe endpoints stay cheap and answer before host validation and HTTPS redirects.
+    """
+
+    def setUp(self):
+        health._ready_result = None
+
+    def test_healthz_runs_no_queries(self):
+        with assert_max_queries(0):
+            response = self.client.get('/healthz', HTTP_HOST='10.0.0.7')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(SECURE_SSL_REDIRECT=True, HEALTH_CHECK_CACHE_SECONDS=60)
+    def test_readyz_checks_once_per_interval(self):
+        with assert_max_queries(1):
+            response = self.client.get('/readyz', HTTP_HOST='10.0.0.7')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['checks'].values()), {'ok'})
+        with assert_max_queries(0):
+            self.assertEqual(self.client.get('/readyz').status_code, 200)
+
+    def test_readyz_fails_without_revealing_why(self):
+        def leaky():
+            raise RuntimeError('connection to db.internal:5432 as app_user refused')
+
+        with mock.patch.dict(health.CHECKS, database=leaky):
+            with self.assertLogs('core.health', 'WARNING') as logs:
+                response = self.client.get('/readyz')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['checks']['database'], 'failed')
+        self.assertNotIn(b'db.internal', response.content)
+        self.assertIn('db.internal', logs.output[0])
+
+
+class LinkedInArchiveTests(TestCase):
+    """
+    ZIP exports are read with bounded memory, whatever size the upload was.
+    """
+
+    def _archive(self, positions):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('Positions.csv', positions)
+        return buffer.getvalue()
+
+    def test_reads_positions(self):
+        content = self._archive('Company Name,Title,Location,Started On\nAcme,Engineer,"Austin, TX",Jan 2020\n')
+        entries = importers.parse_linkedin_export('export.zip', content)
+        self.assertEqual([entry['company'] for entry in entries['experience']], ['Acme'])
+
+    @mock.patch.object(importers, 'MAX_ARCHIVE_MEMBER_SIZE', 1024)
+    def test_rejects_members_that_expand_past_the_limit(self):
+        content = self._archive('Company Name,Title\n' + 'a' * 100_000)
+        self.assertLess(len(content), 1024)
+        with self.assertRaisesMessage(importers.ImportFileError, 'too large'):
+            importers.parse_linkedin_export('export.zip', content)
+
+
+class JSONResumeShapeTests(TestCase):
+    """
+    Valid JSON with the wrong shape is rejected as an import error, not a crash.
+    """
+
+    def test_rejects_malformed_sections(self):
+        for data in ({'education': ['x']}, {'work': {'a': 1}}, {'work': [{'summary': {'text': 'x'}}]}):
+            with self.subTest(data=data):
+                with self.assertRaises(importers.ImportFileError):
+                    importers.parse_json_resume(data)
+
+    def test_coerces_numbers(self):
+        entries = importers.parse_json_resume({
+            'work': [{'name': 'Acme', 'summary': 42, 'startDate': 2020}],
+            'projects': [{'name': 'Tool', 'keywords': [1, 'Python', None]}],
+        })
+        self.assertEqual(entries['experience'][0]['description'], '42')
+        self.assertEqual(entries['experience'][0]['start_date'], '2020-01-01')
+        self.assertEqual(entries['projects'][0]['technologies'], '1, Python')
+
+    def test_view_reports_malformed_file(self):
+        user = get_user_model().objects.create_user(email='json@example.com', username='json', password='x')
+        self.client.force_login(user)
+        upload = SimpleUploadedFile('resume.json', b'{"education": ["x"]}', content_type='application/json')
+        with override_settings(RATELIMIT_ENABLED=False):
+            response = self.client.post(reverse('profile_import'), {'file': upload}, SERVER_NAME='localhost')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('must be an object', response.context['form'].errors['file'][0])
+
+
+class LocationValidationTests(TestCase):
+    """
+    State validation accepts the forms locations were stored in before it existed.
+    """
+
+    def _form(self, location, instance=None):
+        data = {
+            'company': 'Acme', 'position': 'Engineer', 'employment_type': 'full_time',
+            'start_date': '2020-01-01', 'description': 'Built things.', **importers.split_location(location),
+        }
+        return ExperienceForm(data, instance=instance)
+
+    def test_accepts_abbreviations_and_any_case(self):
+        for location in ('San Francisco, CA, United States', 'Austin, texas, United States',
+                         'Toronto, ON, Canada', 'Austin, Texas, United States'):
+            with self.subTest(location=location):
+                self.assertTrue(self._form(location).is_valid())
+
+    def test_rejects_unknown_state(self):
+        self.assertIn('state', self._form('Austin, Atlantis, United States').errors)
+
+    def test_accepts_unchanged_state_of_saved_entry(self):
+        user = get_user_model().objects.create_user(email='loc@example.com', username='loc', password='x')
+        experience = Experience.objects.create(
+            user=user, company='Acme', position='Engineer', start_date=datetime.date(2020, 1, 1),
+            location='Oakland, Bay Area, United States',
+        )
+        self.assertTrue(self._form('Oakland, Bay Area, United States', instance=experience).is_valid())
+        self.assertFalse(self._form('Oakland, Atlantis, United States', instance=experience).is_valid())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ImageDerivativeTests(TestCase):
+    """
+    Images that cannot be decoded safely fall back to the original upload.
+    """
+
+    def test_decompression_bomb_falls_back_to_original(self):
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (200, 200), 'red').save(buffer, 'PNG')
+        user = get_user_model().objects.create_user(email='img@example.com', username='img', password='x')
+        project = Project(user=user, title='Big', description='x', technologies='x',
+                          start_date=datetime.date(2020, 1, 1))
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000), self.captureOnCommitCallbacks(execute=True):
+            project.thumbnail.save('big.png', ContentFile(buffer.getvalue()))
+            self.assertIsNone(images.get_derivatives(project.thumbnail, 'thumbnail'))
+            html = Template(
+                "{% load responsive_images %}{% responsive_image project.thumbnail 'thumbnail' 320 %}"
+            ).render(Context({'project': project}))
+        self.assertIn(project.thumbnail.url, html)
+        self.assertNotIn('<picture>', html)
+
+
+class ExportTests(TestCase):
+    """
+    The streamed export archive holds every document, rendered in the pool or in-thread.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email='export@example.com', username='export', password='x', first_name='Ex', last_name='Port',
+        )
+        Profile.objects.create(user=cls.user, skills='Python, Django', location='Berlin')
+        cls.resumes = [
+            GeneratedResume.objects.create(user=cls.user, title=f'Resume {i}', content='# Resume\n\nContent')
+            for i in range(2)
+        ]
+        cls.cover_letter = CoverLetter.objects.create(user=cls.user, company_name='Acme', position='Developer',
+                                                      content='Dear hiring manager')
+
+    def setUp(self):
+        if not (engines.weasyprint.available or engines.reportlab.available):
+            self.skipTest('No PDF engine available')
+
+    def assert_archive(self, workers):
+        data = b''.join(export.stream_user_export(self.user, workers=workers))
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(archive.namelist(), [
+                'profile.json',
+                'portfolio.pdf',
+                f'resumes/{self.resumes[0].pk}_resume-0.pdf',
+                f'resumes/{self.resumes[1].pk}_resume-1.pdf',
+                f'cover_letters/{self.cover_letter.pk}_acme.pdf',
+            ])
+            for name in archive.namelist()[1:]:
+                self.assertTrue(archive.read(name).startswith(b'%PDF'), name)
+
+    def test_export_in_process_pool(self):
+        self.assert_archive(workers=2)
+        pid, workers, executor = export._pool
+        self.addCleanup(export._discard_pool, executor)
+        self.assertEqual(workers, 2)
+
+    def test_export_in_thread(self):
+        self.assert_archive(workers=1)
@@ -24,6 +24,7 @@ urlpatterns = [
     
     # Profile
     path('profile/edit/', views.profile_edit, name='profile_edit'),
+    path('profile/import/', views.profile_import, name='profile_import'),
     
     # Education
     path('education/', views.education_list, name='education_list'),
@@ -64,4 +65,7 @@ urlpatterns = [
     path('portfolio/', views.portfolio_view, name='portfolio_view'),
     path('portfolio/download/', views.portfolio_download_pdf, name='portfolio_download_pdf'),
     
+    # Bulk export
+    path('export/', views.export_all, name='export_all'),
+    
 ]
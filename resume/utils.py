@@ -1,31 +1,22 @@
 """
 Utility functions for PDF generation and other helper functions.
 """
+import re
 from io import BytesIO
 from django.http import HttpResponse
 from django.template.loader import render_to_string
 
-try:
-    from weasyprint import HTML, CSS
-    from weasyprint.text.fonts import FontConfiguration
-    WEASYPRINT_AVAILABLE = True
-except (ImportError, OSError):
-    WEASYPRINT_AVAILABLE = False
-    HTML = None
-    CSS = None
-    FontConfiguration = None
+# WeasyPrint and ReportLab are imported on first use (resume/engines.py)
+from . import engines
 
-# Try to import ReportLab as fallback
-try:
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-    from reportlab.lib.units import inch
-    from reportlab.lib import colors
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
+# Patterns used on every PDF and markdown render, compiled once at import
+# (in the gunicorn master when warmed up, see resume/warmup.py)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+BOLD_RE = re.compile(r'\*\*(.+?)\*\*')
+H1_RE = re.compile(r'^# (.+)$', re.MULTILINE)
+H2_RE = re.compile(r'^## (.+)$', re.MULTILINE)
+H3_RE = re.compile(r'^### (.+)$', re.MULTILINE)
+HR_RE = re.compile(r'^---$', re.MULTILINE)
 
 
 def get_template_css(template='modern'):
@@ -653,53 +644,70 @@ def get_template_css(template='modern'):
     return base_css + specific_css
 
 
-def generate_pdf_from_html(html_content, filename='resume.pdf', template='modern'):
+def render_pdf_bytes(html_content, template='modern'):
     """
-    Generate a PDF file from HTML content using WeasyPrint (preferred) or ReportLab (fallback).
+    Render HTML content to raw PDF bytes using WeasyPrint (preferred) or ReportLab (fallback).
     
     Args:
         html_content: HTML string to convert to PDF
-        filename: Name of the PDF file
         template: Template ID for styling
     
     Returns:
-        HttpResponse with PDF content
+        PDF content as bytes, or None if no PDF engine is available
     """
-    if WEASYPRINT_AVAILABLE:
+    weasyprint = engines.weasyprint.load()
+    if weasyprint:
         # Use WeasyPrint if available
         buffer = BytesIO()
         
-        # Font configuration for better rendering (if available)
-        font_config = FontConfiguration() if FontConfiguration else None
+        # Font configuration for better rendering
+        font_config = weasyprint.FontConfiguration()
         
         # Get template-specific CSS
         css_string = get_template_css(template)
-        css = CSS(string=css_string, font_config=font_config) if CSS else None
+        css = weasyprint.CSS(string=css_string, font_config=font_config)
         
         # Generate PDF
-        if HTML:
-            HTML(string=html_content).write_pdf(buffer, stylesheets=[css] if css else [], font_config=font_config)
+        weasyprint.HTML(string=html_content).write_pdf(buffer, stylesheets=[css], font_config=font_config)
         
         # Get PDF content
         pdf_content = buffer.getvalue()
         buffer.close()
-        
-        # Create HTTP response
-        response = HttpResponse(pdf_content, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        return response
+        return pdf_content
     
-    elif REPORTLAB_AVAILABLE:
+    elif engines.reportlab.available:
         # Use ReportLab as fallback
-        return generate_pdf_with_reportlab(html_content, filename, template)
+        return render_pdf_bytes_with_reportlab(html_content, template)
+    
+    return None
+
+
+def generate_pdf_from_html(html_content, filename='resume.pdf', template='modern'):
+    """
+    Generate a PDF file from HTML content using WeasyPrint (preferred) or ReportLab (fallback).
+    
+    Args:
+        html_content: HTML string to convert to PDF
+        filename: Name of the PDF file
+        template: Template ID for styling
+    
+    Returns:
+        HttpResponse with PDF content
+    """
+    pdf_content = render_pdf_bytes(html_content, template)
     
-    else:
+    if pdf_content is None:
         # Neither library available
         response = HttpResponse("PDF generation is currently unavailable. Please install WeasyPrint or ReportLab.", 
                               content_type='text/plain')
         response.status_code = 503  # Service Unavailable
         return response
+    
+    # Create HTTP response
+    response = HttpResponse(pdf_content, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    
+    return response
 
 
 def generate_pdf_with_reportlab(html_content, filename='resume.pdf', template='modern'):
@@ -714,14 +722,35 @@ def generate_pdf_with_reportlab(html_content, filename='resume.pdf', template='m
     Returns:
         HttpResponse with PDF content
     """
+    pdf_content = render_pdf_bytes_with_reportlab(html_content, template)
+    
+    # Create HTTP response
+    response = HttpResponse(pdf_content, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    
+    return response
+
+
+def render_pdf_bytes_with_reportlab(html_content, template='modern'):
+    """
+    Render HTML content to raw PDF bytes using ReportLab.
+    
+    Args:
+        html_content: HTML string to convert to PDF
+        template: Template ID for styling
+    
+    Returns:
+        PDF content as bytes
+    """
+    rl = engines.reportlab.load()
     buffer = BytesIO()
     
     # Create PDF document
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
+    doc = rl.SimpleDocTemplate(buffer, pagesize=rl.A4)
+    styles = rl.getSampleStyleSheet()
     
     # Create custom styles
-    title_style = ParagraphStyle(
+    title_style = rl.ParagraphStyle(
         'CustomTitle',
         parent=styles['Heading1'],
         fontSize=18,
@@ -729,7 +758,7 @@ def generate_pdf_with_reportlab(html_content, filename='resume.pdf', template='m
         alignment=1,  # Center alignment
     )
     
-    normal_style = ParagraphStyle(
+    normal_style = rl.ParagraphStyle(
         'CustomNormal',
         parent=styles['Normal'],
         fontSize=12,
@@ -740,11 +769,10 @@ def generate_pdf_with_reportlab(html_content, filename='resume.pdf', template='m
     story = []
     
     # Simple HTML to text conversion (basic implementation)
-    import re
     from html import unescape
     
     # Remove HTML tags and convert to plain text
-    text_content = re.sub(r'<[^>]+>', '', html_content)
+    text_content = HTML_TAG_RE.sub('', html_content)
     text_content = unescape(text_content)
     
     # Split into paragraphs
@@ -755,11 +783,11 @@ def generate_pdf_with_reportlab(html_content, filename='resume.pdf', template='m
         if para:
             if len(para) < 50 and not para.endswith('.'):
                 # Likely a title
-                story.append(Paragraph(para, title_style))
+                story.append(rl.Paragraph(para, title_style))
             else:
                 # Regular paragraph
-                story.append(Paragraph(para, normal_style))
-            story.append(Spacer(1, 12))
+                story.append(rl.Paragraph(para, normal_style))
+            story.append(rl.Spacer(1, 12))
     
     # Build PDF
     doc.build(story)
@@ -768,11 +796,7 @@ def generate_pdf_with_reportlab(html_content, filename='resume.pdf', template='m
     pdf_content = buffer.getvalue()
     buffer.close()
     
-    # Create HTTP response
-    response = HttpResponse(pdf_content, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
-    return response
+    return pdf_content
 
 
 def format_resume_for_pdf(user, resume_content):
@@ -786,7 +810,6 @@ def format_resume_for_pdf(user, resume_content):
     Returns:
         Formatted HTML string
     """
-    import re
     from html import escape
     
     # Check if content is already HTML (starts with HTML tags)
@@ -864,7 +887,7 @@ def format_resume_for_pdf(user, resume_content):
                 in_list = True
             item_text = line[2:].strip() if line.startswith(('- ', '* ')) else line[2:].strip()
             # Handle bold text in list items
-            item_text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', item_text)
+            item_text = BOLD_RE.sub(r'<strong>\1</strong>', item_text)
             formatted_lines.append(f"<li>{item_text}</li>")
         # Check for horizontal rules
         elif line in ['---', '***', '___']:
@@ -881,7 +904,7 @@ def format_resume_for_pdf(user, resume_content):
                 formatted_lines.append('</ul>')
                 in_list = False
             # Handle bold text
-            line = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', line)
+            line = BOLD_RE.sub(r'<strong>\1</strong>', line)
             current_paragraph.append(line)
     
     # Close any remaining open elements
@@ -907,23 +930,75 @@ def format_resume_for_pdf(user, resume_content):
     return html_content
 
 
+def format_cover_letter_for_pdf(user, cover_letter):
+    """
+    Format cover letter content into HTML suitable for PDF generation.
+    
+    Args:
+        user: User object
+        cover_letter: CoverLetter object
+    
+    Returns:
+        Formatted HTML string
+    """
+    from html import escape
+    
+    # Format the cover letter content - convert line breaks to paragraphs
+    content_paragraphs = []
+    for paragraph in cover_letter.content.split('\n\n'):
+        paragraph = paragraph.strip()
+        if paragraph:
+            # Replace single line breaks with <br> within paragraphs
+            paragraph = paragraph.replace('\n', '<br>')
+            # Handle bold text
+            paragraph = BOLD_RE.sub(r'<strong>\1</strong>', paragraph)
+            content_paragraphs.append(f'<p>{escape(paragraph)}</p>')
+    
+    formatted_content = ''.join(content_paragraphs)
+    
+    # Create HTML for PDF
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <title>Cover Letter - {escape(cover_letter.company_name)}</title>
+    </head>
+    <body>
+        <div class="header">
+            <h1>{escape(user.get_full_name())}</h1>
+            <p class="contact-info">{escape(user.email)}</p>
+            <p class="date">{cover_letter.created_at.strftime('%B %d, %Y')}</p>
+        </div>
+        <div class="section">
+            <p><strong>{escape(cover_letter.company_name)}</strong><br>
+            <strong>Re: {escape(cover_letter.position)}</strong></p>
+        </div>
+        <div class="content">
+            {formatted_content}
+        </div>
+    </body>
+    </html>
+    """
+    
+    return html_content
+
+
 def markdown_to_html(text):
     """
     Convert simple markdown formatting to HTML.
     Supports headers, bold, lists, and line breaks.
     """
-    import re
-    
     # Replace headers
-    text = re.sub(r'^# (.+)$', r'<h1>\1</h1>', text, flags=re.MULTILINE)
-    text = re.sub(r'^## (.+)$', r'<h2>\1</h2>', text, flags=re.MULTILINE)
-    text = re.sub(r'^### (.+)$', r'<h3>\1</h3>', text, flags=re.MULTILINE)
+    text = H1_RE.sub(r'<h1>\1</h1>', text)
+    text = H2_RE.sub(r'<h2>\1</h2>', text)
+    text = H3_RE.sub(r'<h3>\1</h3>', text)
     
     # Replace bold text
-    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    text = BOLD_RE.sub(r'<strong>\1</strong>', text)
     
     # Replace horizontal rules
-    text = re.sub(r'^---$', r'<hr>', text, flags=re.MULTILINE)
+    text = HR_RE.sub(r'<hr>', text)
     
     # Replace line breaks with paragraphs
     paragraphs = text.split('\n\n')
@@ -952,6 +1027,11 @@ def markdown_to_html(text):
     return '\n'.join(html_paragraphs)
 
 
+# Widths (CSS px) images are shown at in portfolio PDFs; derivatives of about twice that are embedded
+PDF_PHOTO_WIDTH = 96
+PDF_THUMBNAIL_WIDTH = 320
+
+
 def create_portfolio_html(user):
     """
     Create a complete portfolio HTML page for a user.
@@ -963,6 +1043,7 @@ def create_portfolio_html(user):
         HTML string
     """
     from .models import Profile, Education, Experience, Project
+    from .images import image_data_uri
     from html import escape
     
     try:
@@ -983,6 +1064,17 @@ def create_portfolio_html(user):
     </head>
     <body>
         <div class="header">
+    """
+    
+    # Embed resized JPEG derivatives instead of the original uploads to keep the PDF small
+    photo_uri = image_data_uri(user.profile_photo, 'avatar', PDF_PHOTO_WIDTH)
+    if photo_uri:
+        html += (
+            f'<img src="{photo_uri}" alt="" style="width: {PDF_PHOTO_WIDTH}px; height: {PDF_PHOTO_WIDTH}px; '
+            f'border-radius: 50%; object-fit: cover;">'
+        )
+    
+    html += f"""
             <h1>{escape(user.get_full_name())}</h1>
             <div class="contact-info">
                 <p>{escape(user.email)}{' | ' + escape(user.phone) if user.phone else ''}</p>
@@ -1071,6 +1163,9 @@ def create_portfolio_html(user):
             <div class="item">
                 <h3>{escape(proj.title)}</h3>
             """
+            thumbnail_uri = image_data_uri(proj.thumbnail, 'thumbnail', PDF_THUMBNAIL_WIDTH)
+            if thumbnail_uri:
+                html += f'<img src="{thumbnail_uri}" alt="" style="max-width: {PDF_THUMBNAIL_WIDTH}px; width: 100%;">'
             if proj.get_technologies_list():
                 html += f"<p><strong>Technologies:</strong> {escape(', '.join(proj.get_technologies_list()))}</p>"
             html += f"<p>{escape(proj.description)}</p>"
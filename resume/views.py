@@ -1,14 +1,17 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from .models import Profile, Education, Experience, Project, GeneratedResume, CoverLetter
-from .forms import ProfileForm, EducationForm, ExperienceForm, ProjectForm, CoverLetterForm
+from .forms import ProfileForm, EducationForm, ExperienceForm, ProjectForm, CoverLetterForm, ProfileImportForm
 from .services import AIResumeGenerator
-from .utils import generate_pdf_from_html, format_resume_for_pdf, create_portfolio_html
+from .utils import generate_pdf_from_html, format_resume_for_pdf, format_cover_letter_for_pdf, create_portfolio_html
+from .export import stream_user_export
+from .conditional import conditional_view, resume_state, cover_letter_state, portfolio_state
+from .importers import ImportFileError, parse_import_file, validate_entries, import_entries
 from users.forms import UserProfileForm
-from .countries_data import STATES_BY_COUNTRY
+from core.ratelimit import ratelimit
 import json
 
 
@@ -70,9 +73,6 @@ def profile_edit(request):
     """
     Edit user profile and personal information.
     """
-    from .countries_data import STATES_BY_COUNTRY
-    import json
-    
     profile, created = Profile.objects.get_or_create(user=request.user)
     
     if request.method == 'POST':
@@ -91,12 +91,60 @@ def profile_edit(request):
     context = {
         'user_form': user_form,
         'profile_form': profile_form,
-        'states_json': json.dumps(STATES_BY_COUNTRY),
     }
     
     return render(request, 'resume/profile_edit.html', context)
 
 
+@login_required
+def profile_import(request):
+    """
+    Import education, experience and project entries from a JSON Resume document
+    or LinkedIn data export. Uploads are previewed first (dry run); the parsed
+    entries are kept in the session until the user confirms the import.
+    """
+    session_key = 'profile_import_entries'
+    
+    if request.method == 'POST' and 'confirm' in request.POST:
+        entries = request.session.pop(session_key, None)
+        if not entries:
+            messages.error(request, 'Nothing to import. Please upload your file again.')
+            return redirect('profile_import')
+        
+        result = validate_entries(entries)
+        counts = import_entries(request.user, result)
+        messages.success(
+            request,
+            f"Imported {counts['education']} education, {counts['experience']} experience "
+            f"and {counts['projects']} project entries."
+        )
+        return redirect('dashboard')
+    
+    result = None
+    if request.method == 'POST':
+        form = ProfileImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                entries = parse_import_file(form.cleaned_data['file'])
+            except ImportFileError as e:
+                form.add_error('file', str(e))
+            else:
+                result = validate_entries(entries)
+                if result.valid_count:
+                    request.session[session_key] = entries
+                else:
+                    request.session.pop(session_key, None)
+    else:
+        form = ProfileImportForm()
+    
+    context = {
+        'form': form,
+        'result': result,
+    }
+    
+    return render(request, 'resume/profile_import.html', context)
+
+
 # Education Views
 @login_required
 def education_list(request):
@@ -189,7 +237,6 @@ def experience_add(request):
     context = {
         'form': form,
         'action': 'Add',
-        'states_json': json.dumps(STATES_BY_COUNTRY)
     }
     return render(request, 'resume/experience_form.html', context)
 
@@ -213,7 +260,6 @@ def experience_edit(request, pk):
     context = {
         'form': form,
         'action': 'Edit',
-        'states_json': json.dumps(STATES_BY_COUNTRY)
     }
     return render(request, 'resume/experience_form.html', context)
 
@@ -298,6 +344,7 @@ def project_delete(request, pk):
 
 # AI Resume Generation Views
 @login_required
+@ratelimit('generate:user', message='You are generating too quickly. Please wait a few minutes and try again.')
 def generate_resume(request):
     """
     Generate AI-powered resume with template selection.
@@ -417,6 +464,7 @@ def generate_resume(request):
 
 
 @login_required
+@conditional_view(resume_state)
 def resume_view(request, pk):
     """
     View generated resume.
@@ -426,6 +474,7 @@ def resume_view(request, pk):
 
 
 @login_required
+@conditional_view(resume_state, page=False)
 def resume_download_pdf(request, pk):
     """
     Download resume as PDF with template styling.
@@ -471,6 +520,7 @@ def resume_delete(request, pk):
 
 
 @login_required
+@conditional_view(portfolio_state)
 def portfolio_view(request):
     """
     View user's portfolio.
@@ -491,6 +541,7 @@ def portfolio_view(request):
 
 
 @login_required
+@conditional_view(portfolio_state, page=False)
 def portfolio_download_pdf(request):
     """
     Download portfolio as PDF with template styling.
@@ -507,12 +558,24 @@ def portfolio_download_pdf(request):
     )
 
 
+@login_required
+def export_all(request):
+    """
+    Download all resumes, cover letters and the portfolio as a single ZIP archive,
+    together with a JSON dump of the profile data.
+    """
+    response = StreamingHttpResponse(stream_user_export(request.user), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="export_{request.user.username}.zip"'
+    return response
+
+
 # Theme switching removed: site now uses fixed light theme and no server-side endpoint is needed.
 
 
 # ==================== COVER LETTER VIEWS ====================
 
 @login_required
+@ratelimit('generate:user', message='You are generating too quickly. Please wait a few minutes and try again.')
 def generate_cover_letter(request):
     """
     Generate AI-powered cover letter based on user profile and job details.
@@ -596,6 +659,7 @@ def cover_letter_list(request):
 
 
 @login_required
+@conditional_view(cover_letter_state)
 def cover_letter_view(request, pk):
     """
     View a specific cover letter.
@@ -610,55 +674,17 @@ def cover_letter_view(request, pk):
 
 
 @login_required
+@conditional_view(cover_letter_state, page=False)
 def cover_letter_download_pdf(request, pk):
     """
     Download cover letter as PDF with template styling.
     """
-    from html import escape
-    import re
-    
     cover_letter = get_object_or_404(CoverLetter, pk=pk, user=request.user)
     
     # Get template from cover letter object or query parameter, default to classic
     template = request.GET.get('template', cover_letter.template if hasattr(cover_letter, 'template') and cover_letter.template else 'classic')
     
-    # Format the cover letter content - convert line breaks to paragraphs
-    content_paragraphs = []
-    for paragraph in cover_letter.content.split('\n\n'):
-        paragraph = paragraph.strip()
-        if paragraph:
-            # Replace single line breaks with <br> within paragraphs
-            paragraph = paragraph.replace('\n', '<br>')
-            # Handle bold text
-            paragraph = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', paragraph)
-            content_paragraphs.append(f'<p>{escape(paragraph)}</p>')
-    
-    formatted_content = ''.join(content_paragraphs)
-    
-    # Create HTML for PDF
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>Cover Letter - {escape(cover_letter.company_name)}</title>
-    </head>
-    <body>
-        <div class="header">
-            <h1>{escape(request.user.get_full_name())}</h1>
-            <p class="contact-info">{escape(request.user.email)}</p>
-            <p class="date">{cover_letter.created_at.strftime('%B %d, %Y')}</p>
-        </div>
-        <div class="section">
-            <p><strong>{escape(cover_letter.company_name)}</strong><br>
-            <strong>Re: {escape(cover_letter.position)}</strong></p>
-        </div>
-        <div class="content">
-            {formatted_content}
-        </div>
-    </body>
-    </html>
-    """
+    html_content = format_cover_letter_for_pdf(request.user, cover_letter)
     
     return generate_pdf_from_html(
         html_content,
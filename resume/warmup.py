@@ -0,0 +1,126 @@
+"""
+Startup warm-up: load what every worker would otherwise build on its first requests.
+
+warm_up() imports the URLconf (all views, forms and the country lookup
+tables), compiles every template into the cached loader, loads the static
+files manifest and translations, imports the PDF and LLM libraries and renders
+a tiny PDF with each available engine (WeasyPrint loads its fonts then).
+
+Run in the gunicorn master before it forks (gunicorn.conf.py, or
+WARMUP_ON_STARTUP with --preload), the workers inherit all of it
+copy-on-write instead of each building a private copy, and the first request
+after a restart is not slowed down. gc.freeze() at the end keeps the
+collector from touching, and so copying, the inherited objects.
+"""
+import gc
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def _urls():
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    return None
+
+
+def _templates():
+    from django.template import TemplateSyntaxError, engines as template_engines
+    from django.template.loader import get_template
+
+    loaded = failed = 0
+    for engine in template_engines.all():
+        for directory in engine.template_dirs:
+            for root, dirs, names in os.walk(directory):
+                for name in names:
+                    if not name.endswith(('.html', '.txt')):
+                        continue
+                    template_name = os.path.relpath(os.path.join(root, name), directory).replace(os.sep, '/')
+                    try:
+                        get_template(template_name)
+                        loaded += 1
+                    except (TemplateSyntaxError, UnicodeDecodeError, LookupError):
+                        failed += 1
+    return f"{loaded} templates" + (f", {failed} skipped" if failed else '')
+
+
+def _stylesheets():
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    from .models import GeneratedResume
+    from .utils import get_template_css
+
+    for template, _ in GeneratedResume.TEMPLATE_CHOICES:
+        get_template_css(template)
+    # Loads the manifest of hashed static file names
+    manifest = getattr(staticfiles_storage, 'hashed_files', None)
+    return f"{len(manifest)} static files" if manifest is not None else None
+
+
+def _translations():
+    from django.utils import translation
+
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('Home')
+    return None
+
+
+def _pdf_engines():
+    from . import engines
+    from .utils import render_pdf_bytes, render_pdf_bytes_with_reportlab
+
+    engines.preload()
+    html = '<h1>Warm-up</h1><p>Loads <strong>fonts</strong> and page layout code.</p>'
+    rendered = []
+    if engines.weasyprint.available:
+        render_pdf_bytes(html)
+        rendered.append('WeasyPrint')
+    if engines.reportlab.available:
+        render_pdf_bytes_with_reportlab(html)
+        rendered.append('ReportLab')
+    return ', '.join(rendered) or 'no PDF engine'
+
+
+STEPS = {
+    'urls': _urls,
+    'templates': _templates,
+    'stylesheets': _stylesheets,
+    'translations': _translations,
+    'pdf_engines': _pdf_engines,
+}
+
+
+def warm_up(freeze=True):
+    """
+    Run every warm-up step; returns {step: milliseconds}.
+
+    A failing step is logged and skipped. Database connections opened on the
+    way are closed, so forked workers do not share a socket.
+    """
+    timings = {}
+    start = time.perf_counter()
+    for name, step in STEPS.items():
+        step_start = time.perf_counter()
+        try:
+            detail = step()
+        except Exception as e:
+            logger.warning(f"⚠️ Warm-up step '{name}' failed: {e}")
+            continue
+        timings[name] = round((time.perf_counter() - step_start) * 1000, 1)
+        if detail:
+            logger.debug(f"Warm-up step '{name}': {detail}")
+    connections.close_all()
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    logger.info(
+        f"🔥 Warm-up done in {(time.perf_counter() - start) * 1000:.0f} ms "
+        f"({', '.join(f'{name} {ms:.0f} ms' for name, ms in timings.items())})"
+    )
+    return timings
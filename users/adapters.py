@@ -22,7 +22,8 @@ class CustomAccountAdapter(DefaultAccountAdapter):
             # Don't send allauth password reset email
             return
         
-        # Allow other emails (verification, etc.)
+        # Allow other emails (verification, etc.); they go through EMAIL_BACKEND,
+        # i.e. the outbound mail queue when EMAIL_QUEUE_ENABLED is set
         super().send_mail(template_prefix, email, context)
     
     def get_login_redirect_url(self, request):
@@ -41,12 +42,12 @@ class CustomAccountAdapter(DefaultAccountAdapter):
         )
         return reverse('account_login')
     
-    def add_message(self, request, level, message_tag, message, extra_tags='', fail_silently=False):
+    def add_message(self, request, level, message_template, message_context=None, extra_tags=''):
         """
-        Override to customize success messages for signup.
-        Safely handle message type.
+        Override to customize the signed-in message.
+        Takes allauth's signature: the message comes from a template.
         """
-        msg_str = str(message) if not isinstance(message, str) else message
-        if 'successfully signed in' in msg_str.lower():
-            msg_str = '✅ Welcome! You have successfully logged in.'
-        super().add_message(request, level, message_tag, msg_str, extra_tags, fail_silently)
+        if message_template == 'account/messages/logged_in.txt':
+            messages.add_message(request, level, '✅ Welcome! You have successfully logged in.', extra_tags=extra_tags)
+            return
+        super().add_message(request, level, message_template, message_context, extra_tags)
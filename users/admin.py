@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.html import format_html
-from .models import CustomUser, SignupOTP, PasswordResetOTP
+from django.utils import timezone
+from .models import CustomUser, SignupOTP, PasswordResetOTP, OutboundEmail
 
 
 @admin.register(CustomUser)
@@ -99,3 +100,26 @@ class PasswordResetOTPAdmin(admin.ModelAdmin):
             '<span style="background-color: #dc3545; color: white; padding: 3px 10px; border-radius: 3px;">Expired/Used</span>'
         )
     is_valid_badge.short_description = 'Validity'
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    """Admin interface for the outbound mail queue."""
+    list_display = ['subject', 'recipients', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['subject', 'to']
+    readonly_fields = ['created_at', 'sent_at', 'claim']
+    ordering = ['-created_at']
+    actions = ['retry_now']
+
+    def recipients(self, obj):
+        """Display the To addresses."""
+        return ', '.join(obj.to)
+    recipients.short_description = 'To'
+
+    def retry_now(self, request, queryset):
+        """Re-queue the selected messages for immediate delivery."""
+        updated = queryset.exclude(status=OutboundEmail.STATUS_SENT).update(
+            status=OutboundEmail.STATUS_QUEUED, attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f"{updated} message(s) queued for delivery.")
+    retry_now.short_description = 'Retry selected messages now'
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        # Connect the request signals that scope EmailOrUsernameBackend's user cache
+        from . import auth_backends  # noqa: F401
+
+        # Optional in-process purge of expired OTPs/sessions (MAINTENANCE_INTERVAL_SECONDS > 0).
+        # The thread is started by the first request, not here: a gunicorn master sets up Django
+        # before forking (gunicorn.conf.py warm-up, --preload, WARMUP_ON_STARTUP) and must not run
+        # it, or its database connection would be inherited by every worker. Each worker starts
+        # its own; management commands start none.
+        if settings.MAINTENANCE_INTERVAL_SECONDS > 0:
+            from django.core.signals import request_started
+            from .maintenance import start_scheduler_on_request
+            request_started.connect(start_scheduler_on_request, dispatch_uid='users-maintenance-scheduler')
@@ -3,33 +3,101 @@ Custom authentication backend to support both email and username login.
 
 Improvements:
 - Accept `login` as a fallback key (allauth may pass 'login' instead of 'username').
-- Handle MultipleObjectsReturned by using filter().first() to avoid unhandled exceptions
-  when duplicate records exist (which previously caused a 500).
+- Dispatch on the login value: values containing '@' are matched case-insensitively
+  against the email (LOWER(email) functional index), anything else against the
+  username (unique index). One indexed query per login attempt.
+- Memoize get_user() for the duration of a request.
+- Throttle failed logins per client IP and per account (core.ratelimit), checked
+  before the user lookup and the password hash.
 - Add logging for easier diagnostics in production.
 """
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
-from django.db.models import Q
-from django.core.exceptions import MultipleObjectsReturned
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.core.exceptions import PermissionDenied
+from django.core.signals import request_started, request_finished
+from django.dispatch import receiver
+from core import ratelimit
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+# Per-thread cache of user_id -> user, only active while a request is being handled
+_request_cache = threading.local()
+
+
+@receiver(request_started)
+def _start_user_cache(sender, **kwargs):
+    _request_cache.users = {}
+
+
+@receiver(request_finished)
+def _clear_user_cache(sender, **kwargs):
+    _request_cache.users = None
+
+
+def login_retry_after(request, login_value):
+    """
+    Return the seconds to wait if the client IP or the account has too many failed logins, else 0.
+    """
+    account = (login_value or '').strip().lower()
+    return max(
+        ratelimit.is_limited('login:ip', ratelimit.get_client_ip(request)) if request is not None else 0,
+        ratelimit.is_limited('login:account', account) if account else 0,
+    )
+
+
+@receiver(user_login_failed)
+def _count_failed_login(sender, credentials, request=None, **kwargs):
+    if request is None or getattr(request, '_login_ratelimited', False):
+        # Rejected attempts are not counted again
+        return
+    ratelimit.hit('login:ip', ratelimit.get_client_ip(request))
+    login_value = credentials.get('username') or credentials.get('login') or credentials.get('email')
+    if login_value:
+        ratelimit.hit('login:account', login_value.strip().lower())
+
+
+@receiver(user_logged_in)
+def _reset_failed_logins(sender, request, user, **kwargs):
+    for login_value in {user.email, user.username}:
+        if login_value:
+            ratelimit.reset('login:account', login_value.strip().lower())
+
 
 class EmailOrUsernameBackend(ModelBackend):
     """
     Allow users to authenticate with either email or username.
     """
 
+    def get_login_user(self, login_value):
+        """
+        Return the user for an email address or username, or None.
+
+        Usernames containing '@' are treated as email addresses; such users log
+        in with their email instead.
+        """
+        if '@' in login_value:
+            # Emails are unique but case-sensitive in the database, so two rows
+            # may differ only in case; prefer the exact match in that case.
+            candidates = list(User.objects.filter_by_email(login_value).order_by('pk')[:2])
+            if len(candidates) > 1:
+                logger.warning("Multiple users found for login value=%s. Preferring exact match.", login_value)
+            return next((user for user in candidates if user.email == login_value), candidates[0] if candidates else None)
+        try:
+            return User.objects.get(username=login_value)
+        except User.DoesNotExist:
+            return None
+
     def authenticate(self, request, username=None, password=None, **kwargs):
         """
         Authenticate using email or username.
 
         Note: allauth sometimes sends the value under the key 'login' instead of
-        'username', so we accept that as a fallback. Also handle MultipleObjectsReturned
-        by falling back to the first matching user.
+        'username', so we accept that as a fallback.
         """
         # Accept alternate kwarg keys used by some auth libraries
         login_value = username or kwargs.get('login') or kwargs.get('email')
@@ -37,28 +105,28 @@ class EmailOrUsernameBackend(ModelBackend):
         if not login_value:
             return None
 
-        try:
-            # Prefer a single get(), but guard against duplicates
-            try:
-                user = User.objects.get(Q(username=login_value) | Q(email=login_value))
-            except MultipleObjectsReturned:
-                # If multiple users match (shouldn't happen with unique emails), pick the first
-                logger.warning(
-                    "Multiple users found for login value=%s. Falling back to first().",
-                    login_value,
-                )
-                user = User.objects.filter(Q(username=login_value) | Q(email=login_value)).first()
-
-            if not user:
-                return None
+        retry_after = login_retry_after(request, login_value)
+        if retry_after:
+            # PermissionDenied stops django.contrib.auth.authenticate() from
+            # trying the remaining backends
+            if request is not None:
+                request._login_ratelimited = True
+            logger.warning("Login throttled for login value=%s (retry in %ss)", login_value, retry_after)
+            raise PermissionDenied
 
-        except User.DoesNotExist:
-            return None
+        try:
+            user = self.get_login_user(login_value.strip())
         except Exception as e:
             # Log unexpected exceptions and return None (avoid 500s)
             logger.exception("Unexpected error in EmailOrUsernameBackend.authenticate: %s", e)
             return None
 
+        if not user:
+            # Run the password hasher once to reduce the timing difference
+            # between an existing and a nonexistent user (as ModelBackend does)
+            User().set_password(password)
+            return None
+
         # Check password and ensure user is allowed to authenticate
         try:
             if user.check_password(password) and self.user_can_authenticate(user):
@@ -70,9 +138,15 @@ class EmailOrUsernameBackend(ModelBackend):
 
     def get_user(self, user_id):
         """
-        Get user by ID.
+        Get user by ID, memoized for the current request.
         """
+        cache = getattr(_request_cache, 'users', None)
+        if cache is not None and user_id in cache:
+            return cache[user_id]
         try:
-            return User.objects.get(pk=user_id)
+            user = User.objects.get(pk=user_id)
         except User.DoesNotExist:
-            return None
+            user = None
+        if cache is not None:
+            cache[user_id] = user
+        return user
@@ -288,6 +288,7 @@ def email_diagnostic(request):
     """
     config = {
         'EMAIL_BACKEND': settings.EMAIL_BACKEND,
+        'EMAIL_DELIVERY_BACKEND': getattr(settings, 'EMAIL_DELIVERY_BACKEND', settings.EMAIL_BACKEND),
         'EMAIL_HOST': getattr(settings, 'EMAIL_HOST', 'Not set'),
         'EMAIL_PORT': getattr(settings, 'EMAIL_PORT', 'Not set'),
         'EMAIL_USE_TLS': getattr(settings, 'EMAIL_USE_TLS', False),
@@ -297,7 +298,7 @@ def email_diagnostic(request):
     }
     
     # Check if SMTP is configured
-    is_smtp = 'smtp' in settings.EMAIL_BACKEND.lower()
+    is_smtp = 'smtp' in getattr(settings, 'EMAIL_DELIVERY_BACKEND', settings.EMAIL_BACKEND).lower()
     has_credentials = bool(getattr(settings, 'EMAIL_HOST_USER', '')) and bool(getattr(settings, 'EMAIL_HOST_PASSWORD', ''))
     
     return JsonResponse({
@@ -49,7 +49,7 @@ class CustomSignupForm(SignupForm):
             raise forms.ValidationError('Please enter a valid email address.')
 
         # Check existing user (case-insensitive)
-        if CustomUser.objects.filter(email__iexact=email).exists():
+        if CustomUser.objects.filter_by_email(email).exists():
             raise forms.ValidationError('A user with this email already exists. Try logging in instead.')
 
         return email
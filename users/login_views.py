@@ -12,6 +12,8 @@ from allauth.exceptions import ImmediateHttpResponse
 import logging
 from django.forms.forms import NON_FIELD_ERRORS
 from django.forms.utils import ErrorList
+from core.ratelimit import ratelimited_response
+from .auth_backends import login_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +24,21 @@ class CustomLoginView(AllauthLoginView):
     - 'Remember me' checkbox for session persistence
     - Graceful error handling to prevent 500 errors
     - Proper session expiry management
+    - Throttling of repeated failed logins (HTTP 429)
     """
+
+    def post(self, request, *args, **kwargs):
+        """
+        Reject throttled clients before the form runs any query or password hash.
+        """
+        retry_after = login_retry_after(request, request.POST.get('login'))
+        if retry_after:
+            return ratelimited_response(
+                request, retry_after,
+                'Too many failed login attempts. Please wait a few minutes and try again, '
+                'or use "Forgot password" to reset your password.'
+            )
+        return super().post(request, *args, **kwargs)
     
     def form_valid(self, form):
         """
@@ -0,0 +1,256 @@
+"""
+Email backends.
+
+QueuedEmailBackend stores messages in the outbound mail queue instead of
+talking to the mail server, so views return as soon as a message is
+enqueued. The actual delivery backend is settings.EMAIL_DELIVERY_BACKEND.
+
+PooledSMTPEmailBackend keeps authenticated SMTP connections open between
+sends; it is the delivery backend when SMTP credentials are configured.
+"""
+import atexit
+import logging
+import smtplib
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.mail.backends import smtp
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import sanitize_address
+
+from .mail_queue import enqueue, get_delivery_connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Email backend writing messages to the OutboundEmail spool.
+
+    Messages with attachments cannot be stored in the spool and are handed to
+    the delivery backend directly.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        queueable = [message for message in email_messages if not message.attachments]
+        direct = [message for message in email_messages if message.attachments]
+        count = 0
+        try:
+            if queueable:
+                count += enqueue(queueable)
+            if direct:
+                count += get_delivery_connection(fail_silently=self.fail_silently).send_messages(direct) or 0
+        except Exception:
+            logger.exception("Failed to queue outgoing email")
+            if not self.fail_silently:
+                raise
+        return count
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of open, authenticated SMTP connections.
+
+    Idle connections are reused most-recently-used first. A connection idle for
+    longer than `health_check_interval` is checked with NOOP before reuse, and
+    one idle for longer than `idle_timeout` is closed instead. At most
+    `max_size` connections are open at the same time.
+    """
+
+    def __init__(self, max_size=4, idle_timeout=60, health_check_interval=15, acquire_timeout=30):
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    @staticmethod
+    def _quit(connection):
+        try:
+            connection.quit()
+        except Exception:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_healthy(connection):
+        try:
+            return connection.noop()[0] == 250
+        except Exception:
+            return False
+
+    def acquire(self, factory):
+        """Return a usable connection, opening a new one with factory() if needed."""
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise smtplib.SMTPException("Timed out waiting for a free SMTP connection")
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, last_used = self._idle.pop()
+                idle_for = time.monotonic() - last_used
+                if idle_for > self.idle_timeout:
+                    self._quit(connection)
+                elif idle_for > self.health_check_interval and not self._is_healthy(connection):
+                    logger.info("SMTP connection failed health check, reconnecting")
+                    self._quit(connection)
+                else:
+                    return connection
+            return factory()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection):
+        """Return a healthy connection to the pool."""
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            self._idle.append((connection, now))
+            while self._idle and now - self._idle[0][1] > self.idle_timeout:
+                expired.append(self._idle.popleft()[0])
+        self._slots.release()
+        for stale in expired:
+            self._quit(stale)
+
+    def discard(self, connection):
+        """Close a broken connection and free its slot."""
+        if connection is not None:
+            self._quit(connection)
+        self._slots.release()
+
+    def close_all(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _ in idle:
+            self._quit(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key):
+    """Return the process-wide connection pool for an SMTP server/account."""
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = SMTPConnectionPool(
+                max_size=getattr(settings, 'EMAIL_POOL_SIZE', 4),
+                idle_timeout=getattr(settings, 'EMAIL_POOL_IDLE_TIMEOUT', 60),
+                health_check_interval=getattr(settings, 'EMAIL_POOL_HEALTH_CHECK_INTERVAL', 15),
+            )
+            if len(_pools) == 1:
+                atexit.register(close_pools)
+        return _pools[key]
+
+
+def close_pools():
+    """Close the idle connections of every pool (e.g. at interpreter exit)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
+
+class PooledSMTPEmailBackend(smtp.EmailBackend):
+    """
+    SMTP backend that reuses authenticated connections across send_messages() calls.
+
+    open() takes a connection from the process-wide pool and close() returns
+    it instead of sending QUIT, so the TCP handshake, STARTTLS and AUTH are
+    paid once per pooled connection rather than once per email. All messages
+    of a send_messages() call go over one connection. When the server drops a
+    connection mid-batch, the message is retried once on a fresh connection.
+    """
+
+    # Errors meaning the connection is unusable, as opposed to a rejected message
+    CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+    @property
+    def pool(self):
+        return get_pool((self.host, self.port, self.username, self.use_tls, self.use_ssl))
+
+    def _new_connection(self):
+        self.connection = None
+        if not super().open():
+            # With fail_silently=True a failed STARTTLS or login leaves the socket behind;
+            # it must not reach the pool unauthenticated
+            connection, self.connection = self.connection, None
+            if connection is not None:
+                try:
+                    connection.close()
+                except (OSError, smtplib.SMTPException):
+                    pass
+            return None
+        return self.connection
+
+    def open(self):
+        if self.connection:
+            return False
+        try:
+            self.connection = self.pool.acquire(self._new_connection)
+            if self.connection is None:
+                # Connecting failed silently (fail_silently=True)
+                self.pool.discard(None)
+                return None
+            return True
+        except OSError:
+            self.connection = None
+            if not self.fail_silently:
+                raise
+
+    def close(self):
+        if self.connection is None:
+            return
+        connection, self.connection = self.connection, None
+        self.pool.release(connection)
+
+    def send_messages(self, email_messages):
+        opened_here = self.connection is None
+        try:
+            return super().send_messages(email_messages)
+        finally:
+            # Hand the connection back even when a message raised
+            if opened_here:
+                self.close()
+
+    def _send(self, email_message):
+        """
+        Send one message, retrying once on a new connection if the pooled one is
+        dead. sendmail() is called here rather than through super()._send(),
+        which with fail_silently=True would swallow the disconnect.
+        """
+        if not email_message.recipients():
+            return False
+        encoding = email_message.encoding or settings.DEFAULT_CHARSET
+        from_email = sanitize_address(email_message.from_email, encoding)
+        recipients = [sanitize_address(address, encoding) for address in email_message.recipients()]
+        message = email_message.message().as_bytes(linesep="\r\n")
+        for attempt in range(2):
+            # After a lost connection (or a failed retry of an earlier message) open a new one
+            if self.connection is None and not self.open():
+                return False
+            try:
+                self.connection.sendmail(from_email, recipients, message)
+                return True
+            except self.CONNECTION_ERRORS as exc:
+                broken, self.connection = self.connection, None
+                self.pool.discard(broken)
+                if attempt:
+                    if not self.fail_silently:
+                        raise
+                    return False
+                logger.warning(f"⚠️ SMTP connection lost ({exc}), retrying on a new connection")
+            except smtplib.SMTPException:
+                if not self.fail_silently:
+                    raise
+                return False
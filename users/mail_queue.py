@@ -0,0 +1,236 @@
+"""
+Durable outbound mail queue.
+
+Messages are stored as OutboundEmail rows by QueuedEmailBackend and delivered
+later through the real backend (settings.EMAIL_DELIVERY_BACKEND), either by an
+in-process worker thread or by `manage.py send_queued_mail`.
+
+Workers claim due messages by writing a random claim token and a lease
+(next_attempt_at in the future) in a single UPDATE, so several workers can run
+side by side and a crashed worker's messages become due again when the lease
+expires. Failed deliveries are retried with exponential backoff until
+EMAIL_QUEUE_MAX_ATTEMPTS is reached.
+"""
+import logging
+import random
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+# Seconds a claimed message stays reserved for the worker that claimed it
+CLAIM_LEASE_SECONDS = 300
+
+
+def get_delivery_connection(**kwargs):
+    """Return a connection of the backend that actually delivers queued mail."""
+    return get_connection(getattr(settings, 'EMAIL_DELIVERY_BACKEND', 'django.core.mail.backends.smtp.EmailBackend'), **kwargs)
+
+
+def to_outbound(message):
+    """Convert an EmailMessage into an unsaved OutboundEmail row."""
+    return OutboundEmail(
+        subject=message.subject,
+        body=message.body,
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+        alternatives=[list(alternative) for alternative in getattr(message, 'alternatives', [])],
+    )
+
+
+def to_message(outbound, connection=None):
+    """Rebuild an EmailMessage from an OutboundEmail row."""
+    message_class = EmailMultiAlternatives if outbound.alternatives else EmailMessage
+    message = message_class(
+        subject=outbound.subject,
+        body=outbound.body,
+        from_email=outbound.from_email,
+        to=outbound.to,
+        cc=outbound.cc,
+        bcc=outbound.bcc,
+        reply_to=outbound.reply_to,
+        headers=outbound.headers,
+        connection=connection,
+    )
+    for content, mimetype in outbound.alternatives:
+        message.attach_alternative(content, mimetype)
+    return message
+
+
+def enqueue(messages):
+    """
+    Store messages in the queue and wake the worker once the transaction commits.
+
+    Returns the number of queued messages.
+    """
+    rows = OutboundEmail.objects.bulk_create([to_outbound(message) for message in messages])
+    if rows:
+        transaction.on_commit(wake_worker)
+    return len(rows)
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter for the given number of failed attempts."""
+    base = getattr(settings, 'EMAIL_QUEUE_RETRY_DELAY', 30)
+    delay = min(base * (2 ** (attempts - 1)), getattr(settings, 'EMAIL_QUEUE_MAX_RETRY_DELAY', 3600))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_due(batch_size, now=None):
+    """
+    Reserve up to batch_size due messages for this worker and return them.
+    """
+    now = now or timezone.now()
+    due = OutboundEmail.objects.filter(
+        status__in=[OutboundEmail.STATUS_QUEUED, OutboundEmail.STATUS_SENDING],
+        next_attempt_at__lte=now,
+    ).order_by('next_attempt_at')
+    ids = list(due.values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return []
+    claim = uuid.uuid4().hex
+    due.filter(pk__in=ids).update(
+        status=OutboundEmail.STATUS_SENDING,
+        claim=claim,
+        next_attempt_at=now + timedelta(seconds=CLAIM_LEASE_SECONDS),
+    )
+    return list(OutboundEmail.objects.filter(claim=claim, status=OutboundEmail.STATUS_SENDING).order_by('pk'))
+
+
+def send_due(batch_size=50):
+    """
+    Deliver one batch of due messages over a single delivery connection.
+
+    Returns a (sent, failed) tuple.
+    """
+    outbound = claim_due(batch_size)
+    if not outbound:
+        return 0, 0
+
+    sent = failed = 0
+    max_attempts = getattr(settings, 'EMAIL_QUEUE_MAX_ATTEMPTS', 5)
+    connection = get_delivery_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        # Delivered one by one below; each message records the error and backs off
+        logger.warning(f"⚠️ Could not open mail connection: {exc}")
+
+    try:
+        for item in outbound:
+            item.attempts += 1
+            try:
+                connection.send_messages([to_message(item, connection)])
+            except Exception as exc:
+                failed += 1
+                item.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+                if item.attempts >= max_attempts:
+                    item.status = OutboundEmail.STATUS_FAILED
+                    logger.error(f"❌ Giving up on email {item.pk} to {', '.join(item.to)} after {item.attempts} attempts: {exc}")
+                else:
+                    item.status = OutboundEmail.STATUS_QUEUED
+                    item.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(item.attempts))
+                    logger.warning(f"⚠️ Email {item.pk} failed (attempt {item.attempts}), retrying later: {exc}")
+            else:
+                sent += 1
+                item.status = OutboundEmail.STATUS_SENT
+                item.sent_at = timezone.now()
+                item.last_error = ''
+            item.claim = ''
+            item.save(update_fields=['attempts', 'status', 'last_error', 'next_attempt_at', 'sent_at', 'claim'])
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    if sent:
+        logger.info(f"✅ Delivered {sent} queued email(s)")
+    return sent, failed
+
+
+def send_all_due(batch_size=50):
+    """Deliver batches until no due messages are left. Returns (sent, failed)."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_due(batch_size)
+        total_sent += sent
+        total_failed += failed
+        if sent + failed < batch_size:
+            return total_sent, total_failed
+
+
+class MailWorker(threading.Thread):
+    """
+    Daemon thread delivering queued mail.
+
+    It is woken immediately when a message is enqueued in this process and
+    otherwise polls every `poll_interval` seconds for retries and for messages
+    enqueued by other processes.
+    """
+
+    def __init__(self, poll_interval=None, batch_size=50):
+        super().__init__(name='mail-queue-worker', daemon=True)
+        self.poll_interval = poll_interval or getattr(settings, 'EMAIL_QUEUE_POLL_INTERVAL', 10)
+        self.batch_size = batch_size
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+
+    def wake(self):
+        self._wake_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                send_all_due(self.batch_size)
+            except Exception:
+                logger.exception("Mail queue worker run failed")
+            finally:
+                close_old_connections()
+            self._wake_event.wait(self.poll_interval)
+            self._wake_event.clear()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_worker():
+    """
+    Start the in-process mail worker once per process, if enabled.
+
+    Returns the running worker or None when EMAIL_QUEUE_WORKER_THREAD is off
+    (messages are then delivered by `manage.py send_queued_mail`).
+    """
+    global _worker
+    if not getattr(settings, 'EMAIL_QUEUE_WORKER_THREAD', True):
+        return None
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = MailWorker()
+            _worker.start()
+            logger.info("📬 Mail queue worker started")
+    return _worker
+
+
+def wake_worker():
+    """Start the in-process worker if needed and make it check the queue now."""
+    worker = start_worker()
+    if worker is not None:
+        worker.wake()
@@ -0,0 +1,175 @@
+"""
+Garbage collection of expired rows.
+
+Purges expired signup and password reset OTPs, deleted-email records past
+their retention period, expired database sessions and delivered messages of
+the outbound mail queue. Rows are removed in bounded batches: each batch
+selects at most `batch_size` primary keys in expiry index order and deletes
+exactly those rows in its own short transaction, so the purge can run
+continuously next to live traffic without holding long locks.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import (
+    SignupOTP,
+    PasswordResetOTP,
+    DeletedEmail,
+    OutboundEmail,
+    OTP_VALIDITY,
+    DELETED_EMAIL_RETENTION,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def expired_signup_otps(now):
+    return SignupOTP.objects.filter(created_at__lt=now - OTP_VALIDITY).order_by('created_at')
+
+
+def expired_password_reset_otps(now):
+    return PasswordResetOTP.objects.filter(created_at__lt=now - OTP_VALIDITY).order_by('created_at')
+
+
+def expired_deleted_emails(now):
+    return DeletedEmail.objects.filter(deleted_at__lt=now - DELETED_EMAIL_RETENTION).order_by('deleted_at')
+
+
+def expired_sessions(now):
+    return Session.objects.filter(expire_date__lt=now).order_by('expire_date')
+
+
+def delivered_emails(now):
+    # Sent messages are only kept for a week for troubleshooting
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_SENT, sent_at__lt=now - timedelta(days=7)
+    ).order_by('sent_at')
+
+
+# Name -> function returning the queryset of expired rows at a given time,
+# ordered by the indexed expiry column so each batch is read straight off the index
+PURGE_TASKS = {
+    'signup_otps': expired_signup_otps,
+    'password_reset_otps': expired_password_reset_otps,
+    'deleted_emails': expired_deleted_emails,
+    'sessions': expired_sessions,
+    'sent_emails': delivered_emails,
+}
+
+
+def purge_queryset(queryset, batch_size=DEFAULT_BATCH_SIZE, pause=0.0):
+    """
+    Delete all rows of a queryset in batches of at most batch_size rows.
+
+    Batches are taken in the queryset's own ordering (the expiry column for
+    PURGE_TASKS). Each delete targets exactly the selected primary keys and
+    applies the expiry filter again, so rows that were refreshed in the
+    meantime (e.g. a resent OTP) are left alone.
+    Returns the number of deleted rows.
+    """
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        with transaction.atomic():
+            count, _ = queryset.filter(pk__in=pks).delete()
+        deleted += count
+        if len(pks) < batch_size:
+            break
+        if pause:
+            # Give concurrent writers a chance between batches
+            time.sleep(pause)
+    return deleted
+
+
+def count_expired(tasks=None, now=None):
+    """
+    Return a dict of task name -> number of expired rows, without deleting anything.
+    """
+    now = now or timezone.now()
+    return {name: PURGE_TASKS[name](now).count() for name in (tasks or PURGE_TASKS)}
+
+
+def purge_expired(tasks=None, batch_size=None, pause=0.0, now=None):
+    """
+    Purge expired rows for the given tasks (all by default).
+
+    Returns a dict of task name -> number of deleted rows.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or getattr(settings, 'MAINTENANCE_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    results = {}
+    for name in tasks or PURGE_TASKS:
+        started = time.monotonic()
+        results[name] = purge_queryset(PURGE_TASKS[name](now), batch_size=batch_size, pause=pause)
+        if results[name]:
+            logger.info(f"🧹 Purged {results[name]} expired {name} in {time.monotonic() - started:.2f}s")
+    return results
+
+
+class MaintenanceScheduler(threading.Thread):
+    """
+    Daemon thread running purge_expired() every `interval` seconds.
+    """
+
+    def __init__(self, interval, batch_size=None):
+        super().__init__(name='users-maintenance', daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                purge_expired(batch_size=self.batch_size)
+            except Exception:
+                logger.exception("Scheduled maintenance run failed")
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_scheduler(interval=None):
+    """
+    Start the in-process maintenance scheduler once per process.
+
+    The interval defaults to settings.MAINTENANCE_INTERVAL_SECONDS; a value of 0
+    leaves the scheduler disabled. Returns the running scheduler or None.
+    """
+    global _scheduler
+    if interval is None:
+        interval = getattr(settings, 'MAINTENANCE_INTERVAL_SECONDS', 0)
+    if not interval or interval <= 0:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None or not _scheduler.is_alive():
+            _scheduler = MaintenanceScheduler(interval)
+            _scheduler.start()
+            logger.info(f"🧹 Maintenance scheduler started (every {interval}s)")
+    return _scheduler
+
+
+def start_scheduler_on_request(**kwargs):
+    """
+    request_started receiver starting the scheduler in the process that serves
+    requests. After a fork the inherited thread object is dead, so each worker
+    starts its own.
+    """
+    if _scheduler is None or not _scheduler.is_alive():
+        start_scheduler()
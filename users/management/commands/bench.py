@@ -0,0 +1,258 @@
+import fnmatch
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from resume import engines, synthetic
+from resume.models import Profile
+from resume.services import AIResumeGenerator
+from resume.utils import (
+    create_portfolio_html, format_resume_for_pdf, generate_pdf_from_html, generate_pdf_with_reportlab,
+    get_template_css, markdown_to_html,
+)
+
+
+class Fixtures:
+    """Synthetic inputs shared by the benchmarks, all derived from one seed."""
+
+    def __init__(self, seed):
+        rng = random.Random(seed)
+        self.data = synthetic.user_data(rng, educations=3, experiences=5, projects=4, skill_count=20)
+        self.profile = Profile(skills=synthetic.skills_text(rng, 20))
+        self.html = synthetic.resume_html(rng, sections=6)
+        self.markdown = synthetic.resume_markdown(rng, sections=6)
+        # Database rows are created inside the transaction the command rolls back; the prefix keeps
+        # the fixture user apart from the users seed_synthetic creates
+        self.user = synthetic.build_user(rng, 0, prefix="bench", educations=3, experiences=5, projects=4,
+                                         skill_count=20, resumes=5, cover_letters=5)
+        with override_settings(OPENAI_API_KEY=""):
+            self.generator = AIResumeGenerator(self.user)
+        self.client = Client(SERVER_NAME="localhost")
+        self.client.force_login(self.user)
+        self.pdf_html = format_resume_for_pdf(self.user, self.html)
+
+
+def bench_dashboard(fixtures):
+    url = reverse("dashboard")
+
+    def run():
+        response = fixtures.client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"Dashboard returned HTTP {response.status_code}")
+    return run
+
+
+# name -> (function returning the callable to time, reason to skip or None)
+BENCHMARKS = {
+    "profile.get_skills_list": (lambda f: f.profile.get_skills_list, None),
+    "services.build_prompt.resume": (lambda f: lambda: f.generator._build_prompt(f.data, "resume", "modern"), None),
+    "services.build_prompt.cover_letter": (
+        lambda f: lambda: f.generator._build_prompt(f.data, "cover_letter", "modern"), None),
+    **{
+        f"services.generate_{template}_html": (
+            lambda f, template=template: lambda: getattr(f.generator, f"_generate_{template}_html")(f.data), None)
+        for template in synthetic.TEMPLATES
+    },
+    "utils.format_resume_for_pdf.html": (lambda f: lambda: format_resume_for_pdf(f.user, f.html), None),
+    "utils.format_resume_for_pdf.markdown": (lambda f: lambda: format_resume_for_pdf(f.user, f.markdown), None),
+    "utils.markdown_to_html": (lambda f: lambda: markdown_to_html(f.markdown), None),
+    "utils.create_portfolio_html": (lambda f: lambda: create_portfolio_html(f.user), None),
+    "utils.get_template_css": (lambda f: lambda: get_template_css("modern"), None),
+    "pdf.weasyprint": (
+        lambda f: lambda: generate_pdf_from_html(f.pdf_html, template="modern"),
+        None if engines.weasyprint.available else "WeasyPrint could not be imported",
+    ),
+    "pdf.reportlab": (
+        lambda f: lambda: generate_pdf_with_reportlab(f.pdf_html, template="modern"),
+        None if engines.reportlab.available else "ReportLab could not be imported",
+    ),
+    "view.dashboard": (bench_dashboard, None),
+}
+
+
+def measure(func, repeat, min_time):
+    """
+    Time `func` like timeit: calibrate a loop count so one sample takes at least
+    `min_time` seconds, then take `repeat` samples. Returns milliseconds per call.
+    """
+    func()  # warm up caches and lazy imports
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - started) / loops)
+    return {
+        "loops": loops,
+        "min_ms": round(min(samples) * 1000, 4),
+        "median_ms": round(statistics.median(samples) * 1000, 4),
+        "mean_ms": round(statistics.mean(samples) * 1000, 4),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the resume hot paths (prompt building, HTML templates, PDF formatting and rendering, "
+        "the dashboard view) on reproducible synthetic data, and compare the results with a saved baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=1,
+            help="Seed for the synthetic fixtures (default: 1)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Timed samples per benchmark; the median is compared (default: 5)",
+        )
+        parser.add_argument(
+            "--min-time",
+            type=float,
+            default=0.1,
+            help="Minimum duration of one sample in seconds (default: 0.1)",
+        )
+        parser.add_argument(
+            "--filter",
+            action="append",
+            help="Only run benchmarks matching this glob, e.g. 'pdf.*' (can be repeated)",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the JSON results to this file ('-' for stdout)",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="JSON results of an earlier run to compare against",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            help="Also write the JSON results to this file, for later --baseline runs",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.15,
+            help="Fail when a median is this fraction slower than the baseline (default: 0.15)",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="List the benchmarks and exit",
+        )
+
+    def handle(self, *args, **options):
+        names = [
+            name for name in BENCHMARKS
+            if not options["filter"] or any(fnmatch.fnmatch(name, pattern) for pattern in options["filter"])
+        ]
+        if options["list"]:
+            for name in names:
+                self.stdout.write(name)
+            return
+        if not names:
+            raise CommandError("No benchmark matches the given --filter")
+
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"], encoding="utf-8") as f:
+                    baseline = json.load(f)["benchmarks"]
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Could not read baseline {options['baseline']}: {e}")
+
+        repeat = max(1, options["repeat"])
+        results = {}
+        log = self.stderr if options["output"] == "-" else self.stdout
+        log.write(f"{'benchmark':<40} {'median ms':>11} {'min ms':>10} {'loops':>7}  baseline")
+        with transaction.atomic():
+            fixtures = Fixtures(options["seed"])
+            for name in names:
+                factory, skip = BENCHMARKS[name]
+                if skip:
+                    results[name] = {"skipped": skip}
+                    log.write(f"{name:<40} {'skipped':>11}  ({skip})")
+                    continue
+                result = results[name] = measure(factory(fixtures), repeat, options["min_time"])
+                log.write(
+                    f"{name:<40} {result['median_ms']:>11.4f} {result['min_ms']:>10.4f} {result['loops']:>7}  "
+                    f"{self._compare(result, (baseline or {}).get(name), options['threshold'])}"
+                )
+            transaction.set_rollback(True)
+
+        report = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "python": sys.version.split()[0],
+                "django": django.get_version(),
+                "platform": platform.platform(),
+                "seed": options["seed"],
+                "repeat": repeat,
+                "weasyprint": engines.weasyprint.available,
+                "reportlab": engines.reportlab.available,
+            },
+            "benchmarks": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"] == "-":
+            self.stdout.write(output)
+        elif options["output"]:
+            self._write(options["output"], output)
+        if options["save_baseline"]:
+            self._write(options["save_baseline"], output)
+
+        if baseline is not None:
+            regressions = [
+                name for name, result in results.items()
+                if self._regressed(result, baseline.get(name), options["threshold"])
+            ]
+            if regressions:
+                raise CommandError(
+                    f"{len(regressions)} benchmark(s) more than {options['threshold']:.0%} slower than the "
+                    f"baseline: {', '.join(regressions)}"
+                )
+        log.write(self.style.SUCCESS("Benchmark completed."))
+
+    def _write(self, path, output):
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(output + "\n")
+        except OSError as e:
+            raise CommandError(f"Could not write {path}: {e}")
+
+    @staticmethod
+    def _regressed(result, previous, threshold):
+        if not previous or "median_ms" not in previous or "median_ms" not in result:
+            return False
+        return result["median_ms"] > previous["median_ms"] * (1 + threshold)
+
+    def _compare(self, result, previous, threshold):
+        if not previous or "median_ms" not in previous:
+            return "-"
+        change = result["median_ms"] / previous["median_ms"] - 1 if previous["median_ms"] else 0.0
+        text = f"{change:+.1%}"
+        if self._regressed(result, previous, threshold):
+            return self.style.ERROR(f"{text} REGRESSION")
+        return text
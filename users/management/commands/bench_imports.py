@@ -0,0 +1,131 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+HEAVY_MODULES = ["weasyprint", "reportlab", "openai"]
+MARKER = "BENCH_IMPORTS "
+
+# What a gunicorn worker does before serving its first request: load the WSGI app and the URLconf
+BOOT_SCRIPT = f"""
+import json, os, sys, time
+start = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+boot_ms = (time.perf_counter() - start) * 1000
+sys.stdout.write("\\n{MARKER}" + json.dumps({{
+    "boot_ms": boot_ms,
+    "heavy": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+}}) + "\\n")
+"""
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how long a worker takes to boot (Django setup, WSGI application and URLconf) in fresh "
+        "interpreters, with the PDF and LLM libraries loaded lazily and preloaded, and list the slowest "
+        "imports from python -X importtime."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=5,
+            help="Interpreter starts per mode; the median is reported (default: 5)",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=15,
+            help="Number of slowest imports to list (default: 15)",
+        )
+        parser.add_argument(
+            "--target-ms",
+            type=float,
+            default=1000,
+            help="Fail when the median lazy boot takes longer than this (default: 1000)",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the JSON results to this file",
+        )
+
+    def handle(self, *args, **options):
+        runs = max(1, options["runs"])
+        report = {"modes": {}}
+        self.stdout.write(f"{'mode':<8} {'boot ms':>9} {'process ms':>11}  heavy modules imported")
+        for mode, preload in (("lazy", "False"), ("preload", "True")):
+            boot, process, heavy = [], [], []
+            for _ in range(runs):
+                started = time.perf_counter()
+                result = self._run([], preload)
+                process.append((time.perf_counter() - started) * 1000)
+                boot.append(result["boot_ms"])
+                heavy = result["heavy"]
+            report["modes"][mode] = {
+                "boot_ms": round(statistics.median(boot), 1),
+                "process_ms": round(statistics.median(process), 1),
+                "heavy_modules": heavy,
+            }
+            self.stdout.write(
+                f"{mode:<8} {statistics.median(boot):>9.1f} {statistics.median(process):>11.1f}  "
+                f"{', '.join(heavy) or '-'}"
+            )
+
+        report["slowest_imports"] = self._slowest_imports(options["top"])
+        self.stdout.write("\nSlowest imports of a lazy boot (python -X importtime, cumulative):")
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for entry in report["slowest_imports"]:
+            self.stdout.write(f"{entry['cumulative_ms']:>14.1f} {entry['self_ms']:>9.1f}  {entry['module']}")
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+        lazy = report["modes"]["lazy"]
+        if lazy["heavy_modules"]:
+            raise CommandError(f"Booting imported {', '.join(lazy['heavy_modules'])}; they should load lazily")
+        if lazy["boot_ms"] > options["target_ms"]:
+            raise CommandError(f"Boot took {lazy['boot_ms']} ms, over the {options['target_ms']:.0f} ms target")
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
+
+    def _run(self, flags, preload):
+        env = {**os.environ, "PRELOAD_ENGINES": preload, "DJANGO_SETTINGS_MODULE": "core.settings"}
+        completed = subprocess.run(
+            [sys.executable, *flags, "-c", BOOT_SCRIPT], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True,
+        )
+        for line in completed.stdout.splitlines():
+            if line.startswith(MARKER):
+                result = json.loads(line[len(MARKER):])
+                result["stderr"] = completed.stderr
+                return result
+        raise CommandError(f"Boot failed (exit code {completed.returncode}):\n{completed.stderr[-2000:]}")
+
+    def _slowest_imports(self, top):
+        """The imports of a lazy boot with the highest cumulative time, from -X importtime."""
+        stderr = self._run(["-X", "importtime"], "False")["stderr"]
+        entries = []
+        for line in stderr.splitlines():
+            match = IMPORTTIME_RE.match(line)
+            if match:
+                self_us, cumulative_us, indent, module = match.groups()
+                entries.append({
+                    "module": module,
+                    "depth": len(indent) // 2,
+                    "self_ms": int(self_us) / 1000,
+                    "cumulative_ms": int(cumulative_us) / 1000,
+                })
+        entries.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+        return entries[:top]
@@ -0,0 +1,106 @@
+import io
+import logging
+import time
+from django.core.management.base import BaseCommand
+from core.log import JSONFormatter, QueuedStreamHandler, RateLimitFilter, RequestIdFilter, request_id_var
+
+
+class SlowStream(io.TextIOBase):
+    """A stream whose writes take a fixed time, like stdout piped to a busy log collector."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.written = 0
+
+    def write(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        self.written += 1
+        return len(text)
+
+
+def make_handlers(stream):
+    return [
+        ("sync text", logging.StreamHandler(stream), logging.Formatter(
+            "[{levelname}] {asctime} {module} {process:d} {thread:d} {request_id} {message}", style="{")),
+        ("sync json", logging.StreamHandler(stream), JSONFormatter()),
+        ("queued text", QueuedStreamHandler(stream, queue_size=100000), logging.Formatter(
+            "[{levelname}] {asctime} {module} {process:d} {thread:d} {request_id} {message}", style="{")),
+        ("queued json", QueuedStreamHandler(stream, queue_size=100000), JSONFormatter()),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the time logging adds to a request thread, for synchronous and queued handlers "
+        "writing to a stream with a configurable write latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Number of simulated requests per handler (default: 500)",
+        )
+        parser.add_argument(
+            "--records",
+            type=int,
+            default=8,
+            help="Log records per request, e.g. the login view logs about 8 (default: 8)",
+        )
+        parser.add_argument(
+            "--write-latency-ms",
+            type=float,
+            default=0.2,
+            help="Time each write to the output stream takes (default: 0.2)",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=int,
+            default=0,
+            help="Also apply RateLimitFilter with this many records per call site per minute (default: off)",
+        )
+
+    def handle(self, *args, **options):
+        count = max(1, options["requests"])
+        records = max(1, options["records"])
+
+        self.stdout.write(f"{'handler':<12} {'us/request':>11} {'us/record':>10} {'written':>8} {'drain ms':>9}")
+        for name, handler, formatter in make_handlers(None):
+            stream = SlowStream(options["write_latency_ms"] / 1000)
+            if isinstance(handler, QueuedStreamHandler):
+                handler.target.setStream(stream)
+            else:
+                handler.setStream(stream)
+            handler.setFormatter(formatter)
+            handler.addFilter(RequestIdFilter())
+            if options["rate_limit"]:
+                handler.addFilter(RateLimitFilter(rate=options["rate_limit"], period=60))
+
+            logger = logging.getLogger(f"bench_logging.{name.replace(' ', '_')}")
+            logger.handlers = [handler]
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+
+            elapsed = self._run(logger, count, records)
+            started = time.perf_counter()
+            handler.close()
+            drain = time.perf_counter() - started
+            self.stdout.write(
+                f"{name:<12} {elapsed * 1e6 / count:>11.1f} {elapsed * 1e6 / (count * records):>10.2f} "
+                f"{stream.written:>8} {drain * 1000:>9.1f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
+
+    def _run(self, logger, count, records):
+        elapsed = 0.0
+        for i in range(count):
+            token = request_id_var.set(f"bench-{i}")
+            started = time.perf_counter()
+            for j in range(records):
+                logger.info(f"🔐 Login attempt for user{i}@example.com, step {j}")
+            elapsed += time.perf_counter() - started
+            request_id_var.reset(token)
+        return elapsed
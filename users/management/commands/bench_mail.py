@@ -0,0 +1,67 @@
+import time
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from users.mail_backends import close_pools
+from users.smtp_standin import SMTPStandIn
+
+SMTP_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+POOLED_BACKEND = "users.mail_backends.PooledSMTPEmailBackend"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure email throughput (messages/sec) of the SMTP backends against a local SMTP stand-in."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--messages",
+            type=int,
+            default=200,
+            help="Number of messages per scenario (default: 200)",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=5.0,
+            help="Simulated server latency per SMTP reply in milliseconds (default: 5)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Messages per send_messages() call in the batched scenario (default: 50)",
+        )
+
+    def handle(self, *args, **options):
+        count = max(1, options["messages"])
+        batch_size = max(1, options["batch_size"])
+        scenarios = [
+            ("smtp, one connection per message", SMTP_BACKEND, 1),
+            ("pooled, one call per message", POOLED_BACKEND, 1),
+            (f"pooled, batches of {batch_size}", POOLED_BACKEND, batch_size),
+        ]
+
+        self.stdout.write(f"{'scenario':<36} {'msgs/sec':>10} {'connections':>12} {'logins':>7}")
+        for label, backend, size in scenarios:
+            with SMTPStandIn(latency=options["latency"] / 1000) as server:
+                params = {
+                    "host": server.host, "port": server.port, "username": "bench", "password": "bench",
+                    "use_tls": False, "use_ssl": False, "timeout": 10,
+                }
+                messages = [
+                    EmailMessage(f"Your OTP code {n}", "Your 6-digit OTP code is: 123456", "bench@example.com",
+                                 [f"user{n}@example.com"])
+                    for n in range(count)
+                ]
+                started = time.perf_counter()
+                for start in range(0, count, size):
+                    get_connection(backend, **params).send_messages(messages[start:start + size])
+                elapsed = time.perf_counter() - started
+                close_pools()
+
+                if len(server.messages) != count:
+                    self.stdout.write(self.style.ERROR(f"{label}: only {len(server.messages)}/{count} delivered"))
+                self.stdout.write(f"{label:<36} {count / elapsed:>10.1f} {server.connections:>12} {server.logins:>7}")
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
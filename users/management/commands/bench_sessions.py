@@ -0,0 +1,124 @@
+import time
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+ENGINES = [
+    "django.contrib.sessions.backends.db",
+    "core.session_backends.db",
+    "core.session_backends.cached_db",
+]
+
+
+def view_read(request):
+    """Authenticated page view: only reads the session."""
+    request.session.get("_auth_user_id")
+    return HttpResponse()
+
+
+def view_resubmit(request):
+    """Password reset request re-submitted with the same values."""
+    request.session["password_reset_email"] = "bench@example.com"
+    request.session["password_reset_sent_at"] = "2024-01-01T00:00:00+00:00"
+    request.session["otp_attempts_bench@example.com"] = 0
+    return HttpResponse()
+
+
+def view_flag(request):
+    """Set a one-shot flag and consume it again in the same request."""
+    request.session["password_reset_just_sent"] = True
+    request.session.pop("password_reset_just_sent", None)
+    return HttpResponse()
+
+
+def view_mutate(request):
+    """Several real changes in one request."""
+    request.session["password_reset_email"] = "bench@example.com"
+    request.session["password_reset_sent_at"] = timezone.now().isoformat()
+    request.session["password_reset_just_sent"] = True
+    request.session["otp_attempts_bench@example.com"] = request.session.get("otp_attempts_bench@example.com", 0) + 1
+    return HttpResponse()
+
+
+SCENARIOS = [
+    ("read", view_read),
+    ("resubmit", view_resubmit),
+    ("set+pop", view_flag),
+    ("mutate", view_mutate),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark session reads and writes per request for the available session engines."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Number of requests per scenario (default: 200)",
+        )
+        parser.add_argument(
+            "--engine",
+            action="append",
+            help="Session engine module to benchmark (can be repeated; default: all)",
+        )
+
+    def handle(self, *args, **options):
+        engines = options.get("engine") or ENGINES
+        count = max(1, options["requests"])
+        factory = RequestFactory()
+
+        self.stdout.write(f"{'engine':<40} {'scenario':<10} {'reads/req':>9} {'writes/req':>10} {'ms/req':>8}")
+        for engine in engines:
+            with override_settings(SESSION_ENGINE=engine):
+                for name, view in SCENARIOS:
+                    middleware = SessionMiddleware(view)
+                    session = middleware.SessionStore()
+                    session.update({
+                        "_auth_user_id": "1",
+                        "password_reset_email": "bench@example.com",
+                        "password_reset_sent_at": "2024-01-01T00:00:00+00:00",
+                        "otp_attempts_bench@example.com": 0,
+                    })
+                    session.create()
+                    session_key = session.session_key
+                    try:
+                        reads, writes, elapsed = self._run(factory, middleware, session_key, count)
+                    finally:
+                        middleware.SessionStore(session_key).delete()
+                        caches["sessions"].clear()
+                    self.stdout.write(
+                        f"{engine:<40} {name:<10} {reads / count:>9.2f} {writes / count:>10.2f} "
+                        f"{elapsed * 1000 / count:>8.3f}"
+                    )
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
+
+    def _run(self, factory, middleware, session_key, count):
+        reads = writes = 0
+        elapsed = 0.0
+        for _ in range(count):
+            request = factory.get("/")
+            request.COOKIES[settings.SESSION_COOKIE_NAME] = session_key
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                middleware(request)
+                elapsed += time.perf_counter() - started
+            for query in ctx.captured_queries:
+                sql = query["sql"].lstrip().upper()
+                if "DJANGO_SESSION" not in sql:
+                    continue
+                if sql.startswith("SELECT"):
+                    reads += 1
+                else:
+                    writes += 1
+        return reads, writes, elapsed
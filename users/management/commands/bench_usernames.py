@@ -0,0 +1,64 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from users.models import CustomUser
+from users.usernames import next_free_username
+
+
+def legacy_next_username(base):
+    """The previous allocation loop, probing one suffix per query."""
+    username = base
+    suffix = 0
+    while CustomUser.objects.filter(username=username).exists():
+        suffix += 1
+        username = f"{base[:135]}{suffix}"
+    return username
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark username allocation for many users sharing a name prefix. "
+        "Synthetic users are created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=5000,
+            help="Number of existing users sharing the prefix (default: 5000)",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="benchjohn",
+            help="Shared username prefix (default: benchjohn)",
+        )
+
+    def handle(self, *args, **options):
+        count = max(1, options["users"])
+        base = options["prefix"]
+
+        with transaction.atomic():
+            CustomUser.objects.bulk_create(
+                [CustomUser(username=base, email=f"{base}@bench.invalid", password="!")] +
+                [
+                    CustomUser(username=f"{base}{n}", email=f"{base}{n}@bench.invalid", password="!")
+                    for n in range(1, count)
+                ],
+                batch_size=1000,
+            )
+            self.stdout.write(f"Created {count} users sharing the prefix '{base}'.")
+
+            for label, allocate in (("legacy loop", legacy_next_username), ("prefix query", next_free_username)):
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    username = allocate(base)
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label:<13} -> {username:<20} {len(ctx.captured_queries):>6} queries {elapsed * 1000:>10.2f} ms"
+                )
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark completed (synthetic users rolled back)."))
@@ -0,0 +1,131 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+MARKER = "BENCH_WARMUP "
+
+# Forks workers from a cold or warmed-up master like gunicorn does. Each worker first runs the
+# warm-up itself, standing in for everything its first requests would load, then (with all
+# workers alive, so shared pages are counted as shared) reports its memory.
+BENCH_SCRIPT = f"""
+import json, os, sys, time
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+import django
+django.setup()
+from resume.warmup import warm_up
+
+
+def memory():
+    fields = {{}}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {{
+        "rss_kb": fields["Rss"],
+        "pss_kb": fields["Pss"],
+        "uss_kb": fields["Private_Clean"] + fields["Private_Dirty"],
+    }}
+
+
+mode, count = sys.argv[1], int(sys.argv[2])
+if mode == "warm":
+    warm_up()
+master = memory()
+children = []
+for _ in range(count):
+    ready_r, ready_w = os.pipe()
+    go_r, go_w = os.pipe()
+    out_r, out_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        start = time.perf_counter()
+        warm_up(freeze=False)
+        first_ms = (time.perf_counter() - start) * 1000
+        os.write(ready_w, b"1")
+        os.read(go_r, 1)
+        os.write(out_w, json.dumps({{"first_ms": first_ms, **memory()}}).encode())
+        os._exit(0)
+    children.append((pid, ready_r, go_w, out_r))
+for pid, ready_r, go_w, out_r in children:
+    os.read(ready_r, 1)
+for pid, ready_r, go_w, out_r in children:
+    os.write(go_w, b"1")
+workers = []
+for pid, ready_r, go_w, out_r in children:
+    workers.append(json.loads(os.read(out_r, 65536)))
+    os.waitpid(pid, 0)
+sys.stdout.write("\\n{MARKER}" + json.dumps({{"master": master, "workers": workers}}) + "\\n")
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-worker memory (USS/PSS) and first-request warm-up time of workers forked from a cold "
+        "master and from a master that ran resume/warmup.py, as gunicorn.conf.py does. Linux only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Workers forked per mode (default: 4)",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the JSON results to this file",
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.exists("/proc/self/smaps_rollup") or not hasattr(os, "fork"):
+            raise CommandError("Needs Linux (fork and /proc/self/smaps_rollup)")
+        count = max(1, options["workers"])
+
+        report = {}
+        self.stdout.write(
+            f"{'master':<7} {'master MB':>10} {'worker USS MB':>14} {'worker PSS MB':>14} {'first request ms':>17}"
+        )
+        for mode in ("cold", "warm"):
+            result = self._run(mode, count)
+            workers = result["workers"]
+            summary = report[mode] = {
+                "master_rss_mb": round(result["master"]["rss_kb"] / 1024, 1),
+                "worker_uss_mb": round(statistics.mean(w["uss_kb"] for w in workers) / 1024, 1),
+                "worker_pss_mb": round(statistics.mean(w["pss_kb"] for w in workers) / 1024, 1),
+                "first_request_ms": round(statistics.mean(w["first_ms"] for w in workers), 1),
+            }
+            self.stdout.write(
+                f"{mode:<7} {summary['master_rss_mb']:>10.1f} {summary['worker_uss_mb']:>14.1f} "
+                f"{summary['worker_pss_mb']:>14.1f} {summary['first_request_ms']:>17.1f}"
+            )
+
+        saved = report["cold"]["worker_uss_mb"] - report["warm"]["worker_uss_mb"]
+        report["uss_saved_per_worker_mb"] = round(saved, 1)
+        report["uss_saved_total_mb"] = round(saved * count, 1)
+        self.stdout.write(
+            f"\nWarm-up saves {saved:.1f} MB of private memory per worker ({saved * count:.1f} MB for {count} "
+            f"workers) and {report['cold']['first_request_ms'] - report['warm']['first_request_ms']:.0f} ms "
+            f"on each worker's first requests."
+        )
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS("Benchmark completed."))
+
+    def _run(self, mode, count):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "core.settings",
+               "WARMUP_ON_STARTUP": "False", "PRELOAD_ENGINES": "False"}
+        completed = subprocess.run(
+            [sys.executable, "-c", BENCH_SCRIPT, mode, str(count)], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, timeout=600,
+        )
+        for line in completed.stdout.splitlines():
+            if line.startswith(MARKER):
+                return json.loads(line[len(MARKER):])
+        raise CommandError(f"{mode} run failed (exit code {completed.returncode}):\n{completed.stderr[-2000:]}")
@@ -1,14 +1,21 @@
 import os
-import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.conf import settings
 from django.db import transaction
+from django.db.models.signals import post_delete
+from resume.models import Project
+from users.models import DeletedEmail, create_deleted_email
+
+MEDIA_FOLDERS = ["profile_photos", "resumes", "project_thumbnails", "image_derivatives"]
 
 
 class Command(BaseCommand):
     help = (
-        "Delete all user accounts and optionally remove user media files."
+        "Delete all user accounts in chunks and optionally remove user media files."
     )
 
     def add_arguments(self, parser):
@@ -20,72 +27,186 @@ class Command(BaseCommand):
         parser.add_argument(
             "--remove-media",
             action="store_true",
-            help=("Remove media subfolders (profile_photos, resumes, project_thumbnails) "
-                  "under MEDIA_ROOT after deleting users"),
+            help=("Remove media files of deleted users and the media subfolders (profile_photos, resumes, "
+                  "project_thumbnails, image_derivatives) under MEDIA_ROOT after deleting users"),
         )
         parser.add_argument(
             "--dry-run",
             action="store_true",
             help="Show what would be deleted without making changes",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of users deleted per transaction (default: 500)",
+        )
+        parser.add_argument(
+            "--media-workers",
+            type=int,
+            default=8,
+            help="Number of threads deleting media files in parallel (default: 8)",
+        )
+        parser.add_argument(
+            "--journal",
+            default=None,
+            help=("Path of the media cleanup journal used to resume an interrupted run "
+                  "(default: BASE_DIR/.clear_users_media.journal)"),
+        )
 
     def handle(self, *args, **options):
         User = get_user_model()
         qs = User.objects.all()
         total = qs.count()
+        dry_run = options.get("dry_run")
+        remove_media = options.get("remove_media")
+        chunk_size = max(1, options.get("chunk_size") or 500)
+        journal_path = options.get("journal") or os.path.join(str(settings.BASE_DIR), ".clear_users_media.journal")
+        pending_journal = os.path.exists(journal_path)
 
-        if total == 0:
+        if total == 0 and not (remove_media and pending_journal):
             self.stdout.write(self.style.SUCCESS("No user accounts found."))
             return
 
-        self.stdout.write(self.style.WARNING(f"About to delete {total} user account(s)."))
-
-        if options.get("dry_run"):
-            self.stdout.write(self.style.NOTICE if hasattr(self.style, 'NOTICE') else self.style.WARNING(
-                "Dry run: no changes will be made."))
+        if total:
+            self.stdout.write(self.style.WARNING(f"About to delete {total} user account(s) in chunks of {chunk_size}."))
+        if pending_journal and remove_media:
+            self.stdout.write(self.style.WARNING(f"Found unfinished media cleanup journal: {journal_path}"))
 
-        if not options.get("yes") and not options.get("dry_run"):
+        if total and not options.get("yes") and not dry_run:
             confirm = input("Type DELETE to confirm deleting ALL user accounts: ")
             if confirm != "DELETE":
                 self.stdout.write(self.style.ERROR("Aborted — confirmation not provided."))
                 return
 
-        # Delete users (iterate to call instance.delete() so signals and custom delete are honored)
-        if options.get("dry_run"):
+        if dry_run:
             self.stdout.write(self.style.WARNING(f"Dry run: would delete {total} user(s)."))
-        else:
-            with transaction.atomic():
-                deleted = 0
-                for user in qs:
-                    # Call instance.delete() to ensure post_delete signals run and any overridden
-                    # delete() logic executes.
-                    user.delete()
-                    deleted += 1
+        elif total:
+            deleted = self._delete_users(User, total, chunk_size, journal_path if remove_media else None)
             self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} user(s)."))
 
-        # Optionally remove media folders
-        if options.get("remove_media"):
-            media_root = getattr(settings, "MEDIA_ROOT", None)
-            if not media_root:
-                self.stdout.write(self.style.ERROR("MEDIA_ROOT is not configured; cannot remove media files."))
-                return
+        # Optionally remove media files
+        if remove_media:
+            self._remove_media(journal_path, options.get("media_workers") or 1, dry_run)
+
+        self.stdout.write(self.style.SUCCESS("Operation completed."))
+
+    def _collect_media_names(self, user_ids):
+        """Return storage names of profile photos and project thumbnails owned by the given users."""
+        User = get_user_model()
+        user_ids = list(user_ids)
+        names = set(
+            User.objects.filter(pk__in=user_ids).exclude(profile_photo="").exclude(profile_photo__isnull=True)
+            .values_list("profile_photo", flat=True)
+        )
+        names.update(
+            Project.objects.filter(user_id__in=user_ids).exclude(thumbnail="").exclude(thumbnail__isnull=True)
+            .values_list("thumbnail", flat=True)
+        )
+        return names
+
+    def _delete_users(self, User, total, chunk_size, journal_path):
+        """
+        Delete users chunk by chunk, each chunk in its own transaction.
+
+        The per-row create_deleted_email signal is replaced by one bulk insert of
+        DeletedEmail rows per chunk. Media file names are appended to the journal
+        before their rows disappear, so an interrupted run can still clean them up.
+        """
+        deleted = 0
+        started = time.monotonic()
+        post_delete.disconnect(create_deleted_email, sender=User)
+        try:
+            while True:
+                chunk = list(User.objects.order_by("pk").values_list("pk", "email")[:chunk_size])
+                if not chunk:
+                    break
+                pks = [pk for pk, _ in chunk]
+
+                if journal_path:
+                    names = self._collect_media_names(pks)
+                    if names:
+                        with open(journal_path, "a", encoding="utf-8") as journal:
+                            journal.write("".join(f"{name}\n" for name in sorted(names)))
+                            journal.flush()
+                            os.fsync(journal.fileno())
+
+                with transaction.atomic():
+                    DeletedEmail.objects.bulk_create(
+                        [DeletedEmail(email=email.lower()) for _, email in chunk if email],
+                        ignore_conflicts=True,
+                    )
+                    User.objects.filter(pk__in=pks).delete()
+
+                deleted += len(pks)
+                elapsed = time.monotonic() - started
+                rate = deleted / elapsed if elapsed else 0
+                self.stdout.write(f"  Deleted {deleted}/{total} user(s) ({rate:.0f} users/s)")
+        finally:
+            post_delete.connect(create_deleted_email, sender=User)
+        return deleted
+
+    def _remove_media(self, journal_path, workers, dry_run):
+        """
+        Delete journaled media files and local media folder contents in parallel.
+
+        Completed names are recorded in a '.done' file next to the journal, so
+        re-running the command after an interruption skips finished work.
+        """
+        done_path = f"{journal_path}.done"
+        names = set()
+        if dry_run:
+            names.update(self._collect_media_names(get_user_model().objects.values_list("pk", flat=True)))
+        if os.path.exists(journal_path):
+            with open(journal_path, encoding="utf-8") as journal:
+                names.update(line.strip() for line in journal if line.strip())
 
-            folders = ["profile_photos", "resumes", "project_thumbnails"]
-            for folder in folders:
+        media_root = getattr(settings, "MEDIA_ROOT", None)
+        if media_root and os.path.isdir(media_root):
+            for folder in MEDIA_FOLDERS:
                 path = os.path.join(media_root, folder)
-                if os.path.exists(path):
-                    if options.get("dry_run"):
-                        self.stdout.write(self.style.WARNING(f"Dry run: would remove {path}"))
-                    else:
-                        try:
-                            # Remove all contents safely
-                            shutil.rmtree(path)
-                            # Recreate empty directory so app references don't break later
-                            os.makedirs(path, exist_ok=True)
-                            self.stdout.write(self.style.SUCCESS(f"Removed files in {path}"))
-                        except Exception as exc:
-                            self.stdout.write(self.style.ERROR(f"Failed to remove {path}: {exc}"))
-                else:
-                    self.stdout.write(self.style.WARNING(f"Path not found: {path}"))
+                for dirpath, _dirnames, filenames in os.walk(path):
+                    for filename in filenames:
+                        full_path = os.path.join(dirpath, filename)
+                        names.add(os.path.relpath(full_path, media_root).replace(os.sep, "/"))
 
-        self.stdout.write(self.style.SUCCESS("Operation completed."))
+        done = set()
+        if os.path.exists(done_path):
+            with open(done_path, encoding="utf-8") as done_file:
+                done.update(line.strip() for line in done_file if line.strip())
+        pending = sorted(names - done)
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"Dry run: would remove {len(pending)} media file(s)."))
+            return
+
+        if not pending:
+            self.stdout.write(self.style.SUCCESS("No media files to remove."))
+        else:
+            self.stdout.write(f"Removing {len(pending)} media file(s) with {workers} worker(s)...")
+            removed = failed = 0
+            with open(done_path, "a", encoding="utf-8") as done_file, ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(default_storage.delete, name): name for name in pending}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        future.result()
+                    except Exception as exc:
+                        failed += 1
+                        self.stdout.write(self.style.ERROR(f"Failed to remove {name}: {exc}"))
+                        continue
+                    removed += 1
+                    done_file.write(f"{name}\n")
+                    if removed % 500 == 0:
+                        done_file.flush()
+                        self.stdout.write(f"  Removed {removed}/{len(pending)} media file(s)")
+            if failed:
+                self.stdout.write(self.style.ERROR(
+                    f"{failed} media file(s) could not be removed; re-run with --remove-media to retry."))
+                return
+            self.stdout.write(self.style.SUCCESS(f"Removed {removed} media file(s)."))
+
+        # Everything is gone; the journal is no longer needed
+        for path in (journal_path, done_path):
+            if os.path.exists(path):
+                os.remove(path)
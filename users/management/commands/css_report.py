@@ -0,0 +1,105 @@
+import os
+import re
+import brotli
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from core import assets
+
+STYLESHEET_RE = re.compile(r"""{%\s*(?:static|stylesheet)\s+["']([^"']+\.css)["']""")
+EXTENDS_INCLUDE_RE = re.compile(r"""{%\s*(?:extends|include)\s+["']([^"']+)["']""")
+
+
+def compressed_sizes(css):
+    data = css.encode("utf-8")
+    return len(data), len(brotli.compress(data))
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the CSS bytes each page template loads before and after the collectstatic "
+        "purge/minify stage (raw and Brotli)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page",
+            action="append",
+            default=[],
+            help="Only report these templates, e.g. resume/dashboard.html (repeatable)",
+        )
+        parser.add_argument(
+            "--critical",
+            action="store_true",
+            help="Also show the size of the critical CSS inlined for base.html",
+        )
+
+    def template_stylesheets(self, path, template_dir):
+        """Return the stylesheets linked by a template and the templates it extends or includes."""
+        stylesheets = []
+        pending, seen = [path], set()
+        while pending:
+            current = pending.pop()
+            if current in seen or not os.path.exists(current):
+                continue
+            seen.add(current)
+            with open(current, encoding="utf-8", errors="ignore") as f:
+                content = f.read()
+            stylesheets.extend(name for name in STYLESHEET_RE.findall(content) if name not in stylesheets)
+            pending.extend(os.path.join(template_dir, name) for name in EXTENDS_INCLUDE_RE.findall(content))
+        return stylesheets
+
+    def handle(self, *args, **options):
+        template_dir = str(settings.BASE_DIR / "templates")
+        optimized_files = set(settings.STATIC_CSS_OPTIMIZE_FILES)
+        used = assets.collect_used_names()
+
+        sizes = {}
+
+        def sizes_for(name):
+            if name not in sizes:
+                path = finders.find(name)
+                if not path:
+                    sizes[name] = None
+                else:
+                    with open(path, encoding="utf-8") as f:
+                        original = f.read()
+                    optimized = assets.purge_css(original, used) if name in optimized_files else original
+                    sizes[name] = (compressed_sizes(original), compressed_sizes(optimized), original)
+            return sizes[name]
+
+        pages = options["page"] or sorted(
+            os.path.relpath(os.path.join(root, name), template_dir)
+            for root, dirs, names in os.walk(template_dir)
+            for name in names
+            if name.endswith(".html")
+        )
+
+        self.stdout.write(
+            f"{'page':<48} {'css files':>9} {'raw before':>11} {'raw after':>10} "
+            f"{'br before':>10} {'br after':>9} {'saved (br)':>11}"
+        )
+        total_saved = 0
+        for page in pages:
+            stylesheets = [name for name in self.template_stylesheets(os.path.join(template_dir, page), template_dir)
+                           if sizes_for(name)]
+            if not stylesheets:
+                continue
+            before = [sum(sizes_for(name)[0][i] for name in stylesheets) for i in range(2)]
+            after = [sum(sizes_for(name)[1][i] for name in stylesheets) for i in range(2)]
+            saved = before[1] - after[1]
+            total_saved += saved
+            self.stdout.write(
+                f"{page:<48} {len(stylesheets):>9} {before[0]:>11} {after[0]:>10} "
+                f"{before[1]:>10} {after[1]:>9} {saved:>11}"
+            )
+
+        if options["critical"]:
+            base_used = assets.template_names(os.path.join(template_dir, "base.html"), [template_dir])
+            for name in sorted(optimized_files):
+                if sizes_for(name):
+                    critical = assets.purge_css(sizes_for(name)[2], base_used)
+                    raw, br = compressed_sizes(critical)
+                    self.stdout.write(f"critical CSS for base.html from {name}: {raw} bytes raw, {br} bytes Brotli")
+
+        self.stdout.write(self.style.SUCCESS(f"Brotli bytes saved across all pages: {total_saved}"))
@@ -0,0 +1,481 @@
+import http.client
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from resume.openai_standin import OpenAIStandIn
+from resume.synthetic import TEMPLATES
+from users.smtp_standin import SMTPStandIn
+
+STEPS = ["login_page", "login", "dashboard", "generate", "resume_view", "download", "logout"]
+RESUME_URL_RE = re.compile(r"/resumes/(\d+)/$")
+CSRF_INPUT_RE = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+
+class StepError(Exception):
+    pass
+
+
+class Session:
+    """A browser-like HTTP client: one keep-alive connection, cookies, no redirect following."""
+
+    def __init__(self, base_url, timeout):
+        url = urlsplit(base_url)
+        self.host = url.netloc
+        self.connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.timeout = timeout
+        self.cookies = {}
+        self.connection = None
+
+    def request(self, method, path, data=None):
+        headers = {
+            "Host": self.host,
+            # Look like a browser behind the TLS-terminating proxy, so production settings
+            # (SECURE_SSL_REDIRECT, the CSRF referer check) behave as they do for real users
+            "X-Forwarded-Proto": "https",
+            "Referer": f"https://{self.host}{path}",
+            "User-Agent": "resume-loadtest",
+        }
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        body = None
+        if data is not None:
+            body = urlencode(data).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = self.connection_class(self.host, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection: reconnect once
+                self.close()
+                if attempt:
+                    raise
+        for header in response.headers.get_all("Set-Cookie") or []:
+            for name, morsel in SimpleCookie(header).items():
+                if morsel["max-age"] == "0" or not morsel.value:
+                    self.cookies.pop(name, None)
+                else:
+                    self.cookies[name] = morsel.value
+        if response.headers.get("Connection", "").lower() == "close":
+            self.close()
+        return response.status, response.headers, content
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class Results:
+    """Thread-safe (timestamp, step, seconds, ok) samples."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = []
+        self.errors = {}
+
+    def add(self, step, seconds, error=None):
+        with self.lock:
+            self.samples.append((time.monotonic(), step, seconds, error is None))
+            if error is not None:
+                key = f"{step}: {error}"
+                self.errors[key] = self.errors.get(key, 0) + 1
+
+    def summary(self, start, end):
+        """Per-step statistics for the samples taken between two monotonic times."""
+        with self.lock:
+            samples = [s for s in self.samples if start <= s[0] < end]
+        duration = max(end - start, 1e-9)
+        steps = {}
+        for step in STEPS + ["journey"]:
+            times = sorted(s[2] for s in samples if s[1] == step)
+            if not times:
+                continue
+            errors = sum(1 for s in samples if s[1] == step and not s[3])
+            steps[step] = {
+                "count": len(times),
+                "per_second": round(len(times) / duration, 2),
+                "error_rate": round(errors / len(times), 4),
+                "mean_ms": round(sum(times) / len(times) * 1000, 1),
+                "p50_ms": round(percentile(times, 0.50) * 1000, 1),
+                "p90_ms": round(percentile(times, 0.90) * 1000, 1),
+                "p95_ms": round(percentile(times, 0.95) * 1000, 1),
+                "p99_ms": round(percentile(times, 0.99) * 1000, 1),
+                "max_ms": round(times[-1] * 1000, 1),
+            }
+        return steps
+
+
+class VirtualUser(threading.Thread):
+    """Runs the login -> dashboard -> generate -> download journey in a loop until stopped."""
+
+    def __init__(self, number, command, options, results, stop):
+        super().__init__(name=f"loadtest-user-{number}", daemon=True)
+        self.number = number
+        self.command = command
+        self.options = options
+        self.results = results
+        self.stop = stop
+        self.rng = random.Random(f"{options['seed']}:{number}")
+
+    def run(self):
+        iteration = 0
+        while not self.stop.is_set():
+            index = (self.number + iteration * self.options["concurrency_max"]) % self.options["users"]
+            iteration += 1
+            session = Session(self.options["url"], self.options["timeout"])
+            started = time.perf_counter()
+            try:
+                self.journey(session, f"{self.options['prefix']}{index}@example.com")
+                self.results.add("journey", time.perf_counter() - started)
+            except StepError as e:
+                if not self.stop.is_set():
+                    self.results.add("journey", time.perf_counter() - started, str(e))
+            finally:
+                session.close()
+
+    def step(self, session, name, method, path, data=None, expect=(200,)):
+        if self.stop.is_set():
+            raise StepError("stopped")
+        started = time.perf_counter()
+        try:
+            status, headers, content = session.request(method, path, data)
+        except (OSError, http.client.HTTPException) as e:
+            self.results.add(name, time.perf_counter() - started, type(e).__name__)
+            raise StepError(f"{name} failed")
+        elapsed = time.perf_counter() - started
+        if status not in expect:
+            self.results.add(name, elapsed, f"HTTP {status}")
+            raise StepError(f"{name} returned HTTP {status}")
+        self.results.add(name, elapsed)
+        think = self.options["think_time"]
+        if think:
+            self.stop.wait(self.rng.uniform(0.5 * think, 1.5 * think))
+        return status, headers, content
+
+    def csrf(self, session, content):
+        match = CSRF_INPUT_RE.search(content)
+        return match.group(1).decode() if match else session.cookies.get(settings.CSRF_COOKIE_NAME, "")
+
+    def journey(self, session, email):
+        paths = self.command.paths
+        _, _, content = self.step(session, "login_page", "GET", paths["login"])
+        self.step(session, "login", "POST", paths["login"], {
+            "csrfmiddlewaretoken": self.csrf(session, content), "login": email,
+            "password": self.options["password"],
+        }, expect=(302,))
+        _, _, content = self.step(session, "dashboard", "GET", paths["dashboard"])
+        _, headers, _ = self.step(session, "generate", "POST", paths["generate"], {
+            "csrfmiddlewaretoken": self.csrf(session, content), "template": self.rng.choice(TEMPLATES),
+        }, expect=(302,))
+        match = RESUME_URL_RE.search(urlsplit(headers.get("Location", "")).path)
+        if not match:
+            self.results.add("resume_view", 0.0, "generation failed")
+            raise StepError("generation did not redirect to a resume")
+        resume_path = urlsplit(headers["Location"]).path
+        _, _, content = self.step(session, "resume_view", "GET", resume_path)
+        _, headers, _ = self.step(session, "download", "GET", f"{resume_path}download/")
+        if not headers.get("Content-Type", "").startswith("application/pdf"):
+            self.results.add("download", 0.0, "not a PDF")
+            raise StepError("download did not return a PDF")
+        self.step(session, "logout", "POST", paths["logout"], {
+            "csrfmiddlewaretoken": self.csrf(session, content),
+        }, expect=(302,))
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the login -> dashboard -> generate -> download journey with concurrent virtual users, "
+        "against a local server started with OpenAI and SMTP stand-ins (or any --url), and report "
+        "throughput, latency percentiles and error rates per step."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            help="Base URL of an already running server (default: start one on a free local port)",
+        )
+        parser.add_argument(
+            "--server",
+            choices=["gunicorn", "runserver"],
+            default=None,
+            help="Server to start when --url is not given (default: gunicorn if installed, else runserver)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=2,
+            help="Gunicorn worker processes (default: 2)",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=4,
+            help="Gunicorn threads per worker (default: 4)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=10,
+            help="Concurrent virtual users (default: 10)",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=30,
+            help="Seconds to run (default: 30)",
+        )
+        parser.add_argument(
+            "--ramp",
+            help=("Comma-separated concurrency levels run one after the other, e.g. 1,2,4,8,16,32, to find "
+                  "the saturation point (overrides --concurrency and --duration)"),
+        )
+        parser.add_argument(
+            "--stage-duration",
+            type=float,
+            default=20,
+            help="Seconds per --ramp level (default: 20)",
+        )
+        parser.add_argument(
+            "--think-time",
+            type=float,
+            default=0.0,
+            help="Mean pause between steps in seconds, randomised +-50%% (default: 0)",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=None,
+            help="Number of seeded accounts to cycle through (default: all with the prefix)",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="synthetic",
+            help="Account prefix used by seed_synthetic (default: synthetic)",
+        )
+        parser.add_argument(
+            "--password",
+            default="password",
+            help="Password of the seeded accounts (default: password)",
+        )
+        parser.add_argument(
+            "--openai-latency",
+            type=float,
+            default=2.0,
+            help="Seconds the OpenAI stand-in takes per completion (default: 2)",
+        )
+        parser.add_argument(
+            "--smtp-latency",
+            type=float,
+            default=0.05,
+            help="Seconds the SMTP stand-in takes per reply (default: 0.05)",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Per-request timeout in seconds (default: 60)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=1,
+            help="Seed for template choices and think times (default: 1)",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the JSON results to this file",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        seeded = User.objects.filter(username__startswith=options["prefix"]).count()
+        if not seeded:
+            raise CommandError(
+                f"No '{options['prefix']}' accounts found: run `manage.py seed_synthetic --users 1000` first"
+            )
+        options["users"] = min(options["users"] or seeded, seeded)
+
+        if options["ramp"]:
+            try:
+                levels = [int(level) for level in options["ramp"].split(",") if level.strip()]
+            except ValueError:
+                raise CommandError("--ramp takes comma-separated integers, e.g. 1,2,4,8")
+            stages = [(max(1, level), options["stage_duration"]) for level in levels]
+        else:
+            stages = [(max(1, options["concurrency"]), options["duration"])]
+        options["concurrency_max"] = max(level for level, _ in stages)
+
+        self.paths = {
+            "login": reverse("account_login"),
+            "dashboard": reverse("dashboard"),
+            "generate": reverse("generate_resume"),
+            "logout": reverse("account_logout"),
+        }
+        server = openai = smtp = None
+        try:
+            if not options["url"]:
+                openai = OpenAIStandIn(latency=options["openai_latency"]).start()
+                smtp = SMTPStandIn(latency=options["smtp_latency"]).start()
+                server, options["url"] = self._start_server(options, openai, smtp)
+            report = self._run(options, stages)
+        finally:
+            if server is not None:
+                server.terminate()
+                try:
+                    server.wait(10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+            for standin in (openai, smtp):
+                if standin is not None:
+                    standin.stop()
+
+        report["standins"] = {
+            "openai_requests": openai.requests if openai else None,
+            "smtp_messages": len(smtp.messages) if smtp else None,
+        }
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+        generated = sum(
+            round(stage["steps"]["generate"]["count"] * (1 - stage["steps"]["generate"]["error_rate"]))
+            for stage in report["stages"] if "generate" in stage["steps"]
+        )
+        if openai is not None and generated and not openai.requests:
+            raise CommandError(
+                "The OpenAI stand-in received no requests: generation used the built-in templates, "
+                "so the results do not include the LLM call (check that the OpenAI client can be created)."
+            )
+        self.stdout.write(self.style.SUCCESS("Load test completed."))
+
+    def _start_server(self, options, openai, smtp):
+        import socket
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        env = {
+            **os.environ,
+            "OPENAI_API_KEY": "stand-in",
+            "OPENAI_BASE_URL": openai.base_url,
+            "EMAIL_HOST": smtp.host,
+            "EMAIL_PORT": str(smtp.port),
+            "EMAIL_HOST_USER": "loadtest",
+            "EMAIL_HOST_PASSWORD": "loadtest",
+            "EMAIL_USE_TLS": "False",
+            # Every virtual user comes from 127.0.0.1 and would be throttled as one client
+            "RATELIMIT_ENABLED": "False",
+        }
+        kind = options["server"]
+        if kind is None:
+            try:
+                import gunicorn  # noqa: F401
+                kind = "gunicorn"
+            except ImportError:
+                kind = "runserver"
+        if kind == "gunicorn":
+            command = [
+                sys.executable, "-m", "gunicorn", "core.wsgi:application", "--bind", f"127.0.0.1:{port}",
+                "--workers", str(options["workers"]), "--threads", str(options["threads"]),
+                "--timeout", str(int(options["timeout"])), "--log-level", "warning",
+            ]
+        else:
+            command = [sys.executable, "manage.py", "runserver", f"127.0.0.1:{port}", "--noreload"]
+        self.stdout.write(f"Starting {kind} on 127.0.0.1:{port} (OpenAI stand-in {openai.base_url}, "
+                          f"SMTP stand-in {smtp.host}:{smtp.port})")
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"{kind} exited with code {server.returncode}")
+            try:
+                status, _, _ = Session(url, 5).request("GET", self.paths["login"])
+                if status < 500:
+                    return server, url
+            except OSError:
+                pass
+            time.sleep(0.5)
+        server.terminate()
+        raise CommandError(f"{kind} did not answer within 60 seconds")
+
+    def _run(self, options, stages):
+        results = Results()
+        stop = threading.Event()
+        threads = []
+        report_stages = []
+        previous = None
+        saturation = None
+        try:
+            for level, duration in stages:
+                while len(threads) < level:
+                    thread = VirtualUser(len(threads), self, options, results, stop)
+                    thread.start()
+                    threads.append(thread)
+                started = time.monotonic()
+                time.sleep(duration)
+                summary = results.summary(started, time.monotonic())
+                report_stages.append({"concurrency": level, "duration": duration, "steps": summary})
+                self._print_stage(level, summary)
+
+                journey = summary.get("journey", {"per_second": 0.0, "error_rate": 1.0})
+                if saturation is None and previous is not None and (
+                        journey["per_second"] < previous["per_second"] * 1.1 or journey["error_rate"] > 0.01):
+                    saturation = {"concurrency": report_stages[-2]["concurrency"], **previous}
+                previous = journey
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join(options["timeout"])
+
+        if len(stages) > 1:
+            if saturation:
+                self.stdout.write(
+                    f"Saturation: about {saturation['concurrency']} concurrent users "
+                    f"({saturation['per_second']} journeys/s, p95 {saturation['p95_ms']} ms); "
+                    f"more users did not add 10% throughput or raised errors above 1%."
+                )
+            else:
+                self.stdout.write("No saturation reached: throughput still grew at the highest level.")
+        if results.errors:
+            self.stdout.write("Errors:")
+            for error, count in sorted(results.errors.items(), key=lambda item: -item[1]):
+                self.stdout.write(f"  {count:>6}  {error}")
+        return {"url": options["url"], "stages": report_stages, "saturation": saturation, "errors": results.errors}
+
+    def _print_stage(self, level, summary):
+        self.stdout.write(f"\n{level} concurrent users")
+        self.stdout.write(
+            f"{'step':<12} {'count':>7} {'per sec':>8} {'errors':>7} {'p50 ms':>8} {'p90 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        )
+        for step, stats in summary.items():
+            self.stdout.write(
+                f"{step:<12} {stats['count']:>7} {stats['per_second']:>8.2f} {stats['error_rate']:>7.1%} "
+                f"{stats['p50_ms']:>8.1f} {stats['p90_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+                f"{stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}"
+            )
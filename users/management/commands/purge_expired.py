@@ -0,0 +1,62 @@
+import time
+from django.core.management.base import BaseCommand
+from users.maintenance import PURGE_TASKS, count_expired, purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Purge expired OTPs, deleted-email records past retention and expired sessions in bounded batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only",
+            action="append",
+            choices=sorted(PURGE_TASKS),
+            help="Purge only the given kind of rows (can be repeated)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Maximum number of rows deleted per transaction (default: settings.MAINTENANCE_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches to reduce lock contention",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count expired rows",
+        )
+        parser.add_argument(
+            "--loop",
+            type=int,
+            default=0,
+            metavar="SECONDS",
+            help="Keep running, purging every SECONDS seconds",
+        )
+
+    def handle(self, *args, **options):
+        tasks = options.get("only") or list(PURGE_TASKS)
+
+        if options.get("dry_run"):
+            for name, count in count_expired(tasks).items():
+                self.stdout.write(self.style.WARNING(f"Dry run: would purge {count} {name}"))
+            return
+
+        while True:
+            started = time.monotonic()
+            batch_size = None if options["batch_size"] is None else max(1, options["batch_size"])
+            results = purge_expired(tasks, batch_size=batch_size, pause=options["pause"])
+            for name, count in results.items():
+                self.stdout.write(f"  {name}: {count} row(s) purged")
+            self.stdout.write(self.style.SUCCESS(
+                f"Purged {sum(results.values())} expired row(s) in {time.monotonic() - started:.2f}s."))
+
+            if not options.get("loop"):
+                break
+            time.sleep(options["loop"])
@@ -0,0 +1,134 @@
+import random
+import time
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, transaction
+from resume import synthetic
+
+# option -> (default distribution, keyword of synthetic.related_rows)
+DISTRIBUTIONS = {
+    "educations": ("1-3", "educations"),
+    "experiences": ("poisson:3", "experiences"),
+    "projects": ("0-5", "projects"),
+    "skills": ("normal:12,4", "skill_count"),
+    "description_words": ("normal:60,20", "description_words"),
+    "resumes": ("poisson:1.5", "resumes"),
+    "cover_letters": ("0-2", "cover_letters"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Create synthetic users with profiles, education, experience, projects, resumes and cover letters "
+        "for load testing, with bulk inserts and reproducible random data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=1000,
+            help="Number of users to create (default: 1000)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=1,
+            help="Random seed; the same seed, prefix and options always create the same user <n> (default: 1)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Users inserted per transaction (default: 500)",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="synthetic",
+            help="Users get the email <prefix><n>@example.com and username <prefix><n> (default: synthetic)",
+        )
+        parser.add_argument(
+            "--start",
+            type=int,
+            default=None,
+            help="First user number (default: the number of existing users with the prefix)",
+        )
+        parser.add_argument(
+            "--password",
+            default="password",
+            help="Password of every synthetic user, hashed once (default: password)",
+        )
+        for option, (default, _) in DISTRIBUTIONS.items():
+            parser.add_argument(
+                f"--{option.replace('_', '-')}",
+                default=default,
+                help=f"Per-user distribution: N, A-B, poisson:MEAN or normal:MEAN,SD (default: {default})",
+            )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            distributions = {
+                keyword: synthetic.distribution(options[option])
+                for option, (_, keyword) in DISTRIBUTIONS.items()
+            }
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        count = max(0, options["users"])
+        batch_size = max(1, options["batch_size"])
+        prefix = options["prefix"]
+        start = options["start"]
+        if start is None:
+            start = User.objects.filter(username__startswith=prefix).count()
+
+        seed = options["seed"]
+        # Hashing is deliberately slow: do it once and share the hash
+        password = make_password(options["password"])
+        totals = {}
+        started = time.perf_counter()
+
+        for offset in range(0, count, batch_size):
+            indexes = range(start + offset, start + min(offset + batch_size, count))
+            try:
+                with transaction.atomic():
+                    # One generator per user: its data does not depend on --users, --start or --batch-size
+                    rngs = [random.Random(f"{seed}:{prefix}:{index}") for index in indexes]
+                    users = User.objects.bulk_create([
+                        User(password=password, **synthetic.user_fields(rng, index, prefix))
+                        for rng, index in zip(rngs, indexes)
+                    ])
+                    created = self._create_rows(users, rngs, distributions)
+            except IntegrityError:
+                raise CommandError(
+                    f"Some of the users {prefix}{indexes[0]}..{prefix}{indexes[-1]} already exist; "
+                    f"choose another --start or --prefix"
+                )
+            totals[User] = totals.get(User, 0) + len(users)
+            for model, number in created.items():
+                totals[model] = totals.get(model, 0) + number
+            self.stdout.write(f"{offset + len(users)}/{count} users")
+
+        elapsed = time.perf_counter() - started
+        rows = sum(totals.values())
+        for model, number in totals.items():
+            self.stdout.write(f"{model._meta.verbose_name_plural.title():<20} {number:>10}")
+        self.stdout.write(
+            f"{rows} rows in {elapsed:.1f}s ({rows / elapsed * 60 if elapsed else 0:,.0f} rows/minute)"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Created {count} synthetic users."))
+
+    def _create_rows(self, users, rngs, distributions):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            # The backend does not return primary keys from bulk inserts
+            by_username = dict(get_user_model().objects.filter(
+                username__in=[user.username for user in users]).values_list("username", "pk"))
+            for user in users:
+                user.pk = by_username[user.username]
+        rows = []
+        for user, rng in zip(users, rngs):
+            rows += synthetic.related_rows(rng, user, **{
+                keyword: draw(rng) for keyword, draw in distributions.items()
+            })
+        return synthetic.bulk_create_rows(rows, batch_size=1000)
@@ -0,0 +1,45 @@
+import time
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from users.mail_queue import send_all_due
+from users.models import OutboundEmail
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver emails waiting in the outbound mail queue."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Number of messages sent over one connection (default: 50)",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll the queue every EMAIL_QUEUE_POLL_INTERVAL seconds",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Re-queue messages that exhausted their attempts before sending",
+        )
+
+    def handle(self, *args, **options):
+        if options.get("retry_failed"):
+            requeued = OutboundEmail.objects.filter(status=OutboundEmail.STATUS_FAILED).update(
+                status=OutboundEmail.STATUS_QUEUED, attempts=0)
+            self.stdout.write(self.style.WARNING(f"Re-queued {requeued} failed message(s)."))
+
+        interval = getattr(settings, "EMAIL_QUEUE_POLL_INTERVAL", 10)
+        while True:
+            sent, failed = send_all_due(max(1, options["batch_size"]))
+            if sent or failed or not options.get("loop"):
+                style = self.style.ERROR if failed else self.style.SUCCESS
+                self.stdout.write(style(f"Sent {sent} message(s), {failed} failed."))
+            if not options.get("loop"):
+                break
+            time.sleep(interval)
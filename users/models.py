@@ -1,5 +1,6 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 from datetime import timedelta, datetime
 import random
@@ -7,6 +8,26 @@ from django.core.exceptions import ValidationError
 from django.db.models.signals import pre_save, post_delete
 from django.dispatch import receiver
 
+# OTPs (signup and password reset) expire after this long
+OTP_VALIDITY = timedelta(minutes=10)
+# Deleted emails are blocked from re-registering for this long
+DELETED_EMAIL_RETENTION = timedelta(days=30)
+
+
+class CustomUserManager(UserManager):
+    """
+    User manager with a case-insensitive email lookup.
+    """
+
+    def filter_by_email(self, email):
+        """
+        Users whose email matches case-insensitively.
+
+        Filters on LOWER(email), which the users_customuser_email_lc_idx
+        functional index serves (email__iexact cannot use any index).
+        """
+        return self.alias(email_lc=Lower('email')).filter(email_lc=(email or '').lower())
+
 
 class CustomUser(AbstractUser):
     """
@@ -17,8 +38,12 @@ class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=20, blank=True, null=True)
     profile_photo = models.ImageField(upload_to='profile_photos/', blank=True, null=True)
+    # Manifest of the photo's resized copies, kept by resume/images.py
+    profile_photo_derivatives = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CustomUserManager()
     
     # EMAIL as primary field but support username too
     USERNAME_FIELD = 'email'
@@ -47,6 +72,10 @@ class CustomUser(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-created_at']
+        indexes = [
+            # Case-insensitive email lookups (login, signup duplicate check)
+            models.Index(Lower('email'), name='users_customuser_email_lc_idx'),
+        ]
     
     def __str__(self):
         # Some deployments (or older user rows) may not have a `deleted_at` attribute
@@ -70,7 +99,7 @@ class DeletedEmail(models.Model):
     Model to store deleted emails for a certain period.
     """
     email = models.EmailField(unique=True)
-    deleted_at = models.DateTimeField(auto_now_add=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     @classmethod
     def is_email_deleted(cls, email):
@@ -84,7 +113,7 @@ class DeletedEmail(models.Model):
         qs = cls.objects.filter(email=email_lc)
         if qs.exists():
             deleted_at = qs.first().deleted_at
-            if (timezone.now() - deleted_at).days < 30:
+            if timezone.now() - deleted_at < DELETED_EMAIL_RETENTION:
                 return True
         return False
 
@@ -119,7 +148,7 @@ class SignupOTP(models.Model):
     first_name = models.CharField(max_length=30)
     last_name = models.CharField(max_length=30)
     password = models.CharField(max_length=128)  # Hashed password
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     is_verified = models.BooleanField(default=False)
     
     class Meta:
@@ -134,7 +163,7 @@ class SignupOTP(models.Model):
         """Check if OTP is still valid (not expired and not verified)."""
         if self.is_verified:
             return False
-        expiry_time = self.created_at + timedelta(minutes=10)
+        expiry_time = self.created_at + OTP_VALIDITY
         return timezone.now() < expiry_time
     
     @staticmethod
@@ -150,7 +179,7 @@ class PasswordResetOTP(models.Model):
     """
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='password_reset_otps')
     otp = models.CharField(max_length=6)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     is_used = models.BooleanField(default=False)
     
     class Meta:
@@ -165,10 +194,57 @@ class PasswordResetOTP(models.Model):
         """Check if OTP is still valid (not expired and not used)."""
         if self.is_used:
             return False
-        expiry_time = self.created_at + timedelta(minutes=10)
+        expiry_time = self.created_at + OTP_VALIDITY
         return timezone.now() < expiry_time
     
     @staticmethod
     def generate_otp():
         """Generate a random 6-digit OTP."""
         return str(random.randint(100000, 999999))
+
+
+class OutboundEmail(models.Model):
+    """
+    Outgoing email waiting in the local mail spool.
+    Written by QueuedEmailBackend and delivered by the mail queue worker.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=998)
+    body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    alternatives = models.JSONField(default=list, blank=True, help_text="List of [content, mimetype] pairs")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Earliest time of the next delivery attempt; while sending, the end of the worker's lease
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim = models.CharField(max_length=32, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Outbound Email'
+        verbose_name_plural = 'Outbound Emails'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='users_outbound_due_idx'),
+            models.Index(fields=['status', 'sent_at'], name='users_outbound_sent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
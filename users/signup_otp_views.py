@@ -13,6 +13,8 @@ from django.db import transaction
 from django.utils import timezone
 from django import forms
 from users.models import CustomUser, SignupOTP
+from users.usernames import create_user_with_unique_username
+from core import ratelimit
 import logging
 
 logger = logging.getLogger(__name__)
@@ -60,7 +62,7 @@ class SignupRequestForm(forms.Form):
     
     def clean_email(self):
         email = self.cleaned_data.get('email')
-        if CustomUser.objects.filter(email=email).exists():
+        if CustomUser.objects.filter_by_email(email).exists():
             # Provide a friendlier and actionable message
             raise forms.ValidationError(
                 'An account with this email already exists. Try logging in or use "Forgot password" to reset your password.'
@@ -113,6 +115,21 @@ class SignupRequestView(View):
             last_name = form.cleaned_data['last_name']
             password = form.cleaned_data['password1']
             
+            wait = ratelimit.cooldown_remaining('signup_otp:cooldown', email)
+            if wait:
+                messages.warning(
+                    request,
+                    f'A verification code was just sent to {email}. Please wait {wait} seconds before requesting another one.'
+                )
+                return render(request, self.template_name, {'form': form})
+            
+            # Count the OTP email per IP and address only once the form is valid, so typos don't use up sends
+            retry_after = ratelimit.check_otp_request('signup_otp', request, email)
+            if retry_after:
+                return ratelimit.ratelimited_response(
+                    request, retry_after, 'Too many signup attempts. Please try again later.'
+                )
+            
             try:
                 # Generate OTP
                 otp_code = SignupOTP.generate_otp()
@@ -171,6 +188,8 @@ AI Resume Builder Team
                         fail_silently=False,
                     )
                     logger.info(f"✅ Signup OTP email sent successfully to {email}")
+                    ratelimit.start_cooldown('signup_otp:cooldown', email)
+                    ratelimit.reset('signup_verify:email', email)
                     
                     # Store email in session for OTP verification
                     request.session['signup_email'] = email
@@ -184,7 +203,7 @@ AI Resume Builder Team
                 except Exception as e:
                     logger.error(f"❌ Failed to send signup OTP email to {email}: {str(e)}")
                     
-                    if 'console' in settings.EMAIL_BACKEND.lower():
+                    if 'console' in getattr(settings, 'EMAIL_DELIVERY_BACKEND', settings.EMAIL_BACKEND).lower():
                         messages.warning(
                             request,
                             f'Email backend is set to console. Check server logs for OTP: {otp_code}'
@@ -228,6 +247,10 @@ class SignupVerifyOTPView(View):
             email = form.cleaned_data['email']
             otp = form.cleaned_data['otp']
             
+            if ratelimit.is_limited('signup_verify:email', email):
+                messages.error(request, 'Too many failed attempts. Please request a new OTP.')
+                return render(request, self.template_name, {'form': form, 'email': email})
+            
             try:
                 # Find the OTP record
                 otp_obj = SignupOTP.objects.filter(
@@ -239,21 +262,9 @@ class SignupVerifyOTPView(View):
                 if otp_obj and otp_obj.is_valid():
                     # Create the user account
                     with transaction.atomic():
-                        # Generate username from email
-                        import re
-                        base = email.split('@')[0]
-                        base = re.sub(r"[^A-Za-z0-9_.-]", '', base)[:140]
-                        username = base
-                        suffix = 0
-                        
-                        while CustomUser.objects.filter(username=username).exists():
-                            suffix += 1
-                            username = f"{base[:135]}{suffix}"
-                        
-                        # Create user
-                        user = CustomUser.objects.create(
-                            username=username,
-                            email=email,
+                        # Create user with a unique username generated from the email
+                        user = create_user_with_unique_username(
+                            email,
                             first_name=otp_obj.first_name,
                             last_name=otp_obj.last_name,
                             password=otp_obj.password,  # Already hashed
@@ -268,6 +279,7 @@ class SignupVerifyOTPView(View):
                         
                         # Clear session
                         request.session.pop('signup_email', None)
+                        ratelimit.reset('signup_verify:email', email)
                         
                         messages.success(
                             request,
@@ -275,6 +287,7 @@ class SignupVerifyOTPView(View):
                         )
                         return redirect('account_login')
                 else:
+                    ratelimit.hit('signup_verify:email', email)
                     messages.error(
                         request,
                         'Invalid or expired OTP. Please request a new one.'
@@ -299,6 +312,16 @@ class ResendSignupOTPView(View):
             messages.error(request, 'Please start the signup process first.')
             return redirect('account_signup')
         
+        wait = ratelimit.cooldown_remaining('signup_otp:cooldown', email)
+        if wait:
+            messages.warning(request, f'A verification code was just sent. Please wait {wait} seconds before requesting another one.')
+            return redirect('signup_verify_otp')
+        retry_after = ratelimit.check_otp_request('signup_otp', request, email)
+        if retry_after:
+            return ratelimit.ratelimited_response(
+                request, retry_after, 'Too many verification codes requested. Please try again later.'
+            )
+        
         try:
             # Find the latest unverified OTP
             otp_obj = SignupOTP.objects.filter(
@@ -339,6 +362,8 @@ AI Resume Builder Team
             )
             
             logger.info(f"✅ New signup OTP sent to {email}")
+            ratelimit.start_cooldown('signup_otp:cooldown', email)
+            ratelimit.reset('signup_verify:email', email)
             messages.success(request, 'A new verification code has been sent to your email.')
             
         except Exception as e:
@@ -0,0 +1,139 @@
+"""
+Local SMTP stand-in server for tests and benchmarks.
+
+Speaks just enough SMTP (EHLO/HELO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA, RSET,
+NOOP, QUIT) for smtplib and Django's SMTP backends. Messages are kept in
+memory. An optional per-command delay simulates the round-trip latency of a
+remote mail server.
+
+Usage:
+    with SMTPStandIn(latency=0.01) as server:
+        send_mail(..., connection=get_connection(..., host=server.host, port=server.port))
+        assert len(server.messages) == 1
+"""
+import socketserver
+import threading
+import time
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost SMTP stand-in ready")
+        mail_from, recipients = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            command = line[:4].upper()
+            with server.lock:
+                server.commands += 1
+            if server.drop_after and server.commands > server.drop_after:
+                # Simulate the server dropping the connection
+                server.drop_after = 0
+                return
+            if command == "EHLO":
+                self.wfile.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250-8BITMIME\r\n")
+                self.reply("250 OK")
+            elif command == "HELO":
+                self.reply("250 localhost")
+            elif command == "AUTH":
+                parts = line.split()
+                if len(parts) > 1 and parts[1].upper() == "LOGIN" and len(parts) == 2:
+                    self.reply("334 VXNlcm5hbWU6")
+                    self.rfile.readline()
+                    self.reply("334 UGFzc3dvcmQ6")
+                    self.rfile.readline()
+                elif len(parts) > 1 and parts[1].upper() == "LOGIN":
+                    self.reply("334 UGFzc3dvcmQ6")
+                    self.rfile.readline()
+                with server.lock:
+                    server.logins += 1
+                self.reply("235 Authentication successful")
+            elif command == "MAIL":
+                mail_from, recipients = line[10:].strip(), []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                recipients.append(line[8:].strip())
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                    data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                with server.lock:
+                    server.messages.append((mail_from, recipients, b"".join(data)))
+                mail_from, recipients = None, []
+                self.reply("250 OK: queued")
+            elif command == "RSET":
+                mail_from, recipients = None, []
+                self.reply("250 OK")
+            elif command == "NOOP":
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """
+    In-memory SMTP server listening on a free local port in a background thread.
+
+    Attributes:
+        messages: List of (mail_from, recipients, raw message bytes)
+        connections: Number of accepted connections
+        logins: Number of AUTH exchanges
+        latency: Seconds slept before every reply
+        drop_after: Drop the connection once this many commands were received (0 = never)
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        super().__init__((host, port), _SMTPHandler)
+        self.latency = latency
+        self.drop_after = 0
+        self.lock = threading.Lock()
+        self.messages = []
+        self.connections = 0
+        self.logins = 0
+        self.commands = 0
+        self._thread = None
+
+    @property
+    def host(self):
+        return self.server_address[0]
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="smtp-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
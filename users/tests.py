@@ -1,3 +1,127 @@
-from django.test import TestCase
+import smtplib
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.queries import assert_max_queries
+
+from . import maintenance
+from .mail_backends import PooledSMTPEmailBackend
+from .models import OTP_VALIDITY, PasswordResetOTP, SignupOTP
+from .smtp_standin import SMTPStandIn
+
+ROWS = 4
+
+# url name -> query budget for a GET by an anonymous visitor
+ANONYMOUS_BUDGETS = {
+    'account_login': 1,
+    'account_signup': 0,
+    'password_reset_request': 0,
+}
+
+# url name -> query budget for a GET by a signed-in staff user
+AUTHENTICATED_BUDGETS = {
+    'delete_account': 2,
+    'delete_account_confirm': 2,
+    'admin:users_customuser_changelist': 5,
+    'admin:users_passwordresetotp_changelist': 5,
+    'admin:users_signupotp_changelist': 5,
+    'admin:users_outboundemail_changelist': 5,
+}
+
+
+@override_settings(RATELIMIT_ENABLED=False)
+class QueryBudgetTests(TestCase):
+    """
+    Account pages and the user admin must stay within their query budgets and run no query once per row.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        users = [
+            User.objects.create_user(
+                email=f'user{i}@example.com', username=f'user{i}', password='password',
+                first_name='Test', last_name=f'User{i}', is_staff=True, is_superuser=True,
+            )
+            for i in range(ROWS)
+        ]
+        cls.user = users[0]
+        for user in users:
+            PasswordResetOTP.objects.create(user=user, otp='123456')
+
+    def test_anonymous_view_query_budgets(self):
+        for name, budget in ANONYMOUS_BUDGETS.items():
+            with self.subTest(view=name):
+                with assert_max_queries(budget, max_repeats=2):
+                    response = self.client.get(reverse(name))
+                self.assertLess(response.status_code, 500)
+
+    def test_authenticated_view_query_budgets(self):
+        self.client.force_login(self.user)
+        for name, budget in AUTHENTICATED_BUDGETS.items():
+            with self.subTest(view=name):
+                with assert_max_queries(budget, max_repeats=2):
+                    response = self.client.get(reverse(name))
+                self.assertLess(response.status_code, 500)
+
+
+class PooledSMTPBackendTests(SimpleTestCase):
+    """
+    Pooled connections are retried when stale and never pooled unauthenticated, also with fail_silently.
+    """
+
+    def setUp(self):
+        self.server = SMTPStandIn().start()
+        self.addCleanup(self.server.stop)
+
+    def backend(self):
+        return PooledSMTPEmailBackend(host=self.server.host, port=self.server.port, username='user',
+                                      password='secret', use_tls=False, fail_silently=True)
+
+    def message(self):
+        return EmailMessage('Subject', 'Body', 'from@example.com', ['to@example.com'])
+
+    def test_retries_stale_connection_when_failing_silently(self):
+        backend = self.backend()
+        self.assertEqual(backend.send_messages([self.message()]), 1)
+        # The server drops the pooled connection on its next command
+        self.server.drop_after = self.server.commands
+        self.assertEqual(backend.send_messages([self.message()]), 1)
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_failed_login_is_not_pooled(self):
+        backend = self.backend()
+        with mock.patch.object(smtplib.SMTP, 'login', side_effect=smtplib.SMTPAuthenticationError(535, b'no')):
+            self.assertEqual(backend.send_messages([self.message()]), 0)
+        self.assertFalse(backend.pool._idle)
+        self.assertEqual(self.server.messages, [])
+
+
+class PurgeTests(TestCase):
+    """
+    Batched purges delete expired rows only, also when fresh rows sit between them.
+    """
+
+    def create_otp(self, email, age):
+        otp = SignupOTP.objects.create(email=email, otp='123456', first_name='Test', last_name='User',
+                                       password='hashed')
+        SignupOTP.objects.filter(pk=otp.pk).update(created_at=timezone.now() - age)
+        return otp
+
+    def test_fresh_rows_inside_the_batch_survive(self):
+        expired = OTP_VALIDITY + timedelta(minutes=1)
+        for i in range(3):
+            self.create_otp(f'old{i}@example.com', expired)
+            self.create_otp(f'new{i}@example.com', timedelta(0))
+        self.assertEqual(maintenance.purge_expired(['signup_otps'], batch_size=2), {'signup_otps': 3})
+        self.assertEqual(
+            sorted(SignupOTP.objects.values_list('email', flat=True)),
+            ['new0@example.com', 'new1@example.com', 'new2@example.com'],
+        )
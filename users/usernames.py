@@ -0,0 +1,79 @@
+"""
+Username allocation for new accounts.
+
+Usernames are derived from the local part of the email address. When that
+name is taken, the next free numeric suffix is found with a single aggregate
+query over the usernames sharing the prefix (an index range scan; on
+PostgreSQL Django's varchar_pattern_ops "_like" index serves the LIKE
+prefix), instead of probing john1, john2, ... one query at a time.
+
+Two concurrent signups can still pick the same name. The insert then fails
+on the unique constraint and is retried with a random suffix.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, Max, Q
+from django.db.models.functions import Cast, Substr
+from django.utils.crypto import get_random_string
+
+from .models import CustomUser
+
+# Room for a numeric or random suffix within the 150 character username limit
+MAX_BASE_LENGTH = 140
+# Longest numeric suffix considered when looking for the highest one in use
+MAX_SUFFIX_DIGITS = 9
+# Attempts with a random suffix after losing a race on the unique constraint
+MAX_RETRIES = 5
+
+RANDOM_SUFFIX_CHARS = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+
+def username_base(email):
+    """Return the sanitized local part of an email address, used as username prefix."""
+    base = re.sub(r"[^A-Za-z0-9_.-]", '', (email or '').split('@')[0])[:MAX_BASE_LENGTH]
+    return base or 'user'
+
+
+def next_free_username(base):
+    """
+    Return `base` if it is free, otherwise `base` followed by the next unused number.
+
+    Issues exactly one query.
+    """
+    numbered = rf'^{re.escape(base)}[0-9]{{1,{MAX_SUFFIX_DIGITS}}}$'
+    stats = CustomUser.objects.filter(username__startswith=base).aggregate(
+        taken=Count('pk', filter=Q(username=base)),
+        highest=Max(
+            Cast(Substr('username', len(base) + 1), BigIntegerField()),
+            filter=Q(username__regex=numbered),
+        ),
+    )
+    if not stats['taken']:
+        return base
+    return f"{base}{(stats['highest'] or 0) + 1}"
+
+
+def random_username(base):
+    """Return `base` with a short random suffix, for retries after a collision."""
+    return f"{base}_{get_random_string(6, RANDOM_SUFFIX_CHARS)}"
+
+
+def create_user_with_unique_username(email, **fields):
+    """
+    Create a CustomUser with a username derived from the email address.
+
+    Each insert runs in its own savepoint, so a unique constraint violation on
+    the username can be retried within the caller's transaction. Violations
+    caused by anything else (e.g. an existing email) are re-raised.
+    """
+    base = username_base(email)
+    username = next_free_username(base)
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            with transaction.atomic():
+                return CustomUser.objects.create(username=username, email=email, **fields)
+        except IntegrityError:
+            if attempt == MAX_RETRIES or not CustomUser.objects.filter(username=username).exists():
+                raise
+            username = random_username(base)